@@ -0,0 +1,151 @@
+"""
+Load test of the month report and resource list under concurrent clients,
+comparing the synchronous views on the WSGI handler with their async
+variants on the ASGI handler.
+
+Both handlers run in-process (Django's test Client / AsyncClient) against a
+seeded copy of the bundled SQLite database, with the report cache disabled
+so every request reaches the database.
+
+Usage:
+    python benchmarks/load_test.py [--rows 24000] [--clients 12] [--requests 240]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+MONTHS = 12
+
+
+def setup_django(database):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Team_Production_Report.settings')
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = str(database)
+    settings.DEBUG = False
+    settings.CACHES = {
+        **settings.CACHES,
+        'load-test': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+    }
+    settings.REPORT_CACHE_ALIAS = 'load-test'
+    import django
+    django.setup()
+
+
+def seed(rows):
+    from django.core.management import call_command
+
+    people = max(rows // MONTHS, 1)
+    call_command('seed_benchmark_data', resources=people, projects=max(people // 10, 1), months=MONTHS)
+
+
+def request_paths(asynchronous):
+    """
+    The dashboard's burst of requests: every month tab's report and the
+    resource list of each month.
+    """
+    from django.urls import reverse
+    from resources.models import ResourceModel
+
+    months = ResourceModel.objects.order_by('year', 'month').values_list('year', 'month').distinct()
+    report = 'month_report_async' if asynchronous else 'month_report'
+    paths = []
+    for year, month in months:
+        paths.append(reverse(report, kwargs={'year': year, 'month': month}))
+        if asynchronous:
+            paths.append(f"{reverse('resource_list_async')}?year={year}&month={month}")
+        else:
+            paths.append(f"{reverse('resource_list')}?format=json&year={year}&month={month}")
+    return paths
+
+
+def summarize(label, latencies, elapsed):
+    latencies.sort()
+    print(
+        f"{label:<6} {len(latencies):>5} requests {elapsed:>8.2f} s "
+        f"{len(latencies) / elapsed:>8.1f} req/s  "
+        f"p50 {statistics.median(latencies) * 1000:>7.1f} ms  "
+        f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:>7.1f} ms"
+    )
+
+
+def run_wsgi(paths, clients, total):
+    from django.test import Client
+
+    def worker(index):
+        client = Client()
+        latencies = []
+        for number in range(index, total, clients):
+            start = time.perf_counter()
+            response = client.get(paths[number % len(paths)])
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.status_code
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = [latency for result in pool.map(worker, range(clients)) for latency in result]
+    summarize('WSGI', latencies, time.perf_counter() - start)
+
+
+def run_asgi(paths, clients, total):
+    from django.test import AsyncClient
+
+    async def worker(index):
+        client = AsyncClient()
+        latencies = []
+        for number in range(index, total, clients):
+            start = time.perf_counter()
+            response = await client.get(paths[number % len(paths)])
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.status_code
+        return latencies
+
+    async def main():
+        return await asyncio.gather(*(worker(index) for index in range(clients)))
+
+    start = time.perf_counter()
+    latencies = [latency for result in asyncio.run(main()) for latency in result]
+    summarize('ASGI', latencies, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=24_000, help="Approximate number of resource rows to seed")
+    parser.add_argument('--clients', type=int, default=12, help="Concurrent clients (one per dashboard tab)")
+    parser.add_argument('--requests', type=int, default=240, help="Total requests per handler")
+    parser.add_argument('--database', help="Working copy of db.sqlite3 (default: a temporary file)")
+    args = parser.parse_args()
+
+    database = Path(args.database or tempfile.mkstemp(suffix='.sqlite3')[1])
+    shutil.copyfile(BASE_DIR / 'db.sqlite3', database)
+    print(f"Working on a copy of db.sqlite3 at {database}")
+    setup_django(database)
+
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    call_command('migrate', verbosity=0)
+    seed(args.rows)
+    setup_test_environment()
+
+    wsgi_paths = request_paths(asynchronous=False)
+    asgi_paths = request_paths(asynchronous=True)
+    connection.close()
+    print(f"{args.clients} concurrent clients, {args.requests} requests each run\n")
+    run_wsgi(wsgi_paths, args.clients, args.requests)
+    run_asgi(asgi_paths, args.clients, args.requests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+Seed a copy of the bundled SQLite database with ~100k rows and print
+EXPLAIN QUERY PLAN output and timings for the core list and report
+queries, without and with the indexes the year/month index migrations
+added.
+
+Usage:
+    python benchmarks/query_plans.py [--rows 100000] [--database /tmp/bench.sqlite3]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+# (model, index name) dropped for the "before" run. The unique
+# (year, month, project_name) constraint is kept: dropping it on SQLite
+# rebuilds the table with every index of the model.
+INDEXES_UNDER_COMPARISON = [
+    ('resources.ResourceModel', 'resource_year_month_name_idx'),
+    ('resources.ResourceModel', 'resource_month_name_lower_idx'),
+    ('projects.Project', 'project_active_month_idx'),
+    ('projects.ProjectResource', 'active_allocation_resource_idx'),
+]
+REPEAT = 20
+
+
+def setup_django(database):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Team_Production_Report.settings')
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = str(database)
+    import django
+    django.setup()
+
+
+def seed(rows):
+    from django.core.management import call_command
+
+    people = 1000
+    call_command(
+        'seed_benchmark_data',
+        resources=people, projects=people // 10, months=max(rows // people, 1), start_year=2015,
+    )
+
+
+def core_queries(year, month):
+    from projects.models import Project, ProjectResource
+    from projects.reports import project_totals, resource_totals, team_totals
+    from resources.models import ResourceModel
+
+    return {
+        'resource_list': (
+            lambda: list(ResourceModel.objects.filter(year=year, month=month).order_by('resource_name', 'pk')[:50]),
+            ResourceModel.objects.filter(year=year, month=month).order_by('resource_name', 'pk')[:50],
+        ),
+        'project_list': (
+            lambda: list(Project.objects.with_metrics().filter(year=year, month=month, is_active=True)),
+            Project.objects.with_metrics().filter(year=year, month=month, is_active=True),
+        ),
+        'report_projects': (
+            lambda: project_totals(year, month),
+            Project.objects.filter(year=year, month=month, is_active=True).values('id'),
+        ),
+        'report_resources': (
+            lambda: resource_totals(year, month),
+            ProjectResource.objects.filter(project__year=year, project__month=month, is_active=True),
+        ),
+        'report_team': (
+            lambda: team_totals(year, month),
+            ResourceModel.objects.filter(year=year, month=month),
+        ),
+    }
+
+
+def compared_indexes():
+    from django.apps import apps
+
+    for label, name in INDEXES_UNDER_COMPARISON:
+        model = apps.get_model(label)
+        yield model, next(index for index in model._meta.indexes if index.name == name)
+
+
+def drop_indexes():
+    from django.db import connection
+
+    with connection.schema_editor() as editor:
+        for model, index in compared_indexes():
+            editor.remove_index(model, index)
+
+
+def create_indexes():
+    from django.db import connection
+
+    with connection.schema_editor() as editor:
+        for model, index in compared_indexes():
+            editor.add_index(model, index)
+
+
+def measure(label, year, month):
+    print(f"\n=== {label} ===")
+    for name, (run, queryset) in core_queries(year, month).items():
+        run()
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            run()
+        elapsed = (time.perf_counter() - start) / REPEAT * 1000
+        print(f"\n{name}: {elapsed:.2f} ms")
+        print(queryset.explain())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000, help="Approximate number of resource rows to seed")
+    parser.add_argument('--database', help="Working copy of db.sqlite3 (default: a temporary file)")
+    args = parser.parse_args()
+
+    database = Path(args.database or tempfile.mkstemp(suffix='.sqlite3')[1])
+    shutil.copyfile(BASE_DIR / 'db.sqlite3', database)
+    print(f"Working on a copy of db.sqlite3 at {database}")
+    setup_django(database)
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    seed(args.rows)
+
+    from resources.models import ResourceModel
+    year, month = ResourceModel.objects.order_by('-year', '-month').values_list('year', 'month').first()
+
+    # Only the compared indexes change, so both runs query the current schema
+    drop_indexes()
+    measure("Before indexes", year, month)
+
+    create_indexes()
+    measure("After indexes", year, month)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Render time of the resource table for 10k rows: the previous template
+(a {% url %} reversal per Edit/Delete link, templates re-read and
+compiled on every render) against the current one (cached template
+loader, per-page row URLs, row fragment cache) with a cold and a warm
+fragment cache.
+
+No database is needed; the rows are unsaved ResourceModel instances.
+
+Usage:
+    python benchmarks/template_render.py [--rows 10000] [--repeat 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+# templates/resources/resource_table.html before the rendering speedups
+BEFORE_TABLE = """
+<div id="resourceTable">
+    <table class="table table-bordered table-striped">
+        <thead class="table-dark">
+            <tr>
+                {% for column in columns %}
+                <th><a href="{{ column.url }}">{{ column.label }}</a></th>
+                {% endfor %}
+                <th>Actions</th>
+            </tr>
+        </thead>
+        <tbody>
+            {% for resource in resources %}
+            <tr>
+                <td>{{ resource.resource_name }}</td>
+                <td>{{ resource.working_days }}</td>
+                <td>{{ resource.present_day }}</td>
+                <td>{{ resource.present_hours }}</td>
+                <td>
+                    <a href="{% url 'resource_update' resource.pk %}" class="btn btn-sm btn-primary">Edit</a>
+                    <a href="{% url 'resource_delete' resource.pk %}" class="btn btn-sm btn-danger">Delete</a>
+                </td>
+            </tr>
+            {% endfor %}
+        </tbody>
+    </table>
+</div>
+"""
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Team_Production_Report.settings')
+    from django.conf import settings
+    settings.DEBUG = False
+    settings.CACHES = {
+        **settings.CACHES,
+        'template_fragments': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'bench'},
+    }
+    import django
+    django.setup()
+
+
+def engines():
+    from django.template import Engine
+    from resources.templating import CACHED_TEMPLATE_LOADERS
+
+    libraries = {'cache': 'django.templatetags.cache'}
+    before = Engine(
+        loaders=[('django.template.loaders.locmem.Loader', {'resources/resource_table.html': BEFORE_TABLE})],
+        libraries=libraries,
+    )
+    after = Engine(dirs=[str(BASE_DIR / 'templates')], loaders=CACHED_TEMPLATE_LOADERS, libraries=libraries)
+    return before, after
+
+
+def context(rows):
+    from resources.models import ResourceModel
+    from resources.templating import RowUrl, fragment_version
+    from resources.views import RESOURCE_LIST_COLUMNS
+
+    return {
+        'resources': [
+            ResourceModel(pk=pk, resource_name=f"Resource {pk}", working_days=22, present_day=20, present_hours=160)
+            for pk in range(1, rows + 1)
+        ],
+        'columns': [{'label': label, 'url': f"?sort={field}"} for field, label in RESOURCE_LIST_COLUMNS],
+        'row_urls': {'edit': RowUrl('resource_update'), 'delete': RowUrl('resource_delete')},
+        'rows_version': fragment_version('resource_name', None, None, rows, 'benchmark', rows),
+        'fragment_timeout': 300,
+        'year': 2025,
+        'month': 8,
+    }
+
+
+def measure(label, render, repeat, before_each=None):
+    timings = []
+    for _ in range(repeat):
+        if before_each:
+            before_each()
+        start = time.perf_counter()
+        html = render()
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<32} {statistics.median(timings):9.1f} ms  ({len(html) // 1024} KiB)")
+    return html
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=5, help="Timed renders per case (median is reported)")
+    args = parser.parse_args()
+    setup_django()
+
+    from django.core.cache import caches
+    from django.template import Context
+
+    before, after = engines()
+    data = context(args.rows)
+
+    def render(engine):
+        return lambda: engine.get_template('resources/resource_table.html').render(Context(data))
+
+    print(f"Rendering the resource table with {args.rows} rows\n")
+    old = measure("before", render(before), args.repeat)
+    cold = measure("after, cold fragment cache", render(after), args.repeat,
+                   before_each=caches['template_fragments'].clear)
+    warm = measure("after, warm fragment cache", render(after), args.repeat)
+    assert cold.count('/edit/') == old.count('/edit/') == args.rows and warm == cold
+
+
+if __name__ == '__main__':
+    main()
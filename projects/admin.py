@@ -1,12 +1,29 @@
 # projects-admin
-from django.contrib import admin
-from .models import ProjectModel, ProjectResource
+from django.contrib import admin, messages
+from django.db.models import Prefetch
+from resources.admin import ClosedMonthLockMixin
+from resources.models import ResourceModel
+from .models import MonthlyRollup, Project, ProjectResource
+from .snapshots import SnapshotError, close_month
  
 # Register your models here.
  
-class ProjectResourceInline(admin.TabularInline):
+class ProjectListFilter(admin.RelatedFieldListFilter):
     """
-    Allows managing ProjectResource entries directly from the ProjectModel admin page.
+    Project filter whose choice labels are built from prefetched resources
+    instead of running Project.__str__ queries for every project.
+    """
+    def field_choices(self, field, request, model_admin):
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        projects = Project.objects.with_resource_names()
+        if ordering:
+            projects = projects.order_by(*ordering)
+        return [(project.pk, str(project)) for project in projects]
+
+
+class ProjectResourceInline(ClosedMonthLockMixin, admin.TabularInline):
+    """
+    Allows managing ProjectResource entries directly from the Project admin page.
     """
     model = ProjectResource
     extra = 1
@@ -16,8 +33,8 @@ class ProjectResourceInline(admin.TabularInline):
     verbose_name_plural = "Project Allocations"
  
  
-@admin.register(ProjectModel)
-class ProjectModelAdmin(admin.ModelAdmin):
+@admin.register(Project)
+class ProjectModelAdmin(ClosedMonthLockMixin, admin.ModelAdmin):
     list_display = (
         'project_name',
         'project_type',
@@ -34,10 +51,33 @@ class ProjectModelAdmin(admin.ModelAdmin):
     search_fields = ('project_name',)
     inlines = [ProjectResourceInline]
     readonly_fields = ('billable_hours', 'non_billable_hours', 'created_at', 'updated_at')
+    actions = ['close_months']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_metrics().with_resource_names()
+
+    @admin.display(description='Resource count', ordering='resource_count')
+    def resource_count(self, obj):
+        return obj.resource_count
+
+    @admin.display(description='Utilization percentage', ordering='utilization_percentage')
+    def utilization_percentage(self, obj):
+        return obj.utilization_percentage
+
+    @admin.action(description="Close the selected projects' months")
+    def close_months(self, request, queryset):
+        months = queryset.order_by().values_list('year', 'month').distinct()
+        for year, month in sorted(months):
+            try:
+                close_month(year, month)
+            except SnapshotError as exc:
+                self.message_user(request, str(exc), messages.WARNING)
+            else:
+                self.message_user(request, f"Closed {month}/{year} and wrote its report snapshot.")
  
  
 @admin.register(ProjectResource)
-class ProjectResourceAdmin(admin.ModelAdmin):
+class ProjectResourceAdmin(ClosedMonthLockMixin, admin.ModelAdmin):
     list_display = (
         'project',
         'resource',
@@ -48,11 +88,41 @@ class ProjectResourceAdmin(admin.ModelAdmin):
         'non_billable_hours',
         'created_at',
     )
+    list_select_related = ('project', 'resource')
     search_fields = (
         'project__project_name',
         'resource__resource_name',
     )
-    list_filter = ('project', 'resource')
+    list_filter = (('project', ProjectListFilter), 'resource')
     readonly_fields = ('billable_hours', 'non_billable_hours', 'created_at', 'updated_at')
- 
- 
\ No newline at end of file
+
+    def month_of(self, obj):
+        return (obj.project.year, obj.project.month) if obj.project else (None, None)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related(
+            Prefetch(
+                'project__resources',
+                queryset=ResourceModel.objects.only('id', 'resource_name'),
+            )
+        )
+
+
+@admin.register(MonthlyRollup)
+class MonthlyRollupAdmin(admin.ModelAdmin):
+    list_display = (
+        'kind',
+        'year',
+        'month',
+        'project',
+        'resource',
+        'billable_days',
+        'non_billable_days',
+        'billable_hours',
+        'non_billable_hours',
+        'headcount',
+        'utilization_percentage',
+    )
+    list_filter = ('kind', 'year', 'month')
+    list_select_related = ('project', 'resource')
+    readonly_fields = [field.name for field in MonthlyRollup._meta.fields]
@@ -0,0 +1,117 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.http import JsonResponse
+from django.views.decorators.http import condition, require_GET
+
+from resources.models import ResourceModel
+from resources.pagination import InvalidCursor, keyset_paginate
+from .models import Project, ProjectResource
+
+API_PER_PAGE = 100
+API_MAX_PER_PAGE = 1000
+
+
+class ReadOnlyEndpoint:
+    """
+    Read-only JSON listing of one model with year/month filters, sparse
+    fieldsets (``fields=a,b`` loads only those columns), keyset pagination
+    (``cursor``/``per_page``) and ETag/If-None-Match support.
+
+    Filtering on an archived year reads the archive tables, through the
+    model manager's for_year().
+
+    The ETag is derived from the max ``updated_at`` and the row count of
+    the filtered rows, so an unchanged month answers 304 after a single
+    aggregate query.
+    """
+
+    def __init__(self, model, fields, month_prefix='', foreign_keys=()):
+        self.model = model
+        self.fields = fields
+        self.month_prefix = month_prefix
+        # API field name → model attname for foreign keys (e.g. project → project_id)
+        self.attnames = {name: f'{name}_id' if name in foreign_keys else name for name in fields}
+
+    def queryset(self, request):
+        # for_year() reads an archived year from the archive tables
+        year, month = (int(request.GET[param]) if request.GET.get(param) else None
+                       for param in ('year', 'month'))
+        queryset = self.model.objects.all() if year is None else self.model.objects.for_year(year)
+        if month is not None:
+            queryset = queryset.filter(**{f'{self.month_prefix}month': month})
+        return queryset
+
+    def requested_fields(self, request):
+        if not request.GET.get('fields'):
+            return list(self.fields)
+        requested = [name.strip() for name in request.GET['fields'].split(',') if name.strip()]
+        unknown = set(requested) - set(self.fields)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        return ['id'] + [name for name in requested if name != 'id']
+
+    def etag(self, request):
+        try:
+            freshness = self.queryset(request).order_by().aggregate(
+                updated=Max('updated_at'), count=Count('pk')
+            )
+        except ValueError:
+            return None
+        key = f"{self.model._meta.label}|{freshness['updated']}|{freshness['count']}|{request.GET.urlencode()}"
+        return hashlib.md5(key.encode()).hexdigest()
+
+    def view(self, request):
+        try:
+            queryset = self.queryset(request)
+            fields = self.requested_fields(request)
+            per_page = min(max(int(request.GET.get('per_page', API_PER_PAGE)), 1), API_MAX_PER_PAGE)
+        except ValueError as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+
+        attnames = [self.attnames[name] for name in fields]
+        try:
+            page = keyset_paginate(
+                queryset.only(*attnames), 'id', after=request.GET.get('cursor'), per_page=per_page
+            )
+        except InvalidCursor:
+            return JsonResponse({'error': 'Invalid cursor'}, status=400)
+
+        return JsonResponse({
+            'results': [
+                {name: getattr(obj, attname) for name, attname in zip(fields, attnames)}
+                for obj in page
+            ],
+            'next': page.next_cursor,
+        })
+
+    def as_view(self):
+        return require_GET(condition(etag_func=lambda request: self.etag(request))(self.view))
+
+
+project_list_api = ReadOnlyEndpoint(
+    Project,
+    fields=[
+        'id', 'project_name', 'project_type', 'year', 'month', 'present_day',
+        'billable_days', 'non_billable_days', 'billable_hours', 'non_billable_hours',
+        'is_active', 'created_at', 'updated_at',
+    ],
+).as_view()
+
+resource_list_api = ReadOnlyEndpoint(
+    ResourceModel,
+    fields=[
+        'id', 'resource_name', 'year', 'month', 'working_days', 'present_day',
+        'present_hours', 'updated_at',
+    ],
+).as_view()
+
+allocation_list_api = ReadOnlyEndpoint(
+    ProjectResource,
+    fields=[
+        'id', 'project', 'resource', 'present_day', 'billable_days', 'billable_hours',
+        'non_billable_days', 'non_billable_hours', 'is_active', 'created_at', 'updated_at',
+    ],
+    month_prefix='project__',
+    foreign_keys=('project', 'resource'),
+).as_view()
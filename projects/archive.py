@@ -0,0 +1,115 @@
+from dataclasses import dataclass
+from datetime import date
+from itertools import islice
+
+from django.db import connections, router, transaction
+from django.db.models import Q
+
+from resources.archive import clear_archive_cache
+from resources.models import ArchivedResource, ArchivedYear, ResourceModel
+from resources.signals import resources_bulk_changed
+from .models import ArchivedProject, ArchivedProjectResource, MonthlyRollup, Project, ProjectResource
+
+RESOURCE_FIELDS = ['id', 'resource_name', 'working_days', 'present_day', 'present_hours',
+                   'year', 'month', 'updated_at', 'person_id']
+PROJECT_FIELDS = ['id', 'project_name', 'project_type', 'year', 'month', 'present_day', 'billable_days',
+                  'non_billable_days', 'billable_hours', 'non_billable_hours', 'is_active', 'created_at',
+                  'updated_at']
+ALLOCATION_FIELDS = ['id', 'project_id', 'resource_id', 'present_day', 'billable_days', 'billable_hours',
+                     'non_billable_days', 'non_billable_hours', 'is_active', 'created_at', 'updated_at']
+
+
+class ArchiveError(Exception):
+    pass
+
+
+@dataclass
+class ArchiveResult:
+    year: int
+    resources: int = 0
+    projects: int = 0
+    allocations: int = 0
+
+
+def _copy(queryset, fields, archive_model, batch_size, **overrides):
+    copied = 0
+    rows = queryset.order_by('pk').values(*fields).iterator(chunk_size=batch_size)
+    while batch := list(islice(rows, batch_size)):
+        archive_model.objects.bulk_create(
+            [archive_model(**{**row, **{key: value(row) for key, value in overrides.items()}}) for row in batch],
+            batch_size=batch_size,
+        )
+        copied += len(batch)
+    return copied
+
+
+def _delete(queryset, batch_size):
+    # Plain DELETE statements rather than queryset.delete(): the rows live
+    # on in the archive, so neither the per-row delete signals (rollups,
+    # attendance, caches) nor the ORM's cascade collection must run.
+    model = queryset.model
+    table, pk = model._meta.db_table, model._meta.pk.column
+    connection = connections[router.db_for_write(model)]
+    # Read up front: the DELETEs must not run under an open cursor on the table
+    pks = list(queryset.order_by().values_list('pk', flat=True))
+    deleted = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(pks), batch_size):
+            batch = pks[start:start + batch_size]
+            cursor.execute(
+                f"DELETE FROM {connection.ops.quote_name(table)} "
+                f"WHERE {connection.ops.quote_name(pk)} IN ({', '.join(['%s'] * len(batch))})",
+                batch,
+            )
+            deleted += cursor.rowcount
+    return deleted
+
+
+def archive_year(year, batch_size=1000):
+    """
+    Move a closed year's resource rows, projects and allocations into the
+    archive tables, keeping their ids, in one transaction. Reads for the
+    year's months then go to the archive through the for_month() managers.
+
+    The year's monthly rollups are dropped (reports on archived months are
+    computed from the archive); attendance stays where it is.
+    """
+    if year >= date.today().year:
+        raise ArchiveError(f"{year} is not closed yet")
+    if ArchivedYear.objects.filter(year=year).exists():
+        raise ArchiveError(f"{year} is already archived")
+
+    result = ArchiveResult(year)
+    resources = ResourceModel.objects.filter(year=year)
+    projects = Project.objects.filter(year=year)
+    allocations = ProjectResource.objects.filter(project__year=year)
+    resource_ids = set(resources.values_list('pk', flat=True))
+
+    with transaction.atomic():
+        result.resources = _copy(resources, RESOURCE_FIELDS, ArchivedResource, batch_size)
+        result.projects = _copy(projects, PROJECT_FIELDS, ArchivedProject, batch_size)
+        # An allocation pointing at another year's resource loses the link,
+        # as ProjectResource's SET_NULL would on deleting it.
+        result.allocations = _copy(
+            allocations, ALLOCATION_FIELDS, ArchivedProjectResource, batch_size,
+            resource_id=lambda row: row['resource_id'] if row['resource_id'] in resource_ids else None,
+        )
+
+        detached = ProjectResource.objects.filter(resource__year=year).exclude(project__year=year)
+        other_months = set(detached.values_list('project__year', 'project__month'))
+        detached.update(resource=None)
+        # Including the other years' rollups of the moved resources, which
+        # the detached allocations no longer count for
+        _delete(MonthlyRollup.objects.filter(Q(year=year) | Q(resource__year=year)), batch_size)
+        _delete(allocations, batch_size)
+        _delete(projects, batch_size)
+        _delete(resources, batch_size)
+        ArchivedYear.objects.create(year=year)
+
+        # In this order: a report rebuilt after the invalidation must already
+        # read the archive
+        transaction.on_commit(clear_archive_cache)
+        transaction.on_commit(lambda: resources_bulk_changed.send(
+            sender=ResourceModel, months={(year, month) for month in range(1, 13)} | other_months
+        ))
+    return result
@@ -0,0 +1,130 @@
+import calendar
+import csv
+
+from resources.archive import archived_years
+from .models import ArchivedProjectResource, Project, ProjectResource
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # XLSX export is optional
+    Workbook = None
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_HEADER = [
+    'Year',
+    'Month',
+    'Project',
+    'Project Type',
+    'Resource',
+    'Present Days',
+    'Billable Days',
+    'Billable Hours',
+    'Non-Billable Days',
+    'Non-Billable Hours',
+]
+
+
+class XLSXUnavailable(Exception):
+    pass
+
+
+def _allocation_sources(year):
+    # Archived years precede the live ones, so the archive is read first
+    archived = archived_years()
+    if year is not None:
+        return [ArchivedProjectResource if year in archived else ProjectResource]
+    return ([ArchivedProjectResource] if archived else []) + [ProjectResource]
+
+
+def export_rows(year=None, month=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield one row per active allocation (project × resource), optionally
+    restricted to a year and month, streamed from the database in chunks
+    so memory stays flat however much history is exported. Archived years
+    are read from the archive tables.
+    """
+    for model in _allocation_sources(year):
+        yield from _export_rows(model, year, month, chunk_size)
+
+
+def _export_rows(model, year, month, chunk_size):
+    allocations = model.objects.filter(
+        is_active=True, project__isnull=False, project__is_active=True
+    )
+    if year is not None:
+        allocations = allocations.filter(project__year=year)
+    if month is not None:
+        allocations = allocations.filter(project__month=month)
+
+    project_types = dict(Project.PROJECT_TYPE_CHOICES)
+    rows = allocations.order_by(
+        'project__year', 'project__month', 'project__project_name', 'resource__resource_name', 'pk'
+    ).values_list(
+        'project__year',
+        'project__month',
+        'project__project_name',
+        'project__project_type',
+        'resource__resource_name',
+        'present_day',
+        'billable_days',
+        'billable_hours',
+        'non_billable_days',
+        'non_billable_hours',
+    )
+    for row in rows.iterator(chunk_size=chunk_size):
+        year_, month_, project_name, project_type, resource_name, *numbers = row
+        yield [
+            year_,
+            calendar.month_name[month_],
+            project_name,
+            project_types.get(project_type, project_type),
+            resource_name or '',
+            *numbers,
+        ]
+
+
+class _Echo:
+    """
+    File-like object whose write() returns the value, so csv.writer can
+    produce lines for a streaming response.
+    """
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_HEADER)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_csv(rows, stream):
+    writer = csv.writer(stream)
+    writer.writerow(EXPORT_HEADER)
+    writer.writerows(rows)
+
+
+def write_xlsx(rows, stream):
+    """
+    Write rows to an XLSX file with openpyxl's write-only workbook, which
+    spools rows to disk instead of keeping them in memory.
+    """
+    if Workbook is None:
+        raise XLSXUnavailable("XLSX export requires the openpyxl package")
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Production Report')
+    sheet.append(EXPORT_HEADER)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(stream)
+
+
+def export_filename(year=None, month=None, extension='csv'):
+    parts = ['production_report']
+    if year is not None:
+        parts.append(str(year))
+    if month is not None:
+        parts.append(f"{month:02}")
+    return f"{'_'.join(parts)}.{extension}"
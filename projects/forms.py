@@ -1,14 +1,43 @@
 from django import forms
 from django.forms import inlineformset_factory, BaseInlineFormSet
-from .models import ProjectModel, ProjectResource
+from django.utils.functional import SimpleLazyObject, cached_property
+from .models import Project, ProjectResource
+from resources.closing import closed_month_message, is_month_closed
 from resources.models import ResourceModel
+from resources.widgets import ResourceAutocompleteSelect
+
+
+def allocation_errors(present_day, billable_days, non_billable_days):
+    """
+    Validation messages for one allocation's day counts (empty when valid).
+    Shared by ProjectResourceForm and the batch allocation grid.
+    """
+    present_day = present_day or 0
+    billable_days = billable_days or 0
+    non_billable_days = non_billable_days or 0
+    errors = []
+
+    if present_day < 0:
+        errors.append("Present days cannot be negative")
+
+    if billable_days < 0:
+        errors.append("Billable days cannot be negative")
+
+    if non_billable_days < 0:
+        errors.append("Non-billable days cannot be negative")
+
+    if billable_days + non_billable_days > present_day:
+        errors.append("Sum of billable and non-billable days cannot exceed present days")
+
+    return errors
+
  
 class ProjectResourceForm(forms.ModelForm):
     class Meta:
         model = ProjectResource
         fields = ['resource', 'present_day', 'billable_days', 'non_billable_days']
         widgets = {
-            'resource': forms.Select(attrs={
+            'resource': ResourceAutocompleteSelect(attrs={
                 'class': 'form-select resource-select',
                 'required': 'required'
             }),
@@ -37,34 +66,39 @@ class ProjectResourceForm(forms.ModelForm):
             'billable_days': 'Billable Days',
             'non_billable_days': 'Non-Billable Days',
         }
+
+    def __init__(self, *args, resource_scope=None, resource_labels=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['resource'].queryset = ResourceModel.objects.only('id', 'resource_name')
+        widget = self.fields['resource'].widget
+        # Offer the resources of the project's month first
+        if resource_scope:
+            widget.year, widget.month = resource_scope
+        if resource_labels is not None:
+            widget.labels = resource_labels
  
     def clean(self):
         cleaned_data = super().clean()
 
-        present_day = cleaned_data.get('present_day', 0)
-
-        billable_days = cleaned_data.get('billable_days', 0)
-        non_billable_days = cleaned_data.get('non_billable_days', 0)
-       
-        if present_day < 0:
-            raise forms.ValidationError("Present days cannot be negative")
-           
-        if billable_days < 0:
-            raise forms.ValidationError("Billable days cannot be negative")
-           
-        if non_billable_days < 0:
-            raise forms.ValidationError("Non-billable days cannot be negative")
-           
-        if billable_days + non_billable_days > present_day:
-            raise forms.ValidationError(
-                "Sum of billable and non-billable days cannot exceed present days"
-            )
+        errors = allocation_errors(
+            cleaned_data.get('present_day', 0),
+            cleaned_data.get('billable_days', 0),
+            cleaned_data.get('non_billable_days', 0),
+        )
+        if errors:
+            raise forms.ValidationError(errors[0])
            
+        billable_days = cleaned_data.get('billable_days') or 0
+        non_billable_days = cleaned_data.get('non_billable_days') or 0
+
         # Calculate hours
         cleaned_data['billable_hours'] = billable_days * 8
         cleaned_data['non_billable_hours'] = non_billable_days * 8
            
         return cleaned_data
+
+
+class ProjectForm(forms.ModelForm):
    
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -74,12 +108,12 @@ class ProjectResourceForm(forms.ModelForm):
         if 'non_billable_days' not in self.initial:
             self.initial['non_billable_days'] = 0
            
-        # Set initial resources if instance exists
-        if self.instance and self.instance.pk:
-            self.fields['resources'].initial = self.instance.resources.all()
+        # The initial resources come from the instance via model_to_dict
+        # (served by with_resource_names()' prefetch when present)
+        self.fields['resources'].queryset = ResourceModel.objects.only('id', 'resource_name')
            
     class Meta:
-        model = ProjectModel
+        model = Project
         fields = ['project_name', 'project_type', 'billable_days', 'non_billable_days', 'resources']
         widgets = {
             'project_name': forms.TextInput(attrs={
@@ -123,12 +157,38 @@ class ProjectResourceForm(forms.ModelForm):
        
         if billable_days < 0 or non_billable_days < 0:
             raise forms.ValidationError("Days cannot be negative")
+
+        year, month = self.instance.year, self.instance.month
+        if year and month and is_month_closed(year, month):
+            raise forms.ValidationError(closed_month_message(year, month))
            
         return cleaned_data
  
 class ProjectResourceFormSet(BaseInlineFormSet):
+    def get_form_kwargs(self, index):
+        kwargs = super().get_form_kwargs(index)
+        if self.instance.year and self.instance.month:
+            kwargs['resource_scope'] = (self.instance.year, self.instance.month)
+        kwargs['resource_labels'] = SimpleLazyObject(lambda: self.resource_labels)
+        return kwargs
+
+    @cached_property
+    def resource_labels(self):
+        """
+        Names of the resources selected in any row, fetched in one query
+        (id/resource_name only) and shared by every row's resource select.
+        """
+        selected = {form['resource'].value() for form in self.forms} - {None, ''}
+        return {
+            str(pk): name
+            for pk, name in ResourceModel.objects.filter(pk__in=selected).values_list('pk', 'resource_name')
+        }
+
     def clean(self):
         super().clean()
+        year, month = self.instance.year, self.instance.month
+        if year and month and is_month_closed(year, month):
+            raise forms.ValidationError(closed_month_message(year, month))
         for form in self.forms:
             if not hasattr(form, 'cleaned_data') or not form.cleaned_data:
                 continue
@@ -139,7 +199,7 @@ class ProjectResourceFormSet(BaseInlineFormSet):
  
 # Create the formset for ProjectResource
 ProjectResourceFormSet = inlineformset_factory(
-    ProjectModel,
+    Project,
     ProjectResource,
     form=ProjectResourceForm,
     formset=ProjectResourceFormSet,
@@ -149,3 +209,34 @@ ProjectResourceFormSet = inlineformset_factory(
     validate_min=True
 )
  
+
+
+class JobForm(forms.Form):
+    """
+    Background job queued from the web UI (see resources.jobs); imports
+    are queued by the resource import form instead.
+    """
+
+    KIND_CHOICES = [
+        ('export_report', 'Export the production report'),
+        ('rebuild_rollups', 'Rebuild the monthly rollups'),
+        ('refresh_snapshot', 'Re-render a closed month snapshot'),
+    ]
+
+    kind = forms.ChoiceField(choices=KIND_CHOICES)
+    year = forms.IntegerField(required=False, min_value=1)
+    month = forms.IntegerField(required=False, min_value=1, max_value=12)
+    format = forms.ChoiceField(choices=[('csv', 'CSV'), ('xlsx', 'XLSX')], required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        has_month = cleaned_data.get('year') and cleaned_data.get('month')
+        if cleaned_data.get('kind') == 'refresh_snapshot' and not has_month:
+            raise forms.ValidationError("A snapshot refresh needs a year and a month")
+        return cleaned_data
+
+    def job_params(self):
+        params = {name: self.cleaned_data.get(name) for name in ('year', 'month')}
+        if self.cleaned_data['kind'] == 'export_report':
+            params['format'] = self.cleaned_data.get('format') or 'csv'
+        return params
@@ -0,0 +1,152 @@
+import math
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.utils import timezone
+
+from resources.closing import closed_month_message, is_month_closed
+from resources.models import ResourceModel
+from .forms import allocation_errors
+from .models import Project, ProjectResource
+from .report_cache import invalidate_month
+from .rollups import rebuild_rollups
+
+DAY_FIELDS = ['present_day', 'billable_days', 'non_billable_days']
+
+
+@dataclass
+class GridResult:
+    created: int = 0
+    updated: int = 0
+    errors: list = field(default_factory=list)
+
+
+def month_grid(year, month):
+    """
+    The month's allocation grid: its projects, its resources and one cell
+    per existing allocation, in three queries. An archived month is read
+    from the archive.
+    """
+    projects = Project.objects.for_month(year, month).filter(is_active=True).order_by('project_name')
+    resources = ResourceModel.objects.for_month(year, month).order_by('resource_name')
+    cells = ProjectResource.objects.for_month(year, month).filter(
+        project__is_active=True, is_active=True
+    ).order_by()
+    return {
+        'year': year,
+        'month': month,
+        'projects': [
+            {'id': pk, 'project_name': name} for pk, name in projects.values_list('pk', 'project_name')
+        ],
+        'resources': [
+            {'id': pk, 'resource_name': name, 'present_day': present_day}
+            for pk, name, present_day in resources.values_list('pk', 'resource_name', 'present_day')
+        ],
+        'cells': [
+            {'project': project, 'resource': resource, **dict(zip(DAY_FIELDS, days))}
+            for project, resource, *days in cells.values_list('project_id', 'resource_id', *DAY_FIELDS)
+        ],
+    }
+
+
+def _cell_error(result, index, change, messages):
+    result.errors.append({
+        'index': index,
+        'project': change.get('project') if isinstance(change, dict) else None,
+        'resource': change.get('resource') if isinstance(change, dict) else None,
+        'messages': messages,
+    })
+
+
+def _is_id(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def apply_grid_changes(year, month, changes, batch_size=500):
+    """
+    Apply a batch of changed cells to a month's allocations.
+
+    Each change is a dict with ``project`` and ``resource`` ids plus any of
+    present_day, billable_days and non_billable_days; omitted values keep
+    their current value (0 for a new cell). Every cell is validated in
+    memory first; if any is invalid nothing is written and the errors are
+    returned. Otherwise existing allocations are written with one
+    bulk_update and new ones with one bulk_create, in a single transaction.
+    Nothing is written to a closed month.
+    """
+    result = GridResult()
+    if is_month_closed(year, month):
+        result.errors.append({'messages': [closed_month_message(year, month)]})
+        return result
+    project_ids = set(
+        Project.objects.filter(year=year, month=month, is_active=True).values_list('pk', flat=True)
+    )
+    resource_ids = set(
+        ResourceModel.objects.filter(year=year, month=month).values_list('pk', flat=True)
+    )
+    existing = {
+        (allocation.project_id, allocation.resource_id): allocation
+        for allocation in ProjectResource.objects.filter(project__in=project_ids)
+    }
+
+    pending = {}
+    for index, change in enumerate(changes):
+        if not isinstance(change, dict):
+            _cell_error(result, index, change, ["Each change must be an object"])
+            continue
+        key = (change.get('project'), change.get('resource'))
+        if not (_is_id(key[0]) and _is_id(key[1])):
+            _cell_error(result, index, change, ["Project and resource must be integer ids"])
+            continue
+        if key[0] not in project_ids:
+            _cell_error(result, index, change, ["Unknown project for this month"])
+            continue
+        if key[1] not in resource_ids:
+            _cell_error(result, index, change, ["Unknown resource for this month"])
+            continue
+
+        allocation = pending.get(key) or existing.get(key) or ProjectResource(project_id=key[0], resource_id=key[1])
+        try:
+            values = {
+                name: float(change[name]) if name in change else getattr(allocation, name)
+                for name in DAY_FIELDS
+            }
+        except (TypeError, ValueError):
+            _cell_error(result, index, change, ["Day values must be numbers"])
+            continue
+        if not all(math.isfinite(value) for value in values.values()):
+            _cell_error(result, index, change, ["Day values must be finite numbers"])
+            continue
+        messages = allocation_errors(values['present_day'], values['billable_days'], values['non_billable_days'])
+        if messages:
+            _cell_error(result, index, change, messages)
+            continue
+
+        for name, value in values.items():
+            setattr(allocation, name, value)
+        # bulk_create/bulk_update skip ProjectResource.save() and auto_now
+        allocation.billable_hours = allocation.billable_days * 8
+        allocation.non_billable_hours = allocation.non_billable_days * 8
+        allocation.is_active = True
+        allocation.updated_at = timezone.now()
+        pending[key] = allocation
+
+    if result.errors:
+        return result
+
+    to_create = [allocation for allocation in pending.values() if allocation.pk is None]
+    to_update = [allocation for allocation in pending.values() if allocation.pk is not None]
+    with transaction.atomic():
+        ProjectResource.objects.bulk_create(to_create, batch_size=batch_size)
+        ProjectResource.objects.bulk_update(
+            to_update,
+            DAY_FIELDS + ['billable_hours', 'non_billable_hours', 'is_active', 'updated_at'],
+            batch_size=batch_size,
+        )
+        # Bulk writes skip the signals that maintain rollups and the report cache
+        rebuild_rollups(year, month)
+        transaction.on_commit(lambda: invalidate_month(year, month))
+
+    result.created = len(to_create)
+    result.updated = len(to_update)
+    return result
@@ -0,0 +1,55 @@
+from resources.jobs import job_file_path, job_handler
+from .exports import export_filename, export_rows, write_csv, write_xlsx
+from .rollups import rebuild_rollups
+from .snapshots import refresh_snapshot
+
+# Export progress is reported every this many rows
+EXPORT_PROGRESS_ROWS = 1000
+
+
+class _CountedRows:
+    """
+    Iterates ``rows``, reporting how many were read to ``progress``.
+    """
+
+    def __init__(self, rows, progress):
+        self.rows = rows
+        self.progress = progress
+        self.count = 0
+
+    def __iter__(self):
+        for row in self.rows:
+            self.count += 1
+            if self.count % EXPORT_PROGRESS_ROWS == 0:
+                self.progress(self.count)
+            yield row
+        self.progress(self.count)
+
+
+@job_handler('export_report')
+def export_report_job(job, progress, year=None, month=None, format='csv'):
+    """
+    Write the production report to ``exports/<job id>/`` under the job
+    files root; the result names the file for job_download.
+    """
+    filename = export_filename(year, month, format)
+    path = job_file_path('exports', str(job.pk), filename)
+    rows = _CountedRows(export_rows(year, month), progress)
+    if format == 'xlsx':
+        with path.open('wb') as stream:
+            write_xlsx(rows, stream)
+    else:
+        with path.open('w', newline='', encoding='utf-8') as stream:
+            write_csv(rows, stream)
+    return {'file': f'exports/{job.pk}/{filename}', 'filename': filename, 'rows': rows.count}
+
+
+@job_handler('rebuild_rollups')
+def rebuild_rollups_job(job, progress, year=None, month=None):
+    return {'rows': rebuild_rollups(year, month)}
+
+
+@job_handler('refresh_snapshot')
+def refresh_snapshot_job(job, progress, year, month):
+    report = refresh_snapshot(year, month)
+    return {'projects': report['team']['project_count']}
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.archive import ArchiveError, archive_year
+
+
+class Command(BaseCommand):
+    help = "Move a closed year's resources, projects and allocations into the archive tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument('year', type=int, help="Year to archive (must be before the current year)")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            result = archive_year(options['year'], batch_size=options['batch_size'])
+        except ArchiveError as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {result.year}: {result.resources} resources, {result.projects} projects, "
+            f"{result.allocations} allocations"
+        ))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.snapshots import SnapshotError, close_month, refresh_snapshot, snapshot_path
+
+
+class Command(BaseCommand):
+    help = "Close a finished month: lock its rows and write its report snapshot"
+
+    def add_arguments(self, parser):
+        parser.add_argument('year', type=int)
+        parser.add_argument('month', type=int, choices=range(1, 13))
+        parser.add_argument('--refresh', action='store_true', help="Re-render the snapshot of an already closed month")
+
+    def handle(self, *args, **options):
+        year, month = options['year'], options['month']
+        try:
+            report = (refresh_snapshot if options['refresh'] else close_month)(year, month)
+        except SnapshotError as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(self.style.SUCCESS(
+            f"Closed {month}/{year}: {report['team']['project_count']} projects, "
+            f"snapshot in {snapshot_path(year, month, 'json').parent}"
+        ))
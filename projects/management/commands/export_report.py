@@ -0,0 +1,38 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.exports import XLSXUnavailable, export_filename, export_rows, write_csv, write_xlsx
+
+
+class Command(BaseCommand):
+    help = "Export the production report (projects × resources) as CSV or XLSX"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, help="Limit to one year (default: all years)")
+        parser.add_argument('--month', type=int, choices=range(1, 13), help="Limit to one month")
+        parser.add_argument('--format', choices=['csv', 'xlsx'], default='csv')
+        parser.add_argument('--output', help="Output path; '-' writes CSV to stdout (default: generated file name)")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        year, month, fmt = options['year'], options['month'], options['format']
+        output = options['output'] or export_filename(year, month, fmt)
+        rows = export_rows(year, month, chunk_size=options['chunk_size'])
+
+        if output == '-':
+            if fmt == 'xlsx':
+                raise CommandError("XLSX cannot be written to stdout")
+            write_csv(rows, sys.stdout)
+            return
+
+        try:
+            if fmt == 'xlsx':
+                with open(output, 'wb') as stream:
+                    write_xlsx(rows, stream)
+            else:
+                with open(output, 'w', newline='', encoding='utf-8') as stream:
+                    write_csv(rows, stream)
+        except XLSXUnavailable as exc:
+            raise CommandError(exc)
+        self.stdout.write(self.style.SUCCESS(f"Report written to {output}"))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.rollups import rebuild_rollups, verify_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the monthly rollups from the allocations and verify them"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, help="Limit to one year (default: all years)")
+        parser.add_argument('--month', type=int, choices=range(1, 13), help="Limit to one month")
+        parser.add_argument('--check', action='store_true', help="Only verify the stored rollups, do not rebuild")
+
+    def handle(self, *args, **options):
+        year, month = options['year'], options['month']
+        if not options['check']:
+            count = rebuild_rollups(year, month)
+            self.stdout.write(f"Rebuilt {count} rollup rows")
+
+        problems = verify_rollups(year, month)
+        for problem in problems:
+            self.stderr.write(problem)
+        if problems:
+            raise CommandError(f"{len(problems)} rollup differences found")
+        self.stdout.write(self.style.SUCCESS("Rollups verified"))
@@ -0,0 +1,44 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from projects.routers import read_database
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database into the read database with SQLite's "
+        "online backup API (a local stand-in for replication)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', help="Read alias to refresh (default: REPORT_READ_DATABASE)")
+        parser.add_argument('--interval', type=float, help="Keep refreshing every N seconds")
+
+    def handle(self, *args, **options):
+        alias = options['database'] or read_database()
+        if not alias:
+            raise CommandError("No read database configured (set REPORT_READ_DATABASE)")
+        source = connections[DEFAULT_DB_ALIAS]
+        target = connections[alias]
+        if source.vendor != 'sqlite' or target.vendor != 'sqlite':
+            raise CommandError("refresh_read_database only copies SQLite databases")
+
+        while True:
+            start = time.perf_counter()
+            self.refresh(source, target)
+            self.stdout.write(f"Refreshed {alias} in {(time.perf_counter() - start) * 1000:.0f} ms")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def refresh(self, source, target):
+        source.ensure_connection()
+        target.close()
+        destination = sqlite3.connect(target.settings_dict['NAME'])
+        try:
+            source.connection.backup(destination)
+        finally:
+            destination.close()
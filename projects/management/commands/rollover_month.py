@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.rollover import roll_over_month
+from resources.closing import MonthClosed
+
+
+class Command(BaseCommand):
+    help = "Copy a month's resources, active projects and allocations into the next month"
+
+    def add_arguments(self, parser):
+        parser.add_argument('year', type=int, help="Year of the month to copy from")
+        parser.add_argument('month', type=int, choices=range(1, 13), help="Month to copy from")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            result = roll_over_month(options['year'], options['month'], batch_size=options['batch_size'])
+        except MonthClosed as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(self.style.SUCCESS(
+            f"Rolled over into {result.month}/{result.year}: {result.resources} resources, "
+            f"{result.projects} projects, {result.allocations} allocations created"
+        ))
@@ -0,0 +1,173 @@
+import json
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+from django.urls import reverse
+
+from projects.exports import export_rows
+from projects.reports import build_month_report
+from resources.models import ResourceModel
+from resources.working_calendar import clear_calendar_cache
+
+DEFAULT_BASELINE = Path(__file__).resolve().parents[3] / 'benchmarks' / 'baseline.json'
+
+
+def benchmark_caches():
+    """
+    A private in-memory cache for every configured alias. The cases clear
+    caches and bump the shared generations (calendar, reports), which must
+    not reach the caches the running site shares.
+    """
+    return {
+        alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'benchmark-{alias}'}
+        for alias in settings.CACHES
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the main views and code paths against the current database "
+        "(see seed_benchmark_data) and compare with a JSON baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+        parser.add_argument('--update-baseline', action='store_true', help="Write the results as the new baseline")
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per case (median is reported)")
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help="Allowed relative slowdown / memory growth before flagging a regression")
+
+    def handle(self, *args, **options):
+        latest = ResourceModel.objects.order_by('-year', '-month').values_list('year', 'month').first()
+        if latest is None:
+            raise CommandError("No data to benchmark; run seed_benchmark_data first")
+
+        try:
+            setup_test_environment()
+            own_environment = True
+        except RuntimeError:  # already set up, e.g. under the test runner
+            own_environment = False
+        try:
+            with override_settings(CACHES=benchmark_caches()):
+                for alias in settings.CACHES:
+                    caches[alias].clear()
+                # Roll back everything the benchmarks write (users, saved resources)
+                with transaction.atomic():
+                    results = self.run_cases(*latest, options['repeat'])
+                    transaction.set_rollback(True)
+        finally:
+            if own_environment:
+                teardown_test_environment()
+
+        baseline_path = Path(options['baseline'])
+        baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+        regressions = []
+        for name, result in results.items():
+            problems = self.compare(result, baseline.get(name), options['tolerance'])
+            regressions.extend(f"{name}: {problem}" for problem in problems)
+            flag = self.style.ERROR(" REGRESSION") if problems else ""
+            self.stdout.write(
+                f"{name:<28} {result['queries']:>5} queries {result['ms']:>10.2f} ms "
+                f"{result['peak_kb']:>10.1f} KiB peak{flag}"
+            )
+
+        if options['update_baseline']:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(results, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {baseline_path}"))
+        elif regressions:
+            raise CommandError("Regressions against the baseline:\n" + "\n".join(regressions))
+
+    def compare(self, result, expected, tolerance):
+        if not expected:
+            return []
+        problems = []
+        if result['queries'] > expected['queries']:
+            problems.append(f"{result['queries']} queries, baseline {expected['queries']}")
+        for metric, unit in (('ms', 'ms'), ('peak_kb', 'KiB')):
+            if result[metric] > expected[metric] * (1 + tolerance):
+                problems.append(f"{result[metric]:.1f} {unit}, baseline {expected[metric]:.1f} {unit}")
+        return problems
+
+    def cases(self, year, month):
+        client = Client()
+        client.force_login(User.objects.create_superuser('benchmark', 'benchmark@example.com', None))
+        month_params = {'year': year, 'month': month}
+
+        def get(url, params=None):
+            def run():
+                response = client.get(url, params or {})
+                if response.streaming:
+                    for _ in response.streaming_content:
+                        pass
+                assert response.status_code == 200, f"{url} returned {response.status_code}"
+            return run
+
+        def save_resource():
+            ResourceModel(resource_name='Benchmark', year=year, month=month, present_day=20).save()
+
+        def working_days():
+            clear_calendar_cache()
+            for month_ in range(1, 13):
+                ResourceModel.get_working_days(year, month_)
+
+        return {
+            'resource_list': get(reverse('resource_list'), month_params),
+            'resource_list_json': get(reverse('resource_list'), {**month_params, 'format': 'json'}),
+            'dashboard': get(reverse('dashboard_home')),
+            'month_report_view': (cache.clear, get(reverse('month_report', args=[year, month]))),
+            'month_report_build': lambda: build_month_report(year, month),
+            'admin_projects': get(reverse('admin:projects_project_changelist')),
+            'admin_allocations': get(reverse('admin:projects_projectresource_changelist')),
+            'resource_save': save_resource,
+            'get_working_days': working_days,
+            'export_rows': lambda: sum(1 for _ in export_rows(year, month)),
+            'export_csv_view': get(reverse('export_report'), month_params),
+        }
+
+    def run_cases(self, year, month, repeat):
+        results = {}
+        for name, case in self.cases(year, month).items():
+            setup, run = case if isinstance(case, tuple) else (None, case)
+
+            def once():
+                if setup:
+                    setup()
+                start = time.perf_counter()
+                run()
+                return time.perf_counter() - start
+
+            once()  # warm up
+            if setup:
+                setup()
+            with CaptureQueriesContext(connection) as queries:
+                run()
+            # Read now: later requests reset connection.queries
+            query_count = len(queries)
+
+            timings = [once() for _ in range(repeat)]
+
+            if setup:
+                setup()
+            tracemalloc.start()
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            results[name] = {
+                'queries': query_count,
+                'ms': round(statistics.median(timings) * 1000, 3),
+                'peak_kb': round(peak / 1024, 1),
+            }
+        return results
@@ -0,0 +1,88 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from projects.models import Project, ProjectResource
+from projects.report_cache import invalidate_month
+from projects.rollover import next_month
+from projects.rollups import rebuild_rollups
+from resources.attendance import sync_attendance
+from resources.models import ResourceModel
+from resources.working_calendar import get_month_calendar
+
+
+class Command(BaseCommand):
+    help = "Generate synthetic resources, projects and allocations for benchmarking"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--resources', type=int, default=200, help="Resources per month")
+        parser.add_argument('--months', type=int, default=12)
+        parser.add_argument('--projects', type=int, default=20, help="Projects per month")
+        parser.add_argument('--start-year', type=int, default=2020)
+        parser.add_argument('--start-month', type=int, default=1, choices=range(1, 13))
+        parser.add_argument('--seed', type=int, default=0, help="Random seed, for reproducible data")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        year, month = options['start_year'], options['start_month']
+        totals = [0, 0, 0]
+
+        for _ in range(options['months']):
+            with transaction.atomic():
+                counts = self.seed_month(rng, year, month, options['resources'], options['projects'], batch_size)
+                # bulk_create skips the signals that maintain rollups and the report cache
+                rebuild_rollups(year, month)
+                transaction.on_commit(lambda year=year, month=month: invalidate_month(year, month))
+            totals = [total + count for total, count in zip(totals, counts)]
+            year, month = next_month(year, month)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {totals[0]} resources, {totals[1]} projects and {totals[2]} allocations"
+        ))
+
+    def seed_month(self, rng, year, month, resource_count, project_count, batch_size):
+        working_days = get_month_calendar(year, month).working_days
+
+        resources = []
+        for i in range(resource_count):
+            present_day = max(working_days - rng.choice([0, 0, 0, 0.5, 1, 2, 3]), 0)
+            resources.append(ResourceModel(
+                resource_name=f"Resource {i:05}", year=year, month=month,
+                working_days=working_days, present_day=present_day, present_hours=present_day * 8,
+            ))
+        resources = ResourceModel.objects.bulk_create(resources, batch_size=batch_size)
+        sync_attendance(resources, batch_size=batch_size)
+
+        Project.objects.bulk_create(
+            [
+                Project(
+                    project_name=f"Project {i:04}", year=year, month=month,
+                    project_type='FIXED_COST' if rng.random() < 0.2 else 'REGULAR',
+                    is_active=rng.random() > 0.05,
+                )
+                for i in range(project_count)
+            ],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        projects = list(Project.objects.filter(year=year, month=month))
+
+        # Most people work on one project, some split their month over two or three
+        allocations = []
+        for resource in resources:
+            assigned = rng.sample(projects, k=min(rng.choice([1, 1, 1, 2, 3]), len(projects)))
+            remaining = resource.present_day
+            for index, project in enumerate(assigned):
+                share = remaining if index == len(assigned) - 1 else round(remaining * rng.uniform(0.2, 0.8) * 2) / 2
+                remaining -= share
+                billable = round(share * rng.uniform(0.5, 1) * 2) / 2
+                allocations.append(ProjectResource(
+                    project=project, resource=resource, present_day=share,
+                    billable_days=billable, billable_hours=billable * 8,
+                    non_billable_days=share - billable, non_billable_hours=(share - billable) * 8,
+                ))
+        ProjectResource.objects.bulk_create(allocations, batch_size=batch_size, ignore_conflicts=True)
+        return len(resources), len(projects), len(allocations)
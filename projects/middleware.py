@@ -0,0 +1,251 @@
+import contextvars
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template as DjangoTemplate
+
+from .routers import STICKY_COOKIE
+
+logger = logging.getLogger(__name__)
+
+# Per-view budgets keyed by URL name; override with settings.PERFORMANCE_BUDGETS.
+# "queries" is the maximum number of SQL queries, "ms" the maximum wall time.
+# Views reading by month may also spend a query re-reading the archived years
+# or the closed months, when their shared cache entry has expired (after an
+# hour by default) or been dropped by archive_year or close_month.
+DEFAULT_BUDGETS = {
+    'dashboard_home': {'queries': 0, 'ms': 200},
+    # Conditional GET pages spend one query on the freshness check
+    'month_report': {'queries': 5, 'ms': 200},
+    # Only queries on the request's connection are counted; outside a
+    # transaction the async report runs its queries on worker connections
+    'month_report_async': {'queries': 4, 'ms': 200},
+    # Closed months are served from their snapshot without any query
+    'month_report_page': {'queries': 4, 'ms': 200},
+    'report_cache_stats': {'queries': 0, 'ms': 50},
+    # Includes the queries run while the CSV streams
+    'export_report': {'queries': 2, 'ms': 500},
+    'allocation_grid': {'queries': 3, 'ms': 200},
+    'job_list': {'queries': 1, 'ms': 100},
+    'job_status': {'queries': 1, 'ms': 50},
+    'job_download': {'queries': 1, 'ms': 200},
+    'api_projects': {'queries': 2, 'ms': 200},
+    'api_resources': {'queries': 2, 'ms': 200},
+    'api_allocations': {'queries': 2, 'ms': 200},
+    'resource_list': {'queries': 4, 'ms': 200},
+    # Like month_report_async, page and count run on worker connections
+    'resource_list_async': {'queries': 2, 'ms': 200},
+    'resource_autocomplete': {'queries': 1, 'ms': 50},
+    # Forms may look up the month's holidays once before the calendar is memoized
+    'resource_create': {'queries': 1, 'ms': 200},
+    'resource_import': {'queries': 0, 'ms': 200},
+    'resource_update': {'queries': 2, 'ms': 200},
+    'resource_delete': {'queries': 1, 'ms': 200},
+}
+
+_current_stats = contextvars.ContextVar('request_stats', default=None)
+
+
+class PerformanceBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestStats:
+    """
+    Query count, DB time, template render time and slowest statements of
+    one request.
+    """
+
+    def __init__(self, keep_slowest=3):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.total_time = 0.0
+        self.slowest = []
+        self.keep_slowest = keep_slowest
+        self._template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper() hook
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.queries += 1
+            self.db_time += duration
+            self.slowest.append((duration, sql))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[self.keep_slowest:]
+
+    def server_timing(self):
+        return ", ".join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template_time * 1000:.1f}',
+            f'total;dur={self.total_time * 1000:.1f}',
+        ])
+
+    def as_dict(self):
+        return {
+            'queries': self.queries,
+            'db_ms': round(self.db_time * 1000, 2),
+            'template_ms': round(self.template_time * 1000, 2),
+            'total_ms': round(self.total_time * 1000, 2),
+            'slowest': [{'ms': round(duration * 1000, 2), 'sql': sql} for duration, sql in self.slowest],
+        }
+
+
+class _TimedTemplate(DjangoTemplate):
+
+    def render(self, context=None, request=None):
+        stats = _current_stats.get()
+        if stats is None or stats._template_depth:
+            return super().render(context, request)
+        stats._template_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_time += time.perf_counter() - start
+            stats._template_depth -= 1
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    The Django template backend, timing renders for PerformanceMiddleware.
+    Use it as TEMPLATES[0]['BACKEND'] ('projects.middleware.TimedDjangoTemplates');
+    with the stock backend the template time is not measured.
+    """
+
+    def from_string(self, template_code):
+        return _TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return _TimedTemplate(super().get_template(template_name).template, self)
+
+
+class PerformanceMiddleware:
+    """
+    Records per-request query counts, DB time, template render time and the
+    slowest SQL statements, reports them in a Server-Timing header and checks
+    them against the view's budget.
+
+    Settings:
+      PERFORMANCE_BUDGETS         budgets by URL name (default DEFAULT_BUDGETS)
+      PERFORMANCE_BUDGETS_STRICT  raise PerformanceBudgetExceeded instead of
+                                  logging a warning (for tests)
+      PERFORMANCE_LOG_FILE        append one JSON line per request to this file
+      PERFORMANCE_SLOWEST_QUERIES number of slowest statements kept (default 3)
+
+    Template time is only measured with the TimedDjangoTemplates backend.
+    Streaming responses are checked and logged once their body has been
+    sent, counting the queries run while it was generated; their
+    Server-Timing header only covers the view itself.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats(keep_slowest=getattr(settings, 'PERFORMANCE_SLOWEST_QUERIES', 3))
+        start = time.perf_counter()
+        with self.measure(stats):
+            response = self.get_response(request)
+        stats.total_time = time.perf_counter() - start
+
+        response['Server-Timing'] = stats.server_timing()
+        view_name = request.resolver_match.url_name if request.resolver_match else None
+        # A FileResponse may be sent by the server's file wrapper without
+        # iterating it; reading a file runs no queries anyway
+        if response.streaming and not response.is_async and getattr(response, 'file_to_stream', None) is None:
+            response.streaming_content = self.measure_stream(
+                response.streaming_content, stats, start, request, response, view_name
+            )
+        else:
+            self.finish(request, response, view_name, stats)
+        return response
+
+    @contextmanager
+    def measure(self, stats):
+        token = _current_stats.set(stats)
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(stats))
+                yield
+        finally:
+            _current_stats.reset(token)
+
+    def measure_stream(self, chunks, stats, start, request, response, view_name):
+        chunks = iter(chunks)
+        while True:
+            with self.measure(stats):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+        stats.total_time = time.perf_counter() - start
+        self.finish(request, response, view_name, stats)
+
+    def finish(self, request, response, view_name, stats):
+        self.log(request, response, view_name, stats)
+        self.check_budget(view_name, stats)
+
+    def check_budget(self, view_name, stats):
+        budget = getattr(settings, 'PERFORMANCE_BUDGETS', DEFAULT_BUDGETS).get(view_name)
+        if not budget:
+            return
+        problems = []
+        if 'queries' in budget and stats.queries > budget['queries']:
+            problems.append(f"{stats.queries} queries (budget {budget['queries']})")
+        if 'ms' in budget and stats.total_time * 1000 > budget['ms']:
+            problems.append(f"{stats.total_time * 1000:.1f} ms (budget {budget['ms']} ms)")
+        if not problems:
+            return
+        message = f"View {view_name} exceeded its budget: {', '.join(problems)}"
+        if getattr(settings, 'PERFORMANCE_BUDGETS_STRICT', False):
+            raise PerformanceBudgetExceeded(message)
+        logger.warning(message)
+
+    def log(self, request, response, view_name, stats):
+        path = getattr(settings, 'PERFORMANCE_LOG_FILE', None)
+        if not path:
+            return
+        record = {
+            'time': time.time(),
+            'method': request.method,
+            'path': request.path,
+            'view': view_name,
+            'status': response.status_code,
+            **stats.as_dict(),
+        }
+        with open(path, 'a', encoding='utf-8') as log_file:
+            log_file.write(json.dumps(record) + '\n')
+
+
+class ReadYourWritesMiddleware:
+    """
+    After any non-GET request, pins the client to the primary database for
+    READ_YOUR_WRITES_SECONDS (default 10) with a short-lived cookie, so
+    report views routed to the read database (see projects.routers) show
+    the client's own changes before the copy catches up.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE'):
+            response.set_cookie(
+                STICKY_COOKIE,
+                '1',
+                max_age=getattr(settings, 'READ_YOUR_WRITES_SECONDS', 10),
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.4 on 2025-08-04 10:12
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_alter_projectmodel_options_and_more'),
+        ('resources', '0003_resourcemodel_month_resourcemodel_year'),
+    ]
+
+    operations = [
+        migrations.RenameModel(
+            old_name='ProjectModel',
+            new_name='Project',
+        ),
+        migrations.AlterModelOptions(
+            name='project',
+            options={'ordering': ['-year', '-month', 'project_name'], 'verbose_name': 'Project', 'verbose_name_plural': 'Projects'},
+        ),
+        migrations.AlterModelTable(
+            name='project',
+            table='projects',
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='year',
+            field=models.PositiveIntegerField(default=2025, help_text='Enter the year for this project report (e.g., 2025)'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='month',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'January'), (2, 'February'), (3, 'March'), (4, 'April'), (5, 'May'), (6, 'June'), (7, 'July'), (8, 'August'), (9, 'September'), (10, 'October'), (11, 'November'), (12, 'December')], default=8, help_text='Enter the month for this project report (1–12)'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='present_day',
+            field=models.FloatField(default=0, help_text='Number of days the project was active', validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='billable_days',
+            field=models.FloatField(default=0, help_text='Number of billable days', validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='non_billable_days',
+            field=models.FloatField(default=0, help_text='Number of non-billable days', validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='billable_hours',
+            field=models.FloatField(default=0, editable=False, help_text='Auto-calculated from billable_days × 8'),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='non_billable_hours',
+            field=models.FloatField(default=0, editable=False, help_text='Auto-calculated from non_billable_days × 8'),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='is_active',
+            field=models.BooleanField(default=True, help_text='For soft deletion'),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='resources',
+            field=models.ManyToManyField(help_text='Multiple resources can be assigned to this project', related_name='assigned_projects', through='projects.ProjectResource', through_fields=('project', 'resource'), to='resources.resourcemodel'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='project',
+            unique_together={('project_name', 'year', 'month')},
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_rename_projectmodel_project_and_more'),
+        ('resources', '0005_resourcemodel_year_month_name_index'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='project',
+            unique_together=set(),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['year', 'month'], name='project_active_month_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectresource',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['resource', 'project'], name='active_allocation_resource_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='project',
+            constraint=models.UniqueConstraint(fields=('year', 'month', 'project_name'), name='unique_project_month'),
+        ),
+    ]
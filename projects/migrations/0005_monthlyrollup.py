@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_month_indexes'),
+        ('resources', '0005_resourcemodel_year_month_name_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('PROJECT', 'Project'), ('RESOURCE', 'Resource')], max_length=10)),
+                ('year', models.PositiveIntegerField()),
+                ('month', models.PositiveSmallIntegerField(choices=[(1, 'January'), (2, 'February'), (3, 'March'), (4, 'April'), (5, 'May'), (6, 'June'), (7, 'July'), (8, 'August'), (9, 'September'), (10, 'October'), (11, 'November'), (12, 'December')])),
+                ('billable_days', models.FloatField(default=0)),
+                ('non_billable_days', models.FloatField(default=0)),
+                ('billable_hours', models.FloatField(default=0)),
+                ('non_billable_hours', models.FloatField(default=0)),
+                ('headcount', models.PositiveIntegerField(default=0, help_text='Resources allocated to the project, or projects the resource is allocated to')),
+                ('utilization_percentage', models.FloatField(default=0, help_text='Billable hours against standard hours of the headcount, capped at 100')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='projects.project')),
+                ('resource', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='resources.resourcemodel')),
+            ],
+            options={
+                'verbose_name': 'Monthly Rollup',
+                'verbose_name_plural': 'Monthly Rollups',
+                'db_table': 'monthly_rollup',
+                'ordering': ['-year', '-month', 'kind'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('kind', 'PROJECT')), fields=('year', 'month', 'project'), name='unique_project_rollup'), models.UniqueConstraint(condition=models.Q(('kind', 'RESOURCE')), fields=('year', 'month', 'resource'), name='unique_resource_rollup')],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_monthlyrollup'),
+        ('resources', '0010_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedProject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('project_name', models.CharField(max_length=100)),
+                ('project_type', models.CharField(choices=[('REGULAR', 'Regular Project'), ('FIXED_COST', 'Fixed Cost Project')], max_length=20)),
+                ('year', models.PositiveIntegerField()),
+                ('month', models.PositiveSmallIntegerField(choices=[(1, 'January'), (2, 'February'), (3, 'March'), (4, 'April'), (5, 'May'), (6, 'June'), (7, 'July'), (8, 'August'), (9, 'September'), (10, 'October'), (11, 'November'), (12, 'December')])),
+                ('present_day', models.FloatField(default=0)),
+                ('billable_days', models.FloatField(default=0)),
+                ('non_billable_days', models.FloatField(default=0)),
+                ('billable_hours', models.FloatField(default=0)),
+                ('non_billable_hours', models.FloatField(default=0)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Archived project',
+                'verbose_name_plural': 'Archived projects',
+                'db_table': 'projects_archive',
+                'ordering': ['-year', '-month', 'project_name'],
+                'indexes': [models.Index(fields=['year', 'month', 'project_name'], name='archived_project_month_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedProjectResource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('present_day', models.FloatField(default=0)),
+                ('billable_days', models.FloatField(default=0)),
+                ('billable_hours', models.FloatField(default=0)),
+                ('non_billable_days', models.FloatField(default=0)),
+                ('non_billable_hours', models.FloatField(default=0)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('project', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='project_resources', to='projects.archivedproject')),
+                ('resource', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='project_allocations', to='resources.archivedresource')),
+            ],
+            options={
+                'verbose_name': 'Archived allocation',
+                'verbose_name_plural': 'Archived allocations',
+                'db_table': 'project_resource_archive',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+from django.db import migrations
+from django.db.models import Count, Sum, Value
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 1000
+# projects.models.STANDARD_HOURS when the reports started reading the rollups
+STANDARD_HOURS = 8 * 22
+TOTAL_FIELDS = ['billable_days', 'non_billable_days', 'billable_hours', 'non_billable_hours']
+
+
+def populate_rollups(apps, schema_editor):
+    """
+    Compute the monthly rollups of the allocations that existed before
+    MonthlyRollup was maintained, now that the reports read them.
+    """
+    MonthlyRollup = apps.get_model('projects', 'MonthlyRollup')
+    ProjectResource = apps.get_model('projects', 'ProjectResource')
+
+    MonthlyRollup.objects.all().delete()
+    allocations = ProjectResource.objects.filter(is_active=True, project__is_active=True).order_by()
+    totals = {field: Coalesce(Sum(field), Value(0.0)) for field in TOTAL_FIELDS}
+
+    rollups = []
+    for kind, group_field in [('PROJECT', 'project_id'), ('RESOURCE', 'resource_id')]:
+        rows = allocations.filter(**{f'{group_field}__isnull': False}).values(
+            group_field, 'project__year', 'project__month'
+        ).annotate(headcount=Count('pk'), **totals)
+        for row in rows:
+            capacity = STANDARD_HOURS * (row['headcount'] if kind == 'PROJECT' else 1)
+            rollups.append(MonthlyRollup(
+                kind=kind,
+                year=row['project__year'],
+                month=row['project__month'],
+                headcount=row['headcount'],
+                utilization_percentage=min(row['billable_hours'] / capacity * 100, 100) if capacity else 0,
+                **{group_field: row[group_field]},
+                **{field: row[field] for field in TOTAL_FIELDS},
+            ))
+    MonthlyRollup.objects.bulk_create(rollups, batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_archive'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,81 @@
 from django.db import models
-from resources.models import ResourceModel
+from django.db.models import Count, ExpressionWrapper, F, FloatField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Least
+from resources.models import ArchivedResource, ResourceModel
 from django.core.validators import MinValueValidator
 from django.urls import reverse
 import calendar
 
 # Create your models here.
 
+STANDARD_HOURS = 8 * 22  # Assuming 22 working days/month
+# Project fields the with_metrics() hour and day metrics are computed from
+METRIC_SOURCE_FIELDS = ('billable_days', 'non_billable_days', 'billable_hours', 'non_billable_hours')
+_NOT_ANNOTATED = object()
+
+
+class ProjectQuerySet(models.QuerySet):
+
+    def for_year(self, year):
+        """
+        The year's projects, read from the archive when the year has been
+        archived (see archive_year).
+        """
+        from resources.archive import is_archived
+        if is_archived(year):
+            return ArchivedProject.objects.filter(year=year)
+        return self.filter(year=year)
+
+    def for_month(self, year, month):
+        """
+        The month's projects, read from the archive when the year has been
+        archived (see archive_year). Start chains with it, since an archived
+        month's queryset is a fresh ArchivedProject one.
+        """
+        from resources.archive import is_archived
+        if is_archived(year):
+            return ArchivedProject.objects.filter(year=year, month=month)
+        return self.filter(year=year, month=month)
+
+    def with_resource_names(self):
+        """
+        Prefetch only the resource names used by Project.__str__.
+        """
+        return self.prefetch_related(
+            models.Prefetch(
+                'resources',
+                queryset=ResourceModel.objects.only('id', 'resource_name'),
+            )
+        )
+
+    def with_metrics(self):
+        """
+        Annotate total_hours, total_days, utilization_percentage and
+        resource_count as database expressions, so they can be ordered,
+        filtered and paginated on without extra queries per row.
+        """
+        total_hours = F('billable_hours') + F('non_billable_hours')
+        resource_count = (
+            ProjectResource.objects
+            .filter(project=OuterRef('pk'), resource__isnull=False)
+            .order_by()
+            .values('project')
+            .annotate(count=Count('pk'))
+            .values('count')
+        )
+        return self.annotate(
+            total_hours=ExpressionWrapper(total_hours, output_field=FloatField()),
+            total_days=ExpressionWrapper(
+                F('billable_days') + F('non_billable_days'), output_field=FloatField()
+            ),
+            utilization_percentage=Least(
+                ExpressionWrapper(total_hours * 100.0 / STANDARD_HOURS, output_field=FloatField()),
+                Value(100.0),
+            ),
+            resource_count=Coalesce(Subquery(resource_count), 0),
+        )
+
+
 class Project(models.Model):
     """
     Represents a project with multiple resources assigned to it,
@@ -35,6 +105,8 @@ class Project(models.Model):
 
     resources = models.ManyToManyField(
         ResourceModel,
+        through='ProjectResource',
+        through_fields=('project', 'resource'),
         related_name='assigned_projects',
         help_text="Multiple resources can be assigned to this project"
     )
@@ -73,35 +145,83 @@ class Project(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ProjectQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
         self.billable_hours = self.billable_days * 8
         self.non_billable_hours = self.non_billable_days * 8
         super().save(*args, **kwargs)
 
+    # The metric properties below prefer the values annotated by
+    # ProjectQuerySet.with_metrics() and only compute them when absent, or
+    # when a field they were computed from has changed since.
+
+    def _metric_sources(self):
+        return tuple(self.__dict__.get(name) for name in METRIC_SOURCE_FIELDS)
+
+    def _annotated_metric(self, name):
+        value, sources = self.__dict__.get(name, (_NOT_ANNOTATED, None))
+        return value if sources == self._metric_sources() else _NOT_ANNOTATED
+
+    def _annotate_metric(self, name, value):
+        self.__dict__[name] = (value, self._metric_sources())
+
     @property
     def total_hours(self):
+        value = self._annotated_metric('_total_hours')
+        if value is not _NOT_ANNOTATED:
+            return value
         return self.billable_hours + self.non_billable_hours
 
+    @total_hours.setter
+    def total_hours(self, value):
+        self._annotate_metric('_total_hours', value)
+
     @property
     def total_days(self):
+        value = self._annotated_metric('_total_days')
+        if value is not _NOT_ANNOTATED:
+            return value
         return self.billable_days + self.non_billable_days
 
+    @total_days.setter
+    def total_days(self, value):
+        self._annotate_metric('_total_days', value)
+
     @property
     def utilization_percentage(self):
-        standard_hours = 8 * 22  # Assuming 22 working days/month
-        if standard_hours == 0:
-            return 0
-        utilization = (self.total_hours / standard_hours) * 100
+        value = self._annotated_metric('_utilization_percentage')
+        if value is not _NOT_ANNOTATED:
+            return value
+        utilization = (self.total_hours / STANDARD_HOURS) * 100
         return min(utilization, 100)
 
+    @utilization_percentage.setter
+    def utilization_percentage(self, value):
+        self._annotate_metric('_utilization_percentage', value)
+
     @property
     def resource_count(self):
+        if '_resource_count' in self.__dict__:
+            return self._resource_count
         return self.resources.count()
 
+    @resource_count.setter
+    def resource_count(self, value):
+        self._resource_count = value
+
     def __str__(self):
-        resource_names = ", ".join([resource.resource_name for resource in self.resources.all()[:3]])
-        if self.resource_count > 3:
-            resource_names += f" (+{self.resource_count - 3} more)"
+        # Use prefetched resources when available so listing projects
+        # does not cost extra queries per row.
+        if 'resources' in getattr(self, '_prefetched_objects_cache', {}):
+            resources = list(self.resources.all())
+            resource_count = len(resources)
+        else:
+            resources = self.resources.all()[:3]
+            resource_count = self.resource_count
+        resource_names = ", ".join([resource.resource_name for resource in resources[:3]])
+        if resource_count > 3:
+            resource_names += f" (+{resource_count - 3} more)"
         return f"{self.project_name} ({calendar.month_name[self.month]} {self.year}) → {resource_names}"
 
     def get_absolute_url(self):
@@ -110,6 +230,260 @@ class Project(models.Model):
     class Meta:
         db_table = 'projects'
         ordering = ['-year', '-month', 'project_name']
-        unique_together = ('project_name', 'year', 'month')
+        constraints = [
+            # Leads with (year, month) so it also serves the per-month lookups
+            models.UniqueConstraint(fields=['year', 'month', 'project_name'], name='unique_project_month'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['year', 'month'],
+                condition=models.Q(is_active=True),
+                name='project_active_month_idx',
+            ),
+        ]
         verbose_name = 'Project'
-        verbose_name_plural = 'Projects'
\ No newline at end of file
+        verbose_name_plural = 'Projects'
+
+
+class ProjectResourceQuerySet(models.QuerySet):
+
+    def for_year(self, year):
+        """
+        Allocations of the year's projects, read from the archive when the
+        year has been archived.
+        """
+        from resources.archive import is_archived
+        if is_archived(year):
+            return ArchivedProjectResource.objects.filter(project__year=year)
+        return self.filter(project__year=year)
+
+    def for_month(self, year, month):
+        """
+        Allocations of the month's projects, read from the archive when the
+        year has been archived.
+        """
+        from resources.archive import is_archived
+        if is_archived(year):
+            return ArchivedProjectResource.objects.filter(project__year=year, project__month=month)
+        return self.filter(project__year=year, project__month=month)
+
+
+class ProjectResource(models.Model):
+    """
+    Allocation of a single resource to a project for the project's month,
+    split into billable and non-billable days.
+    """
+
+    project = models.ForeignKey(
+        Project,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='project_resources'
+    )
+
+    resource = models.ForeignKey(
+        ResourceModel,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='project_allocations'
+    )
+
+    present_day = models.FloatField(
+        default=0,
+        validators=[MinValueValidator(0)],
+        help_text="Days the resource was present for this project"
+    )
+
+    billable_days = models.FloatField(
+        default=0,
+        validators=[MinValueValidator(0)],
+        help_text="Number of billable days"
+    )
+
+    billable_hours = models.FloatField(
+        default=0,
+        editable=False,
+        help_text="Auto-calculated (billable_days × 8)"
+    )
+
+    non_billable_days = models.FloatField(
+        default=0,
+        validators=[MinValueValidator(0)],
+        help_text="Number of non-billable days"
+    )
+
+    non_billable_hours = models.FloatField(
+        default=0,
+        editable=False,
+        help_text="Auto-calculated (non_billable_days × 8)"
+    )
+
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ProjectResourceQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        self.billable_hours = self.billable_days * 8
+        self.non_billable_hours = self.non_billable_days * 8
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.resource} → {self.project.project_name if self.project else '-'}"
+
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'resource'], name='unique_project_resource'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['resource', 'project'],
+                condition=models.Q(is_active=True),
+                name='active_allocation_resource_idx',
+            ),
+        ]
+
+
+class MonthlyRollup(models.Model):
+    """
+    Denormalized monthly totals, one row per (year, month, project) and one
+    per (year, month, resource), kept up to date incrementally from the
+    allocations (see projects.rollups).
+    """
+
+    PROJECT = 'PROJECT'
+    RESOURCE = 'RESOURCE'
+    KIND_CHOICES = [
+        (PROJECT, 'Project'),
+        (RESOURCE, 'Resource'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    year = models.PositiveIntegerField()
+    month = models.PositiveSmallIntegerField(choices=[(i, calendar.month_name[i]) for i in range(1, 13)])
+
+    project = models.ForeignKey(
+        Project,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='rollups'
+    )
+
+    resource = models.ForeignKey(
+        ResourceModel,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='rollups'
+    )
+
+    billable_days = models.FloatField(default=0)
+    non_billable_days = models.FloatField(default=0)
+    billable_hours = models.FloatField(default=0)
+    non_billable_hours = models.FloatField(default=0)
+
+    headcount = models.PositiveIntegerField(
+        default=0,
+        help_text="Resources allocated to the project, or projects the resource is allocated to"
+    )
+
+    utilization_percentage = models.FloatField(
+        default=0,
+        help_text="Billable hours against standard hours of the headcount, capped at 100"
+    )
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        subject = self.project.project_name if self.kind == self.PROJECT else self.resource.resource_name
+        return f"{subject} ({calendar.month_name[self.month]} {self.year})"
+
+    class Meta:
+        db_table = 'monthly_rollup'
+        ordering = ['-year', '-month', 'kind']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['year', 'month', 'project'],
+                condition=models.Q(kind='PROJECT'),
+                name='unique_project_rollup',
+            ),
+            models.UniqueConstraint(
+                fields=['year', 'month', 'resource'],
+                condition=models.Q(kind='RESOURCE'),
+                name='unique_resource_rollup',
+            ),
+        ]
+        verbose_name = 'Monthly Rollup'
+        verbose_name_plural = 'Monthly Rollups'
+
+
+class ArchivedProject(models.Model):
+    """
+    Project of an archived year, keeping its original id. Field and
+    relation names match Project, so report queries run unchanged on it.
+    """
+
+    project_name = models.CharField(max_length=100)
+    project_type = models.CharField(max_length=20, choices=Project.PROJECT_TYPE_CHOICES)
+    year = models.PositiveIntegerField()
+    month = models.PositiveSmallIntegerField(choices=[(i, calendar.month_name[i]) for i in range(1, 13)])
+    present_day = models.FloatField(default=0)
+    billable_days = models.FloatField(default=0)
+    non_billable_days = models.FloatField(default=0)
+    billable_hours = models.FloatField(default=0)
+    non_billable_hours = models.FloatField(default=0)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.project_name} ({calendar.month_name[self.month]} {self.year})"
+
+    class Meta:
+        db_table = 'projects_archive'
+        ordering = ['-year', '-month', 'project_name']
+        indexes = [
+            models.Index(fields=['year', 'month', 'project_name'], name='archived_project_month_idx'),
+        ]
+        verbose_name = 'Archived project'
+        verbose_name_plural = 'Archived projects'
+
+
+class ArchivedProjectResource(models.Model):
+    """
+    Allocation of an archived year, keeping its original id and the
+    related names of ProjectResource.
+    """
+
+    project = models.ForeignKey(
+        ArchivedProject,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='project_resources'
+    )
+    resource = models.ForeignKey(
+        ArchivedResource,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='project_allocations'
+    )
+    present_day = models.FloatField(default=0)
+    billable_days = models.FloatField(default=0)
+    billable_hours = models.FloatField(default=0)
+    non_billable_days = models.FloatField(default=0)
+    non_billable_hours = models.FloatField(default=0)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.resource} → {self.project.project_name if self.project else '-'}"
+
+    class Meta:
+        db_table = 'project_resource_archive'
+        ordering = ['-created_at']
+        verbose_name = 'Archived allocation'
+        verbose_name_plural = 'Archived allocations'
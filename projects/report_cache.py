@@ -0,0 +1,117 @@
+from django.conf import settings
+from django.core.cache import caches
+
+from .reports import abuild_month_report, build_month_report
+from .routers import using_read_database
+
+KEY_PREFIX = 'month-report'
+HITS_KEY = f'{KEY_PREFIX}:hits'
+MISSES_KEY = f'{KEY_PREFIX}:misses'
+
+
+def get_cache():
+    """
+    Cache backing the month reports: the ``REPORT_CACHE_ALIAS`` entry of
+    CACHES (locmem by default, point it at a FileBasedCache to share
+    reports between processes).
+    """
+    return caches[getattr(settings, 'REPORT_CACHE_ALIAS', 'default')]
+
+
+def _generation_key(year, month):
+    return f'{KEY_PREFIX}:{year}:{month}:generation'
+
+
+def _report_key(year, month, kind, generation):
+    return f'{KEY_PREFIX}:{year}:{month}:{generation}:{kind}'
+
+
+def _incr(key):
+    cache = get_cache()
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:  # evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def _report_timeout():
+    timeout = getattr(settings, 'REPORT_CACHE_TIMEOUT', None)
+    if using_read_database():
+        # A report built from a lagging read database may predate the last
+        # invalidation; keep it only briefly.
+        lagging = getattr(settings, 'READ_DATABASE_REPORT_CACHE_TIMEOUT', 60)
+        timeout = lagging if timeout is None else min(timeout, lagging)
+    return timeout
+
+
+def cached_report(year, month, kind, build):
+    """
+    Return ``build(year, month)`` for the given report kind, cached per
+    (year, month, kind) until the month is invalidated.
+    """
+    cache = get_cache()
+    generation = cache.get_or_set(_generation_key(year, month), 0, timeout=None)
+    key = _report_key(year, month, kind, generation)
+    report = cache.get(key)
+    if report is not None:
+        _incr(HITS_KEY)
+        return report
+    _incr(MISSES_KEY)
+    report = build(year, month)
+    cache.set(key, report, timeout=_report_timeout())
+    return report
+
+
+async def _aincr(key):
+    cache = get_cache()
+    await cache.aadd(key, 0, timeout=None)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aset(key, 1, timeout=None)
+
+
+async def acached_report(year, month, kind, abuild):
+    """
+    Async cached_report, for a coroutine ``abuild(year, month)``.
+    """
+    cache = get_cache()
+    generation = await cache.aget_or_set(_generation_key(year, month), 0, timeout=None)
+    key = _report_key(year, month, kind, generation)
+    report = await cache.aget(key)
+    if report is not None:
+        await _aincr(HITS_KEY)
+        return report
+    await _aincr(MISSES_KEY)
+    report = await abuild(year, month)
+    await cache.aset(key, report, timeout=_report_timeout())
+    return report
+
+
+def get_month_report(year, month):
+    return cached_report(year, month, 'month', build_month_report)
+
+
+async def aget_month_report(year, month):
+    return await acached_report(year, month, 'month', abuild_month_report)
+
+
+def invalidate_month(year, month):
+    """
+    Drop every cached report kind for one month by moving the month to a
+    new generation; stale entries simply age out of the cache.
+    """
+    _incr(_generation_key(year, month))
+
+
+def cache_stats():
+    cache = get_cache()
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+    }
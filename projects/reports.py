@@ -0,0 +1,196 @@
+import asyncio
+
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from resources.archive import is_archived
+from resources.concurrency import query_runner
+from resources.models import ResourceModel
+from .models import MonthlyRollup, Project, ProjectResource
+
+HOURS_PER_DAY = 8
+
+
+def _total(field, **extra):
+    """
+    Sum of a float field, or 0 when there is nothing to sum.
+    """
+    return Coalesce(Sum(field, **extra), Value(0.0))
+
+
+def _utilization(hours, working_days):
+    available_hours = (working_days or 0) * HOURS_PER_DAY
+    if not available_hours:
+        return 0
+    return round(min(hours / available_hours * 100, 100), 2)
+
+
+def project_totals(year, month):
+    """
+    Per-project billable/non-billable totals for one month, read from the
+    project rollups (one row per project) in a single query. Archived
+    months, which have no rollups, are summed over their allocations.
+    ``resource_count`` counts the project's active allocations.
+    """
+    if is_archived(year):
+        return _project_totals_from_allocations(year, month)
+    rollup = Q(rollups__kind=MonthlyRollup.PROJECT)
+    return list(
+        Project.objects.filter(year=year, month=month, is_active=True)
+        .order_by('project_name')
+        .values('id', 'project_name', 'project_type')
+        .annotate(
+            billable_days=_total('rollups__billable_days', filter=rollup),
+            non_billable_days=_total('rollups__non_billable_days', filter=rollup),
+            billable_hours=_total('rollups__billable_hours', filter=rollup),
+            non_billable_hours=_total('rollups__non_billable_hours', filter=rollup),
+            resource_count=Coalesce(Sum('rollups__headcount', filter=rollup), 0),
+        )
+    )
+
+
+def _project_totals_from_allocations(year, month):
+    active = Q(project_resources__is_active=True)
+    return list(
+        Project.objects.for_month(year, month)
+        .filter(is_active=True)
+        .order_by('project_name')
+        .values('id', 'project_name', 'project_type')
+        .annotate(
+            billable_days=_total('project_resources__billable_days', filter=active),
+            non_billable_days=_total('project_resources__non_billable_days', filter=active),
+            billable_hours=_total('project_resources__billable_hours', filter=active),
+            non_billable_hours=_total('project_resources__non_billable_hours', filter=active),
+            resource_count=Count('project_resources', filter=active),
+        )
+    )
+
+
+def resource_totals(year, month):
+    """
+    Per-resource totals across every project of the month, read from the
+    resource rollups in a single query. Archived months are summed over
+    their allocations.
+    """
+    if is_archived(year):
+        return _resource_totals_from_allocations(year, month)
+    return list(
+        MonthlyRollup.objects.filter(kind=MonthlyRollup.RESOURCE, year=year, month=month)
+        .values(
+            'resource_id',
+            'resource__resource_name',
+            'resource__working_days',
+            'resource__present_day',
+            'billable_days',
+            'non_billable_days',
+            'billable_hours',
+            'non_billable_hours',
+            project_count=F('headcount'),
+        )
+        .order_by('resource__resource_name')
+    )
+
+
+def _resource_totals_from_allocations(year, month):
+    return list(
+        ProjectResource.objects.for_month(year, month).filter(
+            project__is_active=True,
+            is_active=True,
+            resource__isnull=False,
+        )
+        .values(
+            'resource_id',
+            'resource__resource_name',
+            'resource__working_days',
+            'resource__present_day',
+        )
+        .annotate(
+            billable_days=_total('billable_days'),
+            non_billable_days=_total('non_billable_days'),
+            billable_hours=_total('billable_hours'),
+            non_billable_hours=_total('non_billable_hours'),
+            project_count=Count('project', distinct=True),
+        )
+        .order_by('resource__resource_name')
+    )
+
+
+def team_totals(year, month):
+    """
+    Month-wide headcount and capacity from the resource rows, aggregated in
+    a single query.
+    """
+    return ResourceModel.objects.for_month(year, month).aggregate(
+        headcount=Count('id'),
+        working_days=_total('working_days'),
+        present_days=_total('present_day'),
+        present_hours=_total('present_hours'),
+    )
+
+
+def _assemble_report(year, month, projects, resource_rows, team):
+    resources = []
+    for row in resource_rows:
+        total_hours = row['billable_hours'] + row['non_billable_hours']
+        resources.append({
+            'id': row['resource_id'],
+            'resource_name': row['resource__resource_name'],
+            'working_days': row['resource__working_days'],
+            'present_day': row['resource__present_day'],
+            'billable_days': row['billable_days'],
+            'non_billable_days': row['non_billable_days'],
+            'billable_hours': row['billable_hours'],
+            'non_billable_hours': row['non_billable_hours'],
+            'total_hours': total_hours,
+            'project_count': row['project_count'],
+            'utilization_percentage': _utilization(row['billable_hours'], row['resource__working_days']),
+        })
+
+    for row in projects:
+        row['total_hours'] = row['billable_hours'] + row['non_billable_hours']
+        row['total_days'] = row['billable_days'] + row['non_billable_days']
+
+    billable_hours = sum(row['billable_hours'] for row in projects)
+    non_billable_hours = sum(row['non_billable_hours'] for row in projects)
+    team.update({
+        'project_count': len(projects),
+        'billable_hours': billable_hours,
+        'non_billable_hours': non_billable_hours,
+        'utilization_percentage': _utilization(billable_hours, team['working_days']),
+    })
+
+    return {
+        'year': year,
+        'month': month,
+        'projects': projects,
+        'resources': resources,
+        'team': team,
+    }
+
+
+def build_month_report(year, month):
+    """
+    Build the full report for one month: per-project totals, per-resource
+    totals and team utilization.
+
+    The report always costs three queries, however many projects, resources
+    or allocations the month has.
+    """
+    return _assemble_report(
+        year, month, project_totals(year, month), resource_totals(year, month), team_totals(year, month)
+    )
+
+
+async def abuild_month_report(year, month):
+    """
+    Async build_month_report: the project totals, resource totals and team
+    aggregate run concurrently, each on its own connection outside a
+    transaction (see resources.concurrency.query_runner).
+    """
+    run = await query_runner()
+    projects, resource_rows, team = await asyncio.gather(
+        run(project_totals)(year, month),
+        run(resource_totals)(year, month),
+        run(team_totals)(year, month),
+    )
+    return _assemble_report(year, month, projects, resource_rows, team)
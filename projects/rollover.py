@@ -0,0 +1,114 @@
+from dataclasses import dataclass
+
+from django.db import transaction
+
+from resources.attendance import sync_attendance
+from resources.closing import check_month_open
+from resources.models import ResourceModel
+from resources.signals import resources_bulk_changed
+from resources.working_calendar import get_month_calendar
+from .models import Project, ProjectResource
+from .rollups import rebuild_rollups
+
+
+@dataclass
+class RolloverResult:
+    year: int
+    month: int
+    resources: int = 0
+    projects: int = 0
+    allocations: int = 0
+
+
+def next_month(year, month):
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def _ids_by_name(queryset, name_field):
+    ids = {}
+    for pk, name in queryset.order_by('pk').values_list('pk', name_field):
+        ids.setdefault(name, pk)
+    return ids
+
+
+def roll_over_month(year, month, batch_size=1000):
+    """
+    Copy a month's resources, active projects and active allocations into
+    the following month with all day and hour counts zeroed.
+
+    The source month is read from the archive when its year has been
+    archived (e.g. rolling the last December over into a new year). Rows
+    that already exist in the target month (matched by resource name,
+    project name and project/resource pair) are left untouched, so the
+    rollover can safely be re-run. Everything is written with a handful of
+    bulk_create statements in one transaction. The result counts the rows
+    the target month gained. Raises MonthClosed when the target month has
+    been closed.
+    """
+    target_year, target_month = next_month(year, month)
+    check_month_open(target_year, target_month)
+    result = RolloverResult(target_year, target_month)
+    working_days = get_month_calendar(target_year, target_month).working_days
+
+    with transaction.atomic():
+        # Resources
+        target_resources = ResourceModel.objects.filter(year=target_year, month=target_month)
+        existing = set(target_resources.values_list('resource_name', flat=True))
+        names = ResourceModel.objects.for_month(year, month).exclude(
+            resource_name__in=existing
+        ).order_by('resource_name').values_list('resource_name', flat=True).distinct()
+        created = ResourceModel.objects.bulk_create(
+            [
+                ResourceModel(
+                    resource_name=name, year=target_year, month=target_month,
+                    working_days=working_days, present_day=0, present_hours=0,
+                )
+                for name in names
+            ],
+            batch_size=batch_size,
+        )
+        sync_attendance(created, batch_size=batch_size)
+        result.resources = len(created)
+
+        # Projects
+        target_projects = Project.objects.filter(year=target_year, month=target_month)
+        existing = set(target_projects.values_list('project_name', flat=True))
+        sources = Project.objects.for_month(year, month).filter(is_active=True).exclude(
+            project_name__in=existing
+        ).values_list('project_name', 'project_type')
+        Project.objects.bulk_create(
+            [
+                Project(project_name=name, project_type=project_type, year=target_year, month=target_month)
+                for name, project_type in sources
+            ],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        # bulk_create also returns the rows that ignore_conflicts skipped
+        result.projects = target_projects.count() - len(existing)
+
+        # Allocations, matched to the target month's rows by name
+        project_ids = _ids_by_name(target_projects, 'project_name')
+        resource_ids = _ids_by_name(target_resources, 'resource_name')
+        target_allocations = ProjectResource.objects.filter(project__in=project_ids.values())
+        existing = list(target_allocations.values_list('project_id', 'resource_id'))
+        allocations_before, existing = len(existing), set(existing)
+        pairs = ProjectResource.objects.for_month(year, month).filter(
+            project__is_active=True, is_active=True, resource__isnull=False,
+        ).values_list('project__project_name', 'resource__resource_name')
+        allocations = {}
+        for project_name, resource_name in pairs:
+            pair = (project_ids.get(project_name), resource_ids.get(resource_name))
+            if None not in pair and pair not in existing:
+                allocations[pair] = ProjectResource(project_id=pair[0], resource_id=pair[1])
+        ProjectResource.objects.bulk_create(allocations.values(), batch_size=batch_size, ignore_conflicts=True)
+        result.allocations = target_allocations.count() - allocations_before
+
+        # bulk_create skips the signals that maintain rollups, the report cache
+        # and the resource search cache
+        rebuild_rollups(target_year, target_month)
+        transaction.on_commit(lambda: resources_bulk_changed.send(
+            sender=ResourceModel, months={(target_year, target_month)}
+        ))
+
+    return result
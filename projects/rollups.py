@@ -0,0 +1,246 @@
+import math
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Coalesce, Least, NullIf
+
+from .models import STANDARD_HOURS, MonthlyRollup, Project, ProjectResource
+
+TOTAL_FIELDS = ['billable_days', 'non_billable_days', 'billable_hours', 'non_billable_hours']
+SNAPSHOT_FIELDS = ['project_id', 'resource_id', 'is_active', *TOTAL_FIELDS]
+
+# Rollup kind → allocation field it is grouped by
+GROUP_FIELDS = {
+    MonthlyRollup.PROJECT: 'project_id',
+    MonthlyRollup.RESOURCE: 'resource_id',
+}
+
+# Rollup kind → headcount aggregate. A project counts the resources still
+# allocated to it: an allocation whose resource was deleted (SET_NULL)
+# keeps its days and hours but no longer adds a head.
+HEADCOUNTS = {
+    MonthlyRollup.PROJECT: Count('resource', distinct=True),
+    MonthlyRollup.RESOURCE: Count('pk'),
+}
+
+
+def utilization(kind, billable_hours, headcount):
+    capacity = STANDARD_HOURS * (headcount if kind == MonthlyRollup.PROJECT else 1)
+    if not capacity:
+        return 0
+    return min(billable_hours / capacity * 100, 100)
+
+
+def snapshot(allocation):
+    """
+    The allocation's rollup-relevant values as loaded from the database, or
+    None when some of them were deferred and are unknown.
+    """
+    values = allocation.__dict__
+    if any(field not in values for field in SNAPSHOT_FIELDS):
+        return None
+    return {field: values[field] for field in SNAPSHOT_FIELDS}
+
+
+# Incremental updates
+
+def _contributions(allocation_values, months, sign):
+    """
+    Yield (rollup key, deltas) pairs that one allocation adds to (sign=1)
+    or removes from (sign=-1) the rollups.
+    """
+    if not allocation_values or not allocation_values['is_active']:
+        return
+    month = months.get(allocation_values['project_id'])
+    if month is None:  # no project, or an inactive one
+        return
+    totals = [sign * (allocation_values[field] or 0) for field in TOTAL_FIELDS]
+    has_resource = bool(allocation_values['resource_id'])
+    yield (MonthlyRollup.PROJECT, *month, allocation_values['project_id']), totals + [sign * has_resource]
+    if has_resource:
+        yield (MonthlyRollup.RESOURCE, *month, allocation_values['resource_id']), totals + [sign]
+
+
+def _apply(key, deltas):
+    """
+    Add ``deltas`` to one rollup row. Returns True when the row could not
+    be updated in place and its whole month was rebuilt instead.
+    """
+    kind, year, month, object_id = key
+    *total_deltas, headcount_delta = deltas
+    lookup = {'kind': kind, 'year': year, 'month': month, GROUP_FIELDS[kind]: object_id}
+
+    billable_hours = F('billable_hours') + total_deltas[TOTAL_FIELDS.index('billable_hours')]
+    capacity = Value(float(STANDARD_HOURS))
+    if kind == MonthlyRollup.PROJECT:
+        capacity = (F('headcount') + headcount_delta) * float(STANDARD_HOURS)
+    rollups = MonthlyRollup.objects.filter(**lookup)
+    updated = rollups.filter(headcount__gte=-headcount_delta).update(
+        headcount=F('headcount') + headcount_delta,
+        utilization_percentage=Coalesce(
+            Least(billable_hours * 100.0 / NullIf(capacity, Value(0.0)), Value(100.0)), Value(0.0)
+        ),
+        **{field: F(field) + delta for field, delta in zip(TOTAL_FIELDS, total_deltas)},
+    )
+    if updated:
+        # A project keeps its rollup while allocations without a resource
+        # still count for it
+        if kind == MonthlyRollup.RESOURCE or not ProjectResource.objects.filter(
+            project_id=object_id, is_active=True
+        ).exists():
+            rollups.filter(headcount=0).delete()
+        return False
+
+    if headcount_delta > 0 and not rollups.exists():
+        values = dict(zip(TOTAL_FIELDS, total_deltas))
+        try:
+            with transaction.atomic():
+                MonthlyRollup.objects.create(
+                    **lookup,
+                    **values,
+                    headcount=headcount_delta,
+                    utilization_percentage=utilization(kind, values['billable_hours'], headcount_delta),
+                )
+            return False
+        except IntegrityError:  # created concurrently
+            pass
+
+    # The stored rollup does not match the change (e.g. rows written with
+    # bulk_create, which skips signals): recompute the month instead.
+    rebuild_rollups(year, month)
+    return True
+
+
+def apply_allocation_change(old, new):
+    """
+    Move the rollups from an allocation's ``old`` values to its ``new``
+    values (snapshot dicts, None for a created or deleted allocation) with
+    F-expression deltas, touching only the affected rollup rows.
+    """
+    project_ids = {values['project_id'] for values in (old, new) if values} - {None}
+    months = {
+        pk: (year, month)
+        for pk, year, month in Project.objects.filter(pk__in=project_ids, is_active=True)
+        .values_list('pk', 'year', 'month')
+    }
+
+    changes = defaultdict(lambda: [0] * (len(TOTAL_FIELDS) + 1))
+    for values, sign in ((old, -1), (new, 1)):
+        for key, deltas in _contributions(values, months, sign):
+            changes[key] = [total + delta for total, delta in zip(changes[key], deltas)]
+
+    rebuilt = set()
+    with transaction.atomic():
+        for key, deltas in changes.items():
+            # A rebuilt month already reflects the allocation's new values
+            if any(deltas) and key[1:3] not in rebuilt and _apply(key, deltas):
+                rebuilt.add(key[1:3])
+
+
+def apply_resource_deletion(allocations):
+    """
+    Take a deleted resource out of the headcount of the project rollups its
+    allocations (snapshot dicts taken before the delete) counted for. The
+    delete itself detached the allocations (SET_NULL) without signals and
+    cascaded the resource's own rollups away.
+    """
+    allocations = [values for values in allocations if values['is_active']]
+    months = {
+        pk: (year, month)
+        for pk, year, month in Project.objects.filter(
+            pk__in={values['project_id'] for values in allocations}, is_active=True
+        ).values_list('pk', 'year', 'month')
+    }
+    deltas = [0] * len(TOTAL_FIELDS) + [-1]
+    rebuilt = set()
+    with transaction.atomic():
+        for values in allocations:
+            month = months.get(values['project_id'])
+            # A rebuilt month already reflects the detached allocations
+            if month is None or month in rebuilt:
+                continue
+            if _apply((MonthlyRollup.PROJECT, *month, values['project_id']), deltas):
+                rebuilt.add(month)
+
+
+# Full recomputation
+
+def _scope(year=None, month=None, prefix=''):
+    scope = {}
+    if year is not None:
+        scope[f'{prefix}year'] = year
+    if month is not None:
+        scope[f'{prefix}month'] = month
+    return scope
+
+
+def expected_rollups(year=None, month=None):
+    """
+    Rollup values computed from scratch from the allocations, keyed like
+    the incremental updates: (kind, year, month, project or resource id).
+    """
+    allocations = ProjectResource.objects.filter(
+        is_active=True, project__is_active=True, **_scope(year, month, 'project__')
+    ).order_by()
+    totals = {field: Coalesce(Sum(field), Value(0.0)) for field in TOTAL_FIELDS}
+
+    expected = {}
+    for kind, group_field in GROUP_FIELDS.items():
+        rows = allocations.filter(**{f'{group_field}__isnull': False}).values(
+            group_field, 'project__year', 'project__month'
+        ).annotate(headcount=HEADCOUNTS[kind], **totals)
+        for row in rows:
+            key = (kind, row['project__year'], row['project__month'], row[group_field])
+            values = {field: row[field] for field in TOTAL_FIELDS}
+            values['headcount'] = row['headcount']
+            values['utilization_percentage'] = utilization(kind, row['billable_hours'], row['headcount'])
+            expected[key] = values
+    return expected
+
+
+def rebuild_rollups(year=None, month=None, batch_size=1000):
+    """
+    Replace the rollups of the given year/month (or of everything) with
+    values recomputed from the allocations. Returns the number of rows.
+    """
+    expected = expected_rollups(year, month)
+    with transaction.atomic():
+        MonthlyRollup.objects.filter(**_scope(year, month)).delete()
+        MonthlyRollup.objects.bulk_create(
+            [
+                MonthlyRollup(kind=kind, year=year_, month=month_, **{GROUP_FIELDS[kind]: object_id}, **values)
+                for (kind, year_, month_, object_id), values in expected.items()
+            ],
+            batch_size=batch_size,
+        )
+    return len(expected)
+
+
+def rebuild_months(months):
+    for year, month in set(months):
+        rebuild_rollups(year, month)
+
+
+def verify_rollups(year=None, month=None):
+    """
+    Compare the stored rollups with a fresh recomputation and return a
+    list of human-readable differences (empty when they agree).
+    """
+    expected = expected_rollups(year, month)
+    fields = TOTAL_FIELDS + ['headcount', 'utilization_percentage']
+    problems = []
+    for rollup in MonthlyRollup.objects.filter(**_scope(year, month)).values(
+        'kind', 'year', 'month', 'project_id', 'resource_id', *fields
+    ):
+        kind = rollup['kind']
+        key = (kind, rollup['year'], rollup['month'], rollup[GROUP_FIELDS[kind]])
+        values = expected.pop(key, None)
+        if values is None:
+            problems.append(f"{key}: unexpected rollup row")
+            continue
+        for field in fields:
+            if not math.isclose(rollup[field], values[field], rel_tol=1e-9, abs_tol=1e-6):
+                problems.append(f"{key}: {field} is {rollup[field]}, expected {values[field]}")
+    problems.extend(f"{key}: missing rollup row" for key in expected)
+    return problems
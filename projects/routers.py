@@ -0,0 +1,117 @@
+import contextvars
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+
+from django.conf import settings
+
+# Set while a report/export/dashboard view runs on the read database
+_use_read_database = contextvars.ContextVar('use_read_database', default=False)
+
+ROUTED_APPS = {'projects', 'resources'}
+STICKY_COOKIE = 'read_primary'
+
+
+def read_database():
+    """
+    Alias reports read from (the ``REPORT_READ_DATABASE`` setting), or None
+    when reads are not split off.
+    """
+    alias = getattr(settings, 'REPORT_READ_DATABASE', None)
+    return alias if alias and alias in settings.DATABASES else None
+
+
+def using_read_database():
+    return _use_read_database.get() and read_database() is not None
+
+
+class ReadReplicaRouter:
+    """
+    Sends project/resource reads made inside ``reads_from_replica`` views
+    to the read alias; everything else, and every write, stays on
+    ``default``.
+
+    Settings:
+      DATABASE_ROUTERS          ['projects.routers.ReadReplicaRouter']
+      REPORT_READ_DATABASE      read alias, e.g. 'replica'; for tests give it
+                                'TEST': {'MIRROR': 'default'}
+      READ_YOUR_WRITES_SECONDS  how long a client reads from the primary
+                                after a write (default 10, needs
+                                projects.middleware.ReadYourWritesMiddleware)
+      READ_DATABASE_REPORT_CACHE_TIMEOUT
+                                cache timeout of reports built from the read
+                                database (default 60)
+
+    With SQLite, keep the read copy current with the refresh_read_database
+    command.
+    """
+
+    def db_for_read(self, model, **hints):
+        if using_read_database() and model._meta.app_label in ROUTED_APPS:
+            return read_database()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The read database is a copy of the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The read database is refreshed from the primary, schema included
+        if db == read_database():
+            return False
+        return None
+
+
+def _on_read_database(iterable):
+    # Streamed content is produced after the view returns; route each chunk
+    iterator = iter(iterable)
+    while True:
+        token = _use_read_database.set(True)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _use_read_database.reset(token)
+        yield chunk
+
+
+def reads_from_replica(view):
+    """
+    Run a read-only view (including any streamed content) against the read
+    database, unless the client wrote recently and must see its own writes.
+    """
+    def use_primary(request):
+        return read_database() is None or STICKY_COOKIE in request.COOKIES
+
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if use_primary(request):
+                return await view(request, *args, **kwargs)
+            token = _use_read_database.set(True)
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _use_read_database.reset(token)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if use_primary(request):
+            return view(request, *args, **kwargs)
+        token = _use_read_database.set(True)
+        try:
+            response = view(request, *args, **kwargs)
+        finally:
+            _use_read_database.reset(token)
+        if getattr(response, 'streaming', False) and not getattr(response, 'is_async', False) \
+                and not hasattr(response, 'file_to_stream'):
+            response.streaming_content = _on_read_database(response.streaming_content)
+        return response
+
+    return wrapper
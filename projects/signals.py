@@ -0,0 +1,139 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from resources.models import ResourceModel
+from resources.signals import resources_bulk_changed
+from .models import Project, ProjectResource
+from .report_cache import invalidate_month
+from . import rollups
+
+# Each instance remembers the month it was loaded with, so moving a row to
+# another month invalidates both the old and the new month.
+
+
+def _remember(instance, *fields):
+    instance._report_origin = tuple(instance.__dict__.get(field) for field in fields)
+
+
+@receiver(post_init, sender=Project)
+@receiver(post_init, sender=ResourceModel)
+def remember_month(sender, instance, **kwargs):
+    _remember(instance, 'year', 'month')
+
+
+@receiver(post_init, sender=ProjectResource)
+def remember_project(sender, instance, **kwargs):
+    _remember(instance, 'project_id')
+    instance._rollup_origin = rollups.snapshot(instance)
+
+
+@receiver(post_init, sender=Project)
+def remember_rollup_scope(sender, instance, **kwargs):
+    instance._rollup_scope = tuple(instance.__dict__.get(field) for field in ('year', 'month', 'is_active'))
+
+
+def _invalidate(*months):
+    # After the commit: a report rebuilt before it would still read the old
+    # rows and be cached under the new generation
+    for year, month in set(months):
+        if year and month:
+            transaction.on_commit(partial(invalidate_month, year, month))
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=ResourceModel)
+@receiver(post_delete, sender=ResourceModel)
+def month_row_changed(sender, instance, **kwargs):
+    _invalidate((instance.year, instance.month), instance._report_origin)
+    _remember(instance, 'year', 'month')
+
+
+@receiver(post_save, sender=ProjectResource)
+@receiver(post_delete, sender=ProjectResource)
+def allocation_changed(sender, instance, **kwargs):
+    project_ids = {instance.project_id, *instance._report_origin} - {None}
+    _invalidate(*Project.objects.filter(pk__in=project_ids).values_list('year', 'month'))
+    _remember(instance, 'project_id')
+
+
+@receiver(m2m_changed, sender=Project.resources.through)
+def project_resources_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        _invalidate((instance.year, instance.month))
+    elif action == 'post_clear':
+        # pk_set is not provided for clear(); the resource's own month is the best bound
+        _invalidate((instance.year, instance.month))
+    else:
+        _invalidate(*Project.objects.filter(pk__in=pk_set).values_list('year', 'month'))
+
+
+@receiver(resources_bulk_changed)
+def resources_bulk_imported(sender, months, **kwargs):
+    _invalidate(*months)
+
+
+# Monthly rollups
+
+@receiver(post_save, sender=ProjectResource)
+def allocation_saved(sender, instance, created, **kwargs):
+    new = rollups.snapshot(instance)
+    old = None if created else instance._rollup_origin
+    if created or old is not None:
+        rollups.apply_allocation_change(old, new)
+    else:
+        # Loaded with deferred fields: the previous values are unknown
+        project_ids = {instance.project_id, instance._report_origin[0]} - {None}
+        rollups.rebuild_months(Project.objects.filter(pk__in=project_ids).values_list('year', 'month'))
+    instance._rollup_origin = new
+
+
+@receiver(post_delete, sender=ProjectResource)
+def allocation_deleted(sender, instance, **kwargs):
+    old = instance._rollup_origin or rollups.snapshot(instance)
+    rollups.apply_allocation_change(old, None)
+
+
+@receiver(pre_delete, sender=ResourceModel)
+def remember_resource_allocations(sender, instance, **kwargs):
+    # Read before the delete detaches them (SET_NULL, without signals)
+    instance._rollup_allocations = list(
+        ProjectResource.objects.filter(resource=instance).values(*rollups.SNAPSHOT_FIELDS)
+    )
+
+
+@receiver(post_delete, sender=ResourceModel)
+def resource_deleted(sender, instance, **kwargs):
+    rollups.apply_resource_deletion(getattr(instance, '_rollup_allocations', ()))
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, created, **kwargs):
+    scope = (instance.year, instance.month, instance.is_active)
+    if not created and scope != instance._rollup_scope:
+        # Moving or (de)activating a project changes which month its allocations count in
+        rollups.rebuild_months({scope[:2], instance._rollup_scope[:2]} - {(None, None)})
+    instance._rollup_scope = scope
+
+
+@receiver(post_delete, sender=Project)
+def project_deleted(sender, instance, **kwargs):
+    # Its allocations were detached (SET_NULL) without signals
+    rollups.rebuild_months([(instance.year, instance.month)])
+
+
+@receiver(m2m_changed, sender=Project.resources.through)
+def project_resources_added(sender, instance, action, reverse, pk_set, **kwargs):
+    # add() bulk-creates allocations without post_save; remove()/clear() go
+    # through delete() and are handled by allocation_deleted
+    if action != 'post_add':
+        return
+    if not reverse:
+        rollups.rebuild_months([(instance.year, instance.month)])
+    else:
+        rollups.rebuild_months(Project.objects.filter(pk__in=pk_set).values_list('year', 'month'))
@@ -0,0 +1,178 @@
+import calendar
+import json
+import os
+import tempfile
+from functools import wraps
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import patch_cache_control
+
+from resources.closing import clear_closed_months_cache, is_month_closed
+from resources.conditional import is_past_month
+from resources.models import ClosedMonth
+from .reports import build_month_report
+
+# kind -> (file name, content type)
+SNAPSHOT_FILES = {
+    'json': ('report.json', 'application/json'),
+    'html': ('report.html', 'text/html; charset=utf-8'),
+}
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def snapshot_root():
+    """
+    Directory holding the closed-month snapshots: the REPORT_SNAPSHOT_ROOT
+    setting, by default ``snapshots`` under BASE_DIR.
+    """
+    return Path(getattr(settings, 'REPORT_SNAPSHOT_ROOT', None) or Path(settings.BASE_DIR) / 'snapshots')
+
+
+def snapshot_path(year, month, kind):
+    return snapshot_root() / str(year) / f'{month:02d}' / SNAPSHOT_FILES[kind][0]
+
+
+def render_month_page(report, request=None):
+    return render_to_string('projects/month_report.html', {
+        'report': report,
+        'month_name': calendar.month_name[report['month']],
+    }, request=request)
+
+
+def _write_temp(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+    try:
+        with os.fdopen(fd, 'wb') as stream:
+            stream.write(content)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return temp_path
+
+
+def _remove_snapshot(year, month):
+    for kind in SNAPSHOT_FILES:
+        snapshot_path(year, month, kind).unlink(missing_ok=True)
+
+
+def write_snapshot(year, month):
+    """
+    Render the month's report, straight from the database, to compact JSON
+    and a standalone HTML page under snapshot_root().
+
+    Both files are rendered and written to temporary files first and only
+    moved into place once both succeeded, so a failure leaves the previous
+    snapshot (or none) rather than half of a new one.
+    """
+    report = build_month_report(year, month)
+    contents = {
+        'json': json.dumps(report, cls=DjangoJSONEncoder, separators=(',', ':')).encode(),
+        'html': render_month_page(report).encode(),
+    }
+    temp_paths = {}
+    try:
+        for kind, content in contents.items():
+            temp_paths[kind] = _write_temp(snapshot_path(year, month, kind), content)
+        for kind, temp_path in list(temp_paths.items()):
+            os.replace(temp_path, snapshot_path(year, month, kind))
+            del temp_paths[kind]
+    finally:
+        for temp_path in temp_paths.values():
+            os.unlink(temp_path)
+    return report
+
+
+def close_month(year, month):
+    """
+    Freeze a month that is over: record it as closed, which locks its rows
+    against edits, and write its report snapshot. Nothing is recorded, and
+    no snapshot file is left behind, if the snapshot cannot be written.
+    """
+    if not is_past_month(year, month):
+        raise SnapshotError(f"{calendar.month_name[month]} {year} is not over yet")
+    if ClosedMonth.objects.filter(year=year, month=month).exists():
+        raise SnapshotError(f"{calendar.month_name[month]} {year} is already closed")
+    try:
+        with transaction.atomic():
+            ClosedMonth.objects.create(year=year, month=month)
+            report = write_snapshot(year, month)
+            # Every process sharing the cache locks the month once it commits
+            transaction.on_commit(clear_closed_months_cache)
+    except BaseException:
+        # Files moved into place before the failure must not be served, nor
+        # a closed-month set read while the close was pending
+        _remove_snapshot(year, month)
+        clear_closed_months_cache()
+        raise
+    return report
+
+
+def refresh_snapshot(year, month):
+    """
+    Re-render a closed month's snapshot, e.g. after the report layout
+    changed. The month's data cannot have changed since it was closed.
+    """
+    if not ClosedMonth.objects.filter(year=year, month=month).exists():
+        raise SnapshotError(f"{calendar.month_name[month]} {year} is not closed")
+    return write_snapshot(year, month)
+
+
+def snapshot_response(year, month, kind):
+    """
+    The month's snapshot file as an immutable response, or None when the
+    month is not closed or has no snapshot.
+    """
+    if not is_month_closed(year, month):
+        return None
+    try:
+        content = snapshot_path(year, month, kind).read_bytes()
+    except FileNotFoundError:
+        return None
+    response = HttpResponse(content, content_type=SNAPSHOT_FILES[kind][1])
+    patch_cache_control(
+        response, public=True, immutable=True, max_age=getattr(settings, 'CLOSED_MONTH_CACHE_SECONDS', 3600)
+    )
+    return response
+
+
+def serves_snapshot(kind):
+    """
+    Answer GET requests of a ``(request, year, month)`` view from the
+    month's snapshot when it exists, without touching the database.
+    Apply it outermost, so conditional GET and routing are skipped too.
+    """
+    def decorator(view):
+        def from_snapshot(request, year, month):
+            if request.method not in ('GET', 'HEAD'):
+                return None
+            return snapshot_response(year, month, kind)
+
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, year, month, *args, **kwargs):
+                response = from_snapshot(request, year, month)
+                if response is None:
+                    response = await view(request, year, month, *args, **kwargs)
+                return response
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, year, month, *args, **kwargs):
+            response = from_snapshot(request, year, month)
+            if response is None:
+                response = view(request, year, month, *args, **kwargs)
+            return response
+
+        return wrapper
+    return decorator
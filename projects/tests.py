@@ -1,3 +1,757 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import tempfile
+import threading
+from datetime import date
+from io import BytesIO, StringIO
+from unittest import mock, skipIf
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.apps import apps
+from django.contrib import admin
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections, router
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from resources import urls as resource_urls
+from resources.archive import clear_archive_cache, is_archived
+from resources.closing import (
+    CLOSED_MONTHS_KEY, MonthClosed, check_month_open, clear_closed_months_cache, is_month_closed,
+)
+from resources.jobs import claim_job, enqueue, run_job
+from resources.models import ClosedMonth, ResourceModel
+from resources.working_calendar import GENERATION_KEY as CALENDAR_GENERATION_KEY
+from . import urls as project_urls
+from .archive import ArchiveError, archive_year
+from .exports import EXPORT_HEADER, export_rows
+from .forms import ProjectForm, ProjectResourceFormSet
+from .grid import apply_grid_changes, month_grid
+from .middleware import DEFAULT_BUDGETS, PerformanceBudgetExceeded
+from .models import ArchivedProject, MonthlyRollup, Project, ProjectResource
+from .report_cache import cache_stats, get_month_report
+from .reports import abuild_month_report, build_month_report
+from .routers import STICKY_COOKIE, reads_from_replica
+from .rollover import roll_over_month
+from .rollups import rebuild_rollups, verify_rollups
+from .snapshots import SnapshotError, close_month, snapshot_path, snapshot_root
+
+try:
+    from openpyxl import load_workbook
+except ImportError:  # XLSX export is optional
+    load_workbook = None
+
+
+def create_month(project_count, resources_per_project=4, year=2025, month=8):
+    resources = ResourceModel.objects.bulk_create([
+        ResourceModel(resource_name=f"Resource {i}", working_days=22, present_day=20, year=year, month=month)
+        for i in range(resources_per_project * 2)
+    ])
+    projects = Project.objects.bulk_create([
+        Project(project_name=f"Project {i}", year=year, month=month, billable_days=i % 20)
+        for i in range(project_count)
+    ])
+    ProjectResource.objects.bulk_create([
+        ProjectResource(project=project, resource=resource, present_day=20, billable_days=15, non_billable_days=5)
+        for index, project in enumerate(projects)
+        for resource in resources[index % resources_per_project:][:resources_per_project]
+    ])
+    # bulk_create skips the signals that maintain the rollups
+    rebuild_rollups(year, month)
+    return projects
+
+
+class ProjectStrTests(TestCase):
+
+    def test_str_lists_first_three_resources(self):
+        project = create_month(1)[0]
+        self.assertEqual(
+            str(project),
+            "Project 0 (August 2025) → Resource 0, Resource 1, Resource 2 (+1 more)",
+        )
+
+    def test_str_uses_prefetched_resources(self):
+        create_month(10)
+        projects = list(Project.objects.with_resource_names())
+        with self.assertNumQueries(0):
+            for project in projects:
+                str(project)
+
+
+class ProjectMetricsTests(TestCase):
+
+    def setUp(self):
+        project = Project.objects.create(project_name="Apollo", year=2025, month=8, billable_days=11, non_billable_days=5.5)
+        ProjectResource.objects.create(project=project, resource=ResourceModel.objects.create(
+            resource_name="Asha Rao", year=2025, month=8
+        ))
+
+    def test_annotated_metrics(self):
+        project = Project.objects.with_metrics().get()
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                (project.total_hours, project.total_days, project.utilization_percentage, project.resource_count),
+                (132, 16.5, 75, 1),
+            )
+
+    def test_metrics_follow_field_changes(self):
+        project = Project.objects.with_metrics().get()
+        project.billable_days = 22
+        self.assertEqual(project.total_days, 27.5)
+        project.save()
+        self.assertEqual((project.total_hours, project.utilization_percentage), (220, 100))
+
+        project.non_billable_days = 0
+        project.save()
+        self.assertEqual((project.total_hours, project.total_days), (176, 22))
+
+
+class AdminChangelistQueryCountTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def changelist_queries(self, model, project_count):
+        create_month(project_count)
+        self.client.force_login(self.user)
+        url = reverse(f'admin:projects_{model._meta.model_name}_changelist')
+        # Render every row on one page so the page size follows the row count.
+        with mock.patch.object(admin.site._registry[model], 'list_per_page', 5000):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, model.objects.count())
+        return len(context.captured_queries)
+
+    def assertConstantQueries(self, model):
+        small = self.changelist_queries(model, 10)
+        ProjectResource.objects.all().delete()
+        Project.objects.all().delete()
+        ResourceModel.objects.all().delete()
+        large = self.changelist_queries(model, 500)
+        self.assertEqual(small, large)
+
+    def test_project_changelist(self):
+        self.assertConstantQueries(Project)
+
+    def test_project_resource_changelist(self):
+        self.assertConstantQueries(ProjectResource)
+
+
+class AllocationFormSetQueryCountTests(TestCase):
+
+    def render_queries(self, rows, month):
+        project = create_month(1, resources_per_project=rows, month=month)[0]
+        formset = ProjectResourceFormSet(instance=project)
+        with CaptureQueriesContext(connection) as context:
+            html = formset.as_p()
+        self.assertEqual(html.count('selected>'), rows)
+        return len(context.captured_queries)
+
+    def test_rendering_cost_does_not_grow_with_rows(self):
+        self.assertEqual(self.render_queries(5, month=7), self.render_queries(50, month=8))
+
+    def test_project_form_uses_prefetched_resources(self):
+        create_month(1)
+        project = Project.objects.with_resource_names().get()
+        with self.assertNumQueries(0):
+            form = ProjectForm(instance=project)
+        self.assertEqual(len(form.initial['resources']), 4)
+
+
+class AsyncMonthReportTests(TestCase):
+
+    def test_inside_a_transaction_queries_stay_on_its_connection(self):
+        # Written in the test's transaction, which other connections cannot see
+        create_month(3)
+        report = build_month_report(2025, 8)
+        with self.assertNumQueries(3):
+            self.assertEqual(async_to_sync(abuild_month_report)(2025, 8), report)
+        self.assertEqual(report['team']['project_count'], 3)
+
+
+class ConcurrentAsyncMonthReportTests(TransactionTestCase):
+
+    def test_queries_run_on_worker_connections(self):
+        create_month(3)
+        report = build_month_report(2025, 8)
+        cache.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(async_to_sync(abuild_month_report)(2025, 8), report)
+
+
+class MonthlyRollupTests(TestCase):
+
+    def setUp(self):
+        self.august, self.september = [
+            Project.objects.create(project_name=f"Project {month}", year=2025, month=month) for month in (8, 9)
+        ]
+        self.asha, self.ravi = [
+            ResourceModel.objects.create(resource_name=name, year=2025, month=8, present_day=20)
+            for name in ("Asha Rao", "Ravi Shah")
+        ]
+
+    def test_rollups_follow_every_allocation_change(self):
+        allocation = ProjectResource.objects.create(
+            project=self.august, resource=self.asha, present_day=20, billable_days=15, non_billable_days=5
+        )
+        other = ProjectResource.objects.create(project=self.august, resource=self.ravi, present_day=10, billable_days=10)
+        self.assertEqual(verify_rollups(), [])
+
+        steps = {
+            'update': lambda: setattr(allocation, 'billable_days', 12),
+            'move': lambda: setattr(allocation, 'project', self.september),
+            'deactivate': lambda: setattr(allocation, 'is_active', False),
+            'reactivate': lambda: setattr(allocation, 'is_active', True),
+        }
+        for step, change in steps.items():
+            with self.subTest(step=step):
+                change()
+                allocation.save()
+                self.assertEqual(verify_rollups(), [])
+
+        with self.subTest(step='deactivate project'):
+            self.september.is_active = False
+            self.september.save()
+            self.assertEqual(verify_rollups(), [])
+        with self.subTest(step='delete'):
+            other.delete()
+            self.assertEqual(verify_rollups(), [])
+        with self.subTest(step='delete project'):
+            self.august.delete()
+            self.assertEqual(verify_rollups(), [])
+
+    def test_deleting_an_allocated_resource_drops_it_from_the_headcount(self):
+        ProjectResource.objects.create(project=self.august, resource=self.asha, present_day=20, billable_days=15)
+        ProjectResource.objects.create(project=self.august, resource=self.ravi, present_day=10, billable_days=10)
+        rollup = MonthlyRollup.objects.filter(kind=MonthlyRollup.PROJECT, project=self.august)
+
+        for resource, headcount in ((self.asha, 1), (self.ravi, 0)):
+            with self.subTest(resource=resource.resource_name):
+                with mock.patch('projects.rollups.rebuild_rollups') as rebuild:
+                    resource.delete()
+                rebuild.assert_not_called()
+                self.assertEqual(verify_rollups(), [])
+                # The detached allocations keep their days on the project
+                self.assertEqual(rollup.values_list('headcount', 'billable_days').get(), (headcount, 25))
+
+    def test_report_totals_match_the_allocations(self):
+        create_month(5)
+        ProjectResource.objects.filter(project__project_name="Project 1").first().delete()
+        ProjectResource.objects.create(project=self.august, resource=self.asha, present_day=3, billable_days=2.5)
+        self.assertEqual(verify_rollups(), [])
+
+        # Read from the rollups unless the year is archived
+        rollup_report = build_month_report(2025, 8)
+        with mock.patch('projects.reports.is_archived', return_value=True):
+            self.assertEqual(build_month_report(2025, 8), rollup_report)
+
+
+class ReportCacheInvalidationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.august = create_month(2, month=8)
+        self.september = create_month(2, month=9)
+        for month in (8, 9):
+            get_month_report(2025, month)
+
+    def assertInvalidates(self, change, months):
+        with self.captureOnCommitCallbacks() as callbacks:
+            change()
+            # Nothing is dropped before the commit
+            self.assertEqual(cache_stats()['misses'], 2)
+            for month in (8, 9):
+                get_month_report(2025, month)
+        for callback in callbacks:
+            callback()
+        before = cache_stats()['misses']
+        for month in (8, 9):
+            get_month_report(2025, month)
+        self.assertEqual(cache_stats()['misses'] - before, len(months))
+        self.assertEqual(build_month_report(2025, months[0]), get_month_report(2025, months[0]))
+
+    def test_save_invalidates_its_month(self):
+        project = self.august[0]
+        project.billable_days = 3
+        self.assertInvalidates(project.save, [8])
+
+    def test_delete_invalidates_its_month(self):
+        self.assertInvalidates(self.september[0].delete, [9])
+
+    def test_resource_change_invalidates_the_project_month(self):
+        resource = ResourceModel.objects.filter(month=8).last()
+        self.assertInvalidates(lambda: self.august[0].resources.add(resource), [8])
+
+
+class AllocationGridTests(TestCase):
+
+    def setUp(self):
+        self.project = create_month(1, resources_per_project=2)[0]
+        self.allocated, self.free = self.project.resources.first(), ResourceModel.objects.last()
+        self.url = reverse('allocation_grid', args=[2025, 8])
+
+    def post(self, changes):
+        return self.client.post(self.url, json.dumps({'changes': changes}), content_type='application/json')
+
+    def test_changes_are_saved_in_one_batch(self):
+        response = self.post([
+            {'project': self.project.pk, 'resource': self.allocated.pk, 'billable_days': 10},
+            {'project': self.project.pk, 'resource': self.free.pk, 'present_day': 4, 'billable_days': 4},
+        ])
+        self.assertEqual(response.json(), {'created': 1, 'updated': 1})
+        allocation = ProjectResource.objects.get(project=self.project, resource=self.free)
+        self.assertEqual((allocation.billable_days, allocation.billable_hours), (4, 32))
+
+    def test_invalid_cells_are_rejected_one_by_one(self):
+        response = self.post([
+            {'project': self.project.pk, 'resource': self.free.pk, 'present_day': 4},
+            {'project': self.project.pk, 'resource': self.allocated.pk, 'billable_days': float('nan')},
+            {'project': self.project.pk, 'resource': self.allocated.pk, 'present_day': float('inf')},
+            {'project': [self.project.pk], 'resource': self.allocated.pk},
+            {'project': self.project.pk, 'resource': {'id': self.allocated.pk}},
+            {'project': str(self.project.pk), 'resource': self.allocated.pk},
+            {'project': self.project.pk, 'resource': self.allocated.pk, 'billable_days': 'ten'},
+            {'project': self.project.pk, 'resource': self.allocated.pk, 'billable_days': 30},
+        ])
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual([error['index'] for error in errors], [1, 2, 3, 4, 5, 6, 7])
+        self.assertEqual(errors[0]['messages'], ["Day values must be finite numbers"])
+        self.assertEqual(errors[2]['messages'], ["Project and resource must be integer ids"])
+        self.assertFalse(ProjectResource.objects.filter(resource=self.free).exists())
+
+
+class ReadOnlyApiTests(TestCase):
+
+    def setUp(self):
+        create_month(2)
+        self.url = reverse('api_resources')
+
+    def test_pages_load_only_the_requested_fields(self):
+        params = {'year': 2025, 'month': 8, 'fields': 'resource_name', 'per_page': 3}
+        ids = []
+        with CaptureQueriesContext(connection) as context:
+            page = self.client.get(self.url, params).json()
+        self.assertNotIn('present_hours', context.captured_queries[-1]['sql'])
+        while True:
+            self.assertTrue(all(set(row) == {'id', 'resource_name'} for row in page['results']))
+            ids += [row['id'] for row in page['results']]
+            if not page['next']:
+                break
+            page = self.client.get(self.url, {**params, 'cursor': page['next']}).json()
+        self.assertEqual(ids, sorted(ResourceModel.objects.values_list('pk', flat=True)))
+
+    def test_unchanged_rows_answer_not_modified(self):
+        response = self.client.get(self.url, {'year': 2025})
+        etag = response['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'year': 2025}, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        resource = ResourceModel.objects.first()
+        resource.present_day = 12
+        resource.save()
+        response = self.client.get(self.url, {'year': 2025}, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_bad_parameters_answer_bad_request(self):
+        for params in [{'cursor': 'WyJhYmMiLCAxXQ'}, {'cursor': 'garbage'}, {'fields': 'password'}, {'year': 'abc'}]:
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+
+class ReadReplicaTests(TransactionTestCase):
+    """
+    Routing to a second SQLite database kept current with
+    refresh_read_database, added for these tests only. The SQLite backup
+    cannot copy a database inside the transaction a TestCase holds open.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        directory = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(directory.cleanup)
+        settings.DATABASES['replica'] = connections.configure_settings({
+            'default': settings.DATABASES['default'],
+            'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': f'{directory.name}/replica.sqlite3'},
+        })['replica']
+        cls.addClassCleanup(settings.DATABASES.pop, 'replica')
+        cls.addClassCleanup(connections['replica'].close)
+        # Declared only once the alias exists: the test runner would create
+        # a test database for it
+        cls.databases = {'default', 'replica'}
+        super().setUpClass()
+
+    def setUp(self):
+        cache.clear()
+        self.enterContext(override_settings(
+            DATABASE_ROUTERS=['projects.routers.ReadReplicaRouter'],
+            REPORT_READ_DATABASE='replica',
+            MIDDLEWARE=settings.MIDDLEWARE + ['projects.middleware.ReadYourWritesMiddleware'],
+        ))
+
+        self.project = create_month(1)[0]
+        call_command('refresh_read_database', stdout=StringIO())
+        # Not copied yet: visible on the primary only
+        Project.objects.filter(pk=self.project.pk).update(project_name="Renamed")
+
+    def project_names(self, **headers):
+        response = self.client.get(reverse('month_report', args=[2025, 8]), headers=headers)
+        return [project['project_name'] for project in response.json()['projects']]
+
+    def test_reports_read_the_replica(self):
+        self.assertEqual(self.project_names(), ["Project 0"])
+        export = self.client.get(reverse('export_report'))
+        self.assertIn(b'Project 0', b''.join(export.streaming_content))
+
+    def test_writes_stay_on_the_primary(self):
+        @reads_from_replica
+        def view(request):
+            return router.db_for_read(Project), router.db_for_write(Project), router.db_for_read(User)
+
+        self.assertEqual(view(RequestFactory().get('/')), ('replica', 'default', 'default'))
+
+    def test_clients_read_their_own_writes(self):
+        enqueue_url = reverse('job_list')
+        response = self.client.post(enqueue_url, {'kind': 'rebuild_rollups', 'year': 2025, 'month': 8})
+        self.assertEqual(response.status_code, 202)
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        self.assertEqual(self.project_names(), ["Renamed"])
+
+        call_command('refresh_read_database', stdout=StringIO())
+        self.client.cookies.pop(STICKY_COOKIE)
+        cache.clear()
+        self.assertEqual(self.project_names(), ["Renamed"])
+
+
+class ExportTests(TestCase):
+
+    def setUp(self):
+        create_month(2)
+        create_month(1, month=9)
+
+    def export(self, **params):
+        response = self.client.get(reverse('export_report'), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_csv_is_streamed(self):
+        response = self.export(year=2025, month=8)
+        self.assertTrue(response.streaming)
+        self.assertIn('production_report_2025_08.csv', response['Content-Disposition'])
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0], EXPORT_HEADER)
+        self.assertEqual(len(rows), 9)
+        self.assertEqual({(row[0], row[1]) for row in rows[1:]}, {('2025', 'August')})
+
+    def test_month_filter(self):
+        self.assertEqual(len(list(export_rows(2025))), 12)
+        self.assertEqual([row[1] for row in export_rows(2025, 9)], ['September'] * 4)
+        # Falsy values still filter
+        self.assertEqual(list(export_rows(year=0)), [])
+        self.assertEqual(list(export_rows(2025, month=0)), [])
+
+    @skipIf(load_workbook is None, "openpyxl is not installed")
+    def test_xlsx(self):
+        response = self.export(year=2025, month=9, format='xlsx')
+        self.assertIn('production_report_2025_09.xlsx', response['Content-Disposition'])
+        sheet = load_workbook(BytesIO(b''.join(response.streaming_content)))['Production Report']
+        rows = list(sheet.values)
+        self.assertEqual(list(rows[0]), EXPORT_HEADER)
+        self.assertEqual(rows[1][:5], (2025, 'September', 'Project 0', 'Regular Project', 'Resource 0'))
+        self.assertEqual(len(rows), 5)
+
+
+class ArchiveYearTests(TestCase):
+
+    def setUp(self):
+        clear_archive_cache()
+        self.addCleanup(clear_archive_cache)
+
+    def test_archived_months_read_transparently(self):
+        create_month(3, year=2020, month=8)
+        create_month(2, year=2025, month=8)
+        report = build_month_report(2020, 8)
+        exported = list(export_rows())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = archive_year(2020)
+
+        self.assertEqual((result.resources, result.projects, result.allocations), (8, 3, 12))
+        self.assertFalse(Project.objects.filter(year=2020).exists())
+        self.assertFalse(ResourceModel.objects.filter(year=2020).exists())
+        self.assertEqual(ArchivedProject.objects.count(), 3)
+        self.assertEqual(Project.objects.for_month(2025, 8).count(), 2)
+        self.assertEqual(build_month_report(2020, 8), report)
+        self.assertEqual(list(export_rows()), exported)
+        self.assertEqual(list(export_rows(year=2020)), exported[:12])
+
+    def test_archiving_keeps_report_list_and_export(self):
+        cache.clear()
+        create_month(3, year=2020, month=8)
+        urls = [
+            reverse('month_report', args=[2020, 8]),
+            reverse('resource_list') + '?year=2020&format=json',
+            reverse('resource_list') + '?year=2020&month=8&format=json',
+            reverse('export_report') + '?year=2020',
+        ]
+
+        def pages():
+            responses = [self.client.get(url) for url in urls]
+            return [b''.join(response) for response in responses]
+
+        before = pages()
+        self.assertFalse(is_archived(2020))
+        with self.captureOnCommitCallbacks(execute=True):
+            archive_year(2020)
+
+        # Every process sees the archived year through the shared cache
+        self.assertTrue(is_archived(2020))
+        self.assertEqual(pages(), before)
+        self.assertFalse(ResourceModel.objects.filter(year=2020).exists())
+
+    def test_api_reads_an_archived_year(self):
+        create_month(3, year=2020, month=8)
+        create_month(2, year=2021, month=8)
+        urls = [reverse(name) for name in ('api_projects', 'api_resources', 'api_allocations')]
+
+        def pages():
+            return [
+                self.client.get(url, params).json()
+                for url in urls for params in ({'year': 2020}, {'year': 2020, 'month': 8})
+            ]
+
+        before = pages()
+        with self.captureOnCommitCallbacks(execute=True):
+            archive_year(2020)
+
+        self.assertEqual(pages(), before)
+        self.assertEqual([len(page['results']) for page in before], [3, 3, 8, 8, 12, 12])
+        # Other years still read the live rows
+        response = self.client.get(urls[0], {'year': 2021, 'month': 8}).json()
+        self.assertEqual(len(response['results']), 2)
+
+    def test_month_grid_and_rollover_read_an_archived_month(self):
+        create_month(3, year=2020, month=12)
+        grid = month_grid(2020, 12)
+        with self.captureOnCommitCallbacks(execute=True):
+            archive_year(2020)
+
+        self.assertEqual(month_grid(2020, 12), grid)
+        result = roll_over_month(2020, 12)
+        self.assertEqual((result.resources, result.projects, result.allocations), (8, 3, 12))
+
+    def test_refuses_open_or_archived_years(self):
+        with self.assertRaises(ArchiveError):
+            archive_year(date.today().year)
+        archive_year(2020)
+        with self.assertRaises(ArchiveError):
+            archive_year(2020)
+
+
+class CloseMonthTests(TestCase):
+
+    def setUp(self):
+        snapshot_root = tempfile.TemporaryDirectory()
+        self.addCleanup(snapshot_root.cleanup)
+        self.enterContext(override_settings(REPORT_SNAPSHOT_ROOT=snapshot_root.name))
+        clear_closed_months_cache()
+        self.addCleanup(clear_closed_months_cache)
+        self.project = create_month(3, year=2020, month=8)[0]
+
+    def test_closed_month_is_served_from_snapshot(self):
+        report = close_month(2020, 8)
+
+        self.assertEqual(json.loads(snapshot_path(2020, 8, 'json').read_text()), report)
+        # Only the closed months are read, then kept in the shared cache
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('month_report', args=[2020, 8]))
+            page = self.client.get(reverse('month_report_page', args=[2020, 8]))
+        self.assertEqual(response.json(), build_month_report(2020, 8))
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertContains(page, 'Project 0')
+
+    def test_failed_close_leaves_no_snapshot(self):
+        replace = os.replace
+
+        def replace_json_only(source, target):
+            if str(target).endswith('.html'):
+                raise OSError("No space left on device")
+            replace(source, target)
+
+        for failure in [
+            mock.patch('projects.snapshots.render_month_page', side_effect=RuntimeError("template error")),
+            mock.patch('projects.snapshots.os.replace', side_effect=replace_json_only),
+        ]:
+            with self.subTest(failure=failure), failure, self.assertRaises(Exception):
+                close_month(2020, 8)
+            self.assertFalse(ClosedMonth.objects.exists())
+            self.assertEqual([path for path in snapshot_root().rglob('*') if path.is_file()], [])
+
+        # A snapshot left for a month that is not closed is not served
+        snapshot_path(2020, 8, 'json').parent.mkdir(parents=True, exist_ok=True)
+        snapshot_path(2020, 8, 'json').write_text('{"stale": true}')
+        response = self.client.get(reverse('month_report', args=[2020, 8]))
+        self.assertEqual(response.json(), build_month_report(2020, 8))
+
+    def test_closed_month_is_locked(self):
+        close_month(2020, 8)
+
+        result = apply_grid_changes(2020, 8, [{'project': self.project.pk, 'resource': None}])
+        self.assertEqual(result.errors, [{'messages': ['August 2020 is closed and can no longer be edited']}])
+        form = ProjectForm({'project_name': 'Renamed', 'project_type': 'REGULAR'}, instance=self.project)
+        self.assertFalse(form.is_valid())
+        with self.assertRaises(MonthClosed):
+            roll_over_month(2020, 7)
+        with self.assertRaises(SnapshotError):
+            close_month(2020, 8)
+        with self.assertRaises(SnapshotError):
+            close_month(date.today().year, date.today().month)
+
+
+class CloseMonthSharingTests(TransactionTestCase):
+
+    def setUp(self):
+        snapshot_root = tempfile.TemporaryDirectory()
+        self.addCleanup(snapshot_root.cleanup)
+        self.enterContext(override_settings(REPORT_SNAPSHOT_ROOT=snapshot_root.name))
+        clear_closed_months_cache()
+        self.addCleanup(clear_closed_months_cache)
+        create_month(1, year=2020, month=8)
+
+    def in_other_worker(self, func):
+        # A thread has its own cache and database connections, like another process
+        result = {}
+
+        def run():
+            try:
+                result['value'] = func()
+            except Exception as exc:
+                result['error'] = exc
+            finally:
+                connections.close_all()
+
+        worker = threading.Thread(target=run)
+        worker.start()
+        worker.join()
+        if 'error' in result:
+            raise result['error']
+        return result['value']
+
+    def test_other_workers_see_the_close(self):
+        self.assertFalse(self.in_other_worker(lambda: is_month_closed(2020, 8)))
+        close_month(2020, 8)
+        self.assertTrue(self.in_other_worker(lambda: is_month_closed(2020, 8)))
+        with self.assertRaises(MonthClosed):
+            self.in_other_worker(lambda: check_month_open(2020, 8))
+
+    def test_this_worker_sees_closes_by_others(self):
+        self.assertFalse(is_month_closed(2020, 9))
+        # What close_month does in another process once it commits
+        ClosedMonth.objects.create(year=2020, month=9)
+        cache.delete(CLOSED_MONTHS_KEY)
+        self.assertTrue(is_month_closed(2020, 9))
+
+
+class RolloverTests(TestCase):
+
+    def setUp(self):
+        # Project 0 has Resources 0-3, Project 1 has Resources 1-4, of Resources 0-7
+        create_month(2)
+
+    def assertRolledOver(self, result, resources, projects, allocations):
+        self.assertEqual((result.year, result.month), (2025, 9))
+        self.assertEqual((result.resources, result.projects, result.allocations), (resources, projects, allocations))
+
+    def test_empty_target_month(self):
+        self.assertRolledOver(roll_over_month(2025, 8), resources=8, projects=2, allocations=8)
+        self.assertEqual(ProjectResource.objects.filter(project__month=9).count(), 8)
+        # Nothing left to copy on a re-run
+        self.assertRolledOver(roll_over_month(2025, 8), resources=0, projects=0, allocations=0)
+
+    def test_partly_filled_target_month(self):
+        project = Project.objects.create(project_name="Project 0", year=2025, month=9)
+        resource = ResourceModel.objects.create(resource_name="Resource 0", year=2025, month=9)
+        ProjectResource.objects.create(project=project, resource=resource)
+        self.assertRolledOver(roll_over_month(2025, 8), resources=7, projects=1, allocations=7)
+        self.assertEqual(ProjectResource.objects.filter(project__month=9).count(), 8)
+
+
+@override_settings(
+    MIDDLEWARE=settings.MIDDLEWARE + ['projects.middleware.PerformanceMiddleware'],
+    # Wall times depend on the machine running the tests: check queries only
+    PERFORMANCE_BUDGETS={view: {'queries': budget['queries']} for view, budget in DEFAULT_BUDGETS.items()},
+    PERFORMANCE_BUDGETS_STRICT=True,
+    TEMPLATES=[{**settings.TEMPLATES[0], 'BACKEND': 'projects.middleware.TimedDjangoTemplates'}],
+)
+class PerformanceBudgetTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        job_files = tempfile.TemporaryDirectory()
+        self.addCleanup(job_files.cleanup)
+        self.enterContext(override_settings(JOB_FILES_ROOT=job_files.name))
+        create_month(20)
+        enqueue('export_report', year=2025, month=8)
+        export = run_job(claim_job('test'))
+        self.url_kwargs = {
+            'year': 2025,
+            'month': 8,
+            'pk': ResourceModel.objects.first().pk,
+            'job_id': export.pk,
+        }
+
+    def test_views_stay_within_budget(self):
+        for pattern in project_urls.urlpatterns + resource_urls.urlpatterns:
+            with self.subTest(view=pattern.name):
+                self.assertIn(pattern.name, DEFAULT_BUDGETS)
+                kwargs = {name: self.url_kwargs[name] for name in pattern.pattern.converters}
+                response = self.client.get(reverse(pattern.name, kwargs=kwargs))
+                self.assertLess(response.status_code, 400)
+                self.assertIn('db;dur=', response['Server-Timing'])
+                if response.streaming:
+                    # Checked once the body has been sent
+                    b''.join(response.streaming_content)
+
+    def test_streamed_queries_are_counted(self):
+        with override_settings(PERFORMANCE_BUDGETS={'export_report': {'queries': 0}}):
+            response = self.client.get(reverse('export_report'), {'year': 2025, 'month': 8})
+            self.assertIn('desc="0 queries"', response['Server-Timing'])
+            with self.assertRaisesMessage(PerformanceBudgetExceeded, "View export_report exceeded its budget"):
+                b''.join(response.streaming_content)
+
+    def test_template_time(self):
+        response = self.client.get(reverse('resource_list'))
+        self.assertNotIn('tpl;dur=0.0,', response['Server-Timing'])
+
+
+class BenchmarkCommandTests(TestCase):
+
+    def test_benchmarks_leave_no_rows_or_cache_entries_behind(self):
+        cache.clear()
+        call_command(
+            'seed_benchmark_data', resources=6, projects=2, months=1, start_year=2025, start_month=8,
+            stdout=StringIO(),
+        )
+        self.assertEqual(ResourceModel.objects.count(), 6)
+        get_month_report(2025, 8)
+        cache.set('sentinel', 'kept')
+
+        def state():
+            rows = {model._meta.label: model._default_manager.count() for model in apps.get_models()}
+            keys = ['sentinel', CALENDAR_GENERATION_KEY, 'month-report:2025:8:generation']
+            return rows, cache.get_many(keys), cache_stats()
+
+        before = state()
+        with tempfile.TemporaryDirectory() as directory:
+            call_command(
+                'run_benchmarks', repeat=1, baseline=os.path.join(directory, 'baseline.json'), stdout=StringIO()
+            )
+        self.assertEqual(state(), before)
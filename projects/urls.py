@@ -1,6 +1,22 @@
 from django.urls import path
-from .views import dashboard_home
+from .api import allocation_list_api, project_list_api, resource_list_api
+from .views import (
+    allocation_grid, dashboard_home, export_report, job_download, job_list, job_status, month_report,
+    month_report_async, month_report_page, report_cache_stats,
+)
 
 urlpatterns = [
     path('', dashboard_home, name='dashboard_home'),
+    path('report/<int:year>/<int:month>/', month_report, name='month_report'),
+    path('report/<int:year>/<int:month>/page/', month_report_page, name='month_report_page'),
+    path('async/report/<int:year>/<int:month>/', month_report_async, name='month_report_async'),
+    path('report/cache-stats/', report_cache_stats, name='report_cache_stats'),
+    path('export/', export_report, name='export_report'),
+    path('grid/<int:year>/<int:month>/', allocation_grid, name='allocation_grid'),
+    path('jobs/', job_list, name='job_list'),
+    path('jobs/<int:job_id>/', job_status, name='job_status'),
+    path('jobs/<int:job_id>/download/', job_download, name='job_download'),
+    path('api/projects/', project_list_api, name='api_projects'),
+    path('api/resources/', resource_list_api, name='api_resources'),
+    path('api/allocations/', allocation_list_api, name='api_allocations'),
 ]
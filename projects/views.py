@@ -1,8 +1,22 @@
-from django.shortcuts import render, redirect
+from django.shortcuts import get_object_or_404, render, redirect
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from datetime import datetime
+from tempfile import TemporaryFile
+import json
 from django.contrib import messages
-from .models import ResourceModel
+from django.urls import reverse
+from resources.jobs import enqueue, job_files_root, job_state
+from resources.models import Job
+from .forms import JobForm
+from .models import Project, ProjectResource, ResourceModel
+from .grid import apply_grid_changes, month_grid
+from .exports import XLSXUnavailable, export_filename, export_rows, iter_csv, write_xlsx
+from .report_cache import aget_month_report, cache_stats, get_month_report
+from resources.conditional import aggregate_freshness, conditional_month_view
+from .routers import reads_from_replica
+from .snapshots import render_month_page, serves_snapshot
 
+@reads_from_replica
 def dashboard_home(request):
     years = list(range(2020, 2031))
     months = [
@@ -12,6 +26,160 @@ def dashboard_home(request):
     return render(request, 'home.html', {
         'years': years,
         'months': months,
-        'current_year': datetime.now().year
+        'current_year': datetime.now().year,
     })
 
+
+def _month_freshness(request, year, month):
+    return (year, month, *aggregate_freshness([
+        Project.objects.for_month(year, month),
+        ProjectResource.objects.for_month(year, month),
+        ResourceModel.objects.for_month(year, month),
+    ]))
+
+
+@serves_snapshot('json')
+@reads_from_replica
+@conditional_month_view(_month_freshness)
+def month_report(request, year, month):
+    """
+    JSON report for a single month, fetched by the dashboard month tabs.
+    Closed months are served from their snapshot.
+    """
+    if not 1 <= month <= 12:
+        raise Http404("Invalid month")
+    return JsonResponse(get_month_report(year, month))
+
+
+@serves_snapshot('json')
+@reads_from_replica
+async def month_report_async(request, year, month):
+    """
+    month_report for the ASGI server; the report's queries run concurrently.
+    """
+    if not 1 <= month <= 12:
+        raise Http404("Invalid month")
+    return JsonResponse(await aget_month_report(year, month))
+
+
+@serves_snapshot('html')
+@reads_from_replica
+def month_report_page(request, year, month):
+    """
+    Standalone HTML page of a month's report, as written to the snapshot
+    when the month is closed.
+    """
+    if not 1 <= month <= 12:
+        raise Http404("Invalid month")
+    return HttpResponse(render_month_page(get_month_report(year, month), request=request))
+
+
+def report_cache_stats(request):
+    """
+    Hit/miss counters of the month report cache.
+    """
+    return JsonResponse(cache_stats())
+
+
+@reads_from_replica
+def export_report(request):
+    """
+    Stream the production report (one row per project allocation) as CSV
+    or XLSX. ``year`` and ``month`` are optional, so a whole year or the
+    full history can be exported.
+    """
+    try:
+        year = int(request.GET['year']) if request.GET.get('year') else None
+        month = int(request.GET['month']) if request.GET.get('month') else None
+    except ValueError:
+        return HttpResponseBadRequest('Invalid year or month')
+    if month is not None and not 1 <= month <= 12:
+        return HttpResponseBadRequest('Invalid year or month')
+
+    rows = export_rows(year, month)
+    if request.GET.get('format') == 'xlsx':
+        # openpyxl needs a seekable file; spool it to disk and stream it back
+        stream = TemporaryFile()
+        try:
+            write_xlsx(rows, stream)
+        except XLSXUnavailable as exc:
+            stream.close()
+            return HttpResponseBadRequest(str(exc))
+        stream.seek(0)
+        return FileResponse(
+            stream,
+            as_attachment=True,
+            filename=export_filename(year, month, 'xlsx'),
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+
+    return StreamingHttpResponse(
+        iter_csv(rows),
+        content_type='text/csv',
+        headers={'Content-Disposition': f'attachment; filename="{export_filename(year, month)}"'},
+    )
+
+
+def allocation_grid(request, year, month):
+    """
+    GET: the month's resources × projects allocation grid as JSON.
+    POST: a JSON body ``{"changes": [{"project": id, "resource": id,
+    "present_day": ..., "billable_days": ..., "non_billable_days": ...}]}``
+    applied in one batch; nothing is saved if any cell is invalid.
+    """
+    if not 1 <= month <= 12:
+        raise Http404("Invalid month")
+    if request.method != 'POST':
+        return JsonResponse(month_grid(year, month))
+
+    try:
+        changes = json.loads(request.body)['changes']
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'errors': [{'messages': ['Expected a JSON object with a "changes" list']}]}, status=400)
+    if not isinstance(changes, list):
+        return JsonResponse({'errors': [{'messages': ['"changes" must be a list']}]}, status=400)
+
+    result = apply_grid_changes(year, month, changes)
+    if result.errors:
+        return JsonResponse({'errors': result.errors}, status=400)
+    return JsonResponse({'created': result.created, 'updated': result.updated})
+
+
+def _job_json(job):
+    state = job_state(job)
+    state['status_url'] = reverse('job_status', args=[job.pk])
+    if job.status == Job.DONE and (job.result or {}).get('file'):
+        state['download_url'] = reverse('job_download', args=[job.pk])
+    return state
+
+
+def job_list(request):
+    """
+    GET: the most recent background jobs.
+    POST: queue an export or rebuild (see JobForm); answers 202 with the
+    job's state, whose ``status_url`` the UI polls for progress.
+    """
+    if request.method == 'POST':
+        form = JobForm(request.POST)
+        if not form.is_valid():
+            return JsonResponse({'errors': form.errors}, status=400)
+        job = enqueue(form.cleaned_data['kind'], **form.job_params())
+        return JsonResponse(_job_json(job), status=202)
+    return JsonResponse({'results': [_job_json(job) for job in Job.objects.all()[:20]]})
+
+
+def job_status(request, job_id):
+    return JsonResponse(_job_json(get_object_or_404(Job, pk=job_id)))
+
+
+def job_download(request, job_id):
+    """
+    The file written by a finished export job.
+    """
+    job = get_object_or_404(Job, pk=job_id, status=Job.DONE)
+    name = (job.result or {}).get('file')
+    root = job_files_root().resolve()
+    path = (root / name).resolve() if name else None
+    if path is None or not path.is_relative_to(root) or not path.is_file():
+        raise Http404("No file for this job")
+    return FileResponse(path.open('rb'), as_attachment=True, filename=job.result.get('filename', path.name))
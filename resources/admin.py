@@ -1,11 +1,37 @@
 # resources - admin.py
 from django.contrib import admin
-from .models import ResourceModel
+from .closing import is_month_closed
+from .models import Attendance, Holiday, Job, Person, ResourceModel
  
 # Register your models here.
+
+
+class ClosedMonthLockMixin:
+    """
+    Makes rows of closed months read-only in the admin. ``month_of(obj)``
+    returns the (year, month) an object belongs to.
+    """
+
+    def month_of(self, obj):
+        return obj.year, obj.month
+
+    def is_locked(self, obj):
+        return obj is not None and is_month_closed(*self.month_of(obj))
+
+    def has_add_permission(self, request, *args):
+        # Inlines pass the parent object
+        parent = args[0] if args else None
+        return not self.is_locked(parent) and super().has_add_permission(request, *args)
+
+    def has_change_permission(self, request, obj=None):
+        return not self.is_locked(obj) and super().has_change_permission(request, obj)
+
+    def has_delete_permission(self, request, obj=None):
+        return not self.is_locked(obj) and super().has_delete_permission(request, obj)
+
  
 @admin.register(ResourceModel)
-class ResourceModelAdmin(admin.ModelAdmin):
+class ResourceModelAdmin(ClosedMonthLockMixin, admin.ModelAdmin):
     list_display = (
         'resource_name',
         'working_days',
@@ -14,5 +40,55 @@ class ResourceModelAdmin(admin.ModelAdmin):
     )
     search_fields = ('resource_name',)
     list_filter = ('working_days',)
- 
- 
\ No newline at end of file
+
+
+@admin.register(Holiday)
+class HolidayAdmin(admin.ModelAdmin):
+    list_display = ('date', 'name', 'is_half_day')
+    list_filter = ('is_half_day',)
+    search_fields = ('name',)
+
+
+class ReadOnlyAttendance:
+    """
+    Attendance mirrors the resource rows' present_day (see
+    resources.attendance), which overwrite any edit made here: it is shown
+    read-only.
+    """
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+class AttendanceInline(ReadOnlyAttendance, admin.TabularInline):
+    model = Attendance
+    extra = 0
+    fields = ('year', 'month', 'days')
+
+
+@admin.register(Person)
+class PersonAdmin(admin.ModelAdmin):
+    list_display = ('name', 'created_at')
+    search_fields = ('name',)
+    inlines = [AttendanceInline]
+
+
+@admin.register(Attendance)
+class AttendanceAdmin(ReadOnlyAttendance, admin.ModelAdmin):
+    list_display = ('person', 'year', 'month', 'days', 'present_days')
+    list_filter = ('year', 'month')
+    list_select_related = ('person',)
+    search_fields = ('person__name',)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'done', 'total', 'worker', 'created_at', 'finished_at')
+    list_filter = ('status', 'kind')
+    readonly_fields = [field.name for field in Job._meta.fields]
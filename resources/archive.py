@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import ArchivedYear
+
+ARCHIVED_YEARS_KEY = 'archived-years'
+
+
+def _cache():
+    return caches[getattr(settings, 'ARCHIVED_YEARS_CACHE_ALIAS', 'default')]
+
+
+def archived_years():
+    """
+    Years moved to the archive tables, kept for ARCHIVED_YEARS_CACHE_SECONDS
+    (default 3600) in the ARCHIVED_YEARS_CACHE_ALIAS cache (default
+    'default'). archive_year drops the entry when it commits, so with a
+    cache shared between processes every worker reads an archived year
+    from the archive right away.
+    """
+    cache = _cache()
+    years = cache.get(ARCHIVED_YEARS_KEY)
+    if years is None:
+        years = frozenset(ArchivedYear.objects.values_list('year', flat=True))
+        cache.set(ARCHIVED_YEARS_KEY, years, timeout=getattr(settings, 'ARCHIVED_YEARS_CACHE_SECONDS', 3600))
+    return years
+
+
+def is_archived(year):
+    return year in archived_years()
+
+
+def clear_archive_cache():
+    _cache().delete(ARCHIVED_YEARS_KEY)
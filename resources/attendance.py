@@ -0,0 +1,103 @@
+import calendar
+from datetime import date
+
+from .models import Attendance, Person, ResourceModel
+from .working_calendar import get_month_calendar
+
+
+def month_day_states(year, month, present_day, holidays=(), half_days=()):
+    """
+    Day states for a month in which only the number of days present is
+    known: the working days (Mon–Fri + 1st Saturday, minus ``holidays``)
+    are marked present in date order until ``present_day`` is used up, the
+    rest absent. A half-day holiday is worth half a day.
+    """
+    first_day, num_days = calendar.monthrange(year, month)
+    first_saturday = date(year, month, (5 - first_day) % 7 + 1)
+    remaining = present_day or 0
+    states = []
+    for day in range(1, num_days + 1):
+        current = date(year, month, day)
+        if (current.weekday() >= 5 and current != first_saturday) or current in holidays:
+            states.append(Attendance.OFF)
+            continue
+        if current in half_days:
+            present = remaining >= 0.5
+            states.append(Attendance.HALF_DAY if present else Attendance.ABSENT)
+            remaining -= 0.5 if present else 0
+        elif remaining >= 1:
+            states.append(Attendance.PRESENT)
+            remaining -= 1
+        elif remaining >= 0.5:
+            states.append(Attendance.HALF_DAY)
+            remaining -= 0.5
+        else:
+            states.append(Attendance.ABSENT)
+    return ''.join(states)
+
+
+def upsert_attendance(resources, batch_size=500):
+    """
+    Write the Attendance month of each resource row, from its ``present_day``,
+    in one upsert per batch. The rows must already be linked to a Person.
+    """
+    attendance = {}
+    for resource in resources:
+        month_calendar = get_month_calendar(resource.year, resource.month)
+        attendance.setdefault((resource.person_id, resource.year, resource.month), Attendance(
+            person_id=resource.person_id,
+            year=resource.year,
+            month=resource.month,
+            days=month_day_states(
+                resource.year,
+                resource.month,
+                resource.present_day,
+                month_calendar.holidays,
+                month_calendar.half_days,
+            ),
+        ))
+    Attendance.objects.bulk_create(
+        attendance.values(),
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['person', 'year', 'month'],
+        update_fields=['days'],
+    )
+
+
+def refresh_attendance(person_id, year, month):
+    """
+    Rewrite a person's Attendance month from their first resource row of
+    that month (the one imports update), or delete it once no row is left.
+    Rows with the same name and month share one Attendance row.
+    """
+    resource = ResourceModel.objects.filter(person_id=person_id, year=year, month=month).order_by('pk').first()
+    if resource is None:
+        Attendance.objects.filter(person_id=person_id, year=year, month=month).delete()
+    else:
+        upsert_attendance([resource])
+
+
+def sync_attendance(resources, batch_size=500):
+    """
+    Link each resource row to its Person (by resource_name) and upsert the
+    matching Attendance month.
+
+    For the bulk write paths that skip ResourceModel.save(); costs a fixed
+    number of queries per batch.
+    """
+    resources = list(resources)
+    if not resources:
+        return
+    names = {resource.resource_name for resource in resources}
+    Person.objects.bulk_create([Person(name=name) for name in names], batch_size=batch_size, ignore_conflicts=True)
+    people = dict(Person.objects.filter(name__in=names).values_list('name', 'pk'))
+
+    relinked = []
+    for resource in resources:
+        person_id = people[resource.resource_name]
+        if resource.person_id != person_id:
+            resource.person_id = person_id
+            relinked.append(resource)
+    ResourceModel.objects.bulk_update(relinked, ['person'], batch_size=batch_size)
+    upsert_attendance(resources, batch_size=batch_size)
@@ -0,0 +1,93 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Value
+from django.db.models.functions import Concat, Lower
+
+from .models import ResourceModel
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+# Sorts after every other character, closing the prefix range
+_PREFIX_END = '\U0010ffff'
+
+KEY_PREFIX = 'resource-search'
+GENERATION_KEY = f'{KEY_PREFIX}:generation'
+
+
+def prefix_filter(queryset, term):
+    """
+    Case-insensitive prefix match on resource_name, written as a range on
+    LOWER(resource_name) so the expression indexes can serve it (a LIKE
+    'term%' would not use them). The term is lowered by the database too,
+    so both sides fold case the same way: SQLite's LOWER only folds ASCII,
+    so there "é" does not match "É", but "É" does.
+    """
+    term = term.strip()
+    queryset = queryset.annotate(name_key=Lower('resource_name'))
+    if not term:
+        return queryset
+    return queryset.filter(
+        name_key__gte=Lower(Value(term)),
+        name_key__lt=Concat(Lower(Value(term)), Value(_PREFIX_END)),
+    )
+
+
+def _cache():
+    return caches[getattr(settings, 'SEARCH_CACHE_ALIAS', 'default')]
+
+
+def _search_key(generation, term, year, month, limit):
+    digest = hashlib.sha1(term.encode()).hexdigest()
+    return f'{KEY_PREFIX}:{generation}:{year}:{month}:{limit}:{digest}'
+
+
+def search_resources(term, year=None, month=None, limit=DEFAULT_LIMIT):
+    """
+    Resources whose name starts with ``term``, optionally within one
+    year/month, as (results, more) for the autocomplete endpoint. An
+    archived year is searched in the archive.
+
+    Cached for SEARCH_CACHE_SECONDS (default 300) in the SEARCH_CACHE_ALIAS
+    cache (default 'default') under a generation that clear_search_cache
+    bumps whenever resources change (see resources.signals).
+    """
+    term = term.strip()
+    cache = _cache()
+    generation = cache.get_or_set(GENERATION_KEY, time.time_ns, timeout=None)
+    key = _search_key(generation, term, year, month, limit)
+    found = cache.get(key)
+    if found is not None:
+        return found
+
+    resources = ResourceModel.objects.all()
+    if year:
+        resources = ResourceModel.objects.for_year(year)
+    if month:
+        resources = resources.filter(month=month)
+    rows = list(
+        prefix_filter(resources, term)
+        .order_by('name_key', '-year', '-month', 'pk')
+        .values('pk', 'resource_name', 'year', 'month')[:limit + 1]
+    )
+    results = tuple(
+        {'id': row['pk'], 'text': row['resource_name'], 'year': row['year'], 'month': row['month']}
+        for row in rows[:limit]
+    )
+    found = results, len(rows) > limit
+    cache.set(key, found, timeout=getattr(settings, 'SEARCH_CACHE_SECONDS', 300))
+    return found
+
+
+def clear_search_cache():
+    """
+    Drop the cached searches of every process sharing the cache.
+    """
+    cache = _cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:  # not set yet, or evicted
+        # Seeded with the time, so it never returns to an older generation
+        cache.set(GENERATION_KEY, time.time_ns(), timeout=None)
@@ -0,0 +1,52 @@
+import calendar
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import ClosedMonth
+
+CLOSED_MONTHS_KEY = 'closed-months'
+
+
+class MonthClosed(Exception):
+    pass
+
+
+def _cache():
+    return caches[getattr(settings, 'CLOSED_MONTHS_CACHE_ALIAS', 'default')]
+
+
+def closed_months():
+    """
+    (year, month) pairs frozen by close_month, kept for
+    CLOSED_MONTHS_CACHE_SECONDS (default 3600) in the
+    CLOSED_MONTHS_CACHE_ALIAS cache (default 'default'). close_month drops
+    the entry when it commits, so with a cache shared between processes
+    every worker refuses edits to the month right away.
+    """
+    cache = _cache()
+    months = cache.get(CLOSED_MONTHS_KEY)
+    if months is None:
+        months = frozenset(ClosedMonth.objects.values_list('year', 'month'))
+        cache.set(CLOSED_MONTHS_KEY, months, timeout=getattr(settings, 'CLOSED_MONTHS_CACHE_SECONDS', 3600))
+    return months
+
+
+def is_month_closed(year, month):
+    return (year, month) in closed_months()
+
+
+def closed_month_message(year, month):
+    return f"{calendar.month_name[month]} {year} is closed and can no longer be edited"
+
+
+def check_month_open(year, month):
+    """
+    Raise MonthClosed when (year, month) has been closed.
+    """
+    if is_month_closed(year, month):
+        raise MonthClosed(closed_month_message(year, month))
+
+
+def clear_closed_months_cache():
+    _cache().delete(CLOSED_MONTHS_KEY)
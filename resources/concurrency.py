@@ -0,0 +1,29 @@
+from asgiref.sync import sync_to_async
+from django.db import connection, connections
+
+
+def on_own_connection(func):
+    """
+    Async wrapper running ``func`` in a worker thread with its own database
+    connections, closed again afterwards.
+    """
+    def run(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            connections.close_all()
+    return sync_to_async(run, thread_sensitive=False)
+
+
+async def query_runner():
+    """
+    Wrapper for independent queries gathered with asyncio.gather.
+
+    Django's async ORM funnels every query through one thread, so it cannot
+    overlap them: outside a transaction each query gets a worker thread and
+    connection of its own (on_own_connection). Inside one they stay on the
+    request's connection (sync_to_async), since other connections cannot
+    see its writes.
+    """
+    in_transaction = await sync_to_async(lambda: connection.in_atomic_block)()
+    return sync_to_async if in_transaction else on_own_connection
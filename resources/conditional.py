@@ -0,0 +1,93 @@
+import hashlib
+from datetime import date
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.db.models import Count, Max, Value
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from .closing import is_month_closed
+from .models import ResourceModel
+
+
+def is_past_month(year, month):
+    today = date.today()
+    return (year, month) < (today.year, today.month)
+
+
+def aggregate_freshness(querysets):
+    """
+    (last modified, row count) over several querysets in one query: each
+    is reduced to a single (max updated_at, count) row and the rows are
+    combined with UNION ALL.
+    """
+    combined = [
+        queryset.order_by()
+        .annotate(scope=Value(1))
+        .values('scope')
+        .annotate(updated=Max('updated_at'), count=Count('pk'))
+        .values_list('updated', 'count')
+        for queryset in querysets
+    ]
+    rows = combined[0].union(*combined[1:], all=True) if len(combined) > 1 else combined[0]
+    rows = list(rows)
+    updated = [row[0] for row in rows if row[0] is not None]
+    return (max(updated) if updated else None), sum(row[1] for row in rows)
+
+
+def resource_freshness(year=None, month=None):
+    resources = ResourceModel.objects.for_year(year) if year else ResourceModel.objects.all()
+    if month:
+        resources = resources.filter(month=month)
+    return aggregate_freshness([resources])
+
+
+def conditional_month_view(freshness):
+    """
+    Conditional GET (ETag/Last-Modified via Django's ``condition``) for a
+    month-scoped view, plus Cache-Control: months frozen by close_month
+    may be cached by anyone for CLOSED_MONTH_CACHE_SECONDS (default 1
+    hour); other pages are private and revalidated with their ETag, as
+    their rows can still change.
+
+    ``freshness(request, *args, **kwargs)`` returns (year, month,
+    last_modified, row_count); year/month may be None for unscoped pages.
+    It is evaluated once per request. Pages with pending flash messages are
+    always rendered, so the messages are not lost behind a 304.
+    """
+    def decorator(view):
+        def cached_freshness(request, *args, **kwargs):
+            if not hasattr(request, '_freshness'):
+                request._freshness = freshness(request, *args, **kwargs)
+            return request._freshness
+
+        def etag(request, *args, **kwargs):
+            _, _, last_modified, count = cached_freshness(request, *args, **kwargs)
+            partial = request.headers.get('HX-Request', '') + request.headers.get('X-Requested-With', '')
+            key = f"{request.get_full_path()}|{partial}|{last_modified}|{count}"
+            return hashlib.md5(key.encode()).hexdigest()
+
+        def last_modified(request, *args, **kwargs):
+            return cached_freshness(request, *args, **kwargs)[2]
+
+        conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if len(messages.get_messages(request)):
+                response = view(request, *args, **kwargs)
+                patch_cache_control(response, private=True, no_cache=True)
+                return response
+            response = conditional_view(request, *args, **kwargs)
+            year, month = cached_freshness(request, *args, **kwargs)[:2]
+            if year and month and is_month_closed(year, month):
+                patch_cache_control(response, public=True, max_age=getattr(settings, 'CLOSED_MONTH_CACHE_SECONDS', 3600))
+            else:
+                patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ('HX-Request', 'X-Requested-With'))
+            return response
+
+        return wrapper
+    return decorator
@@ -1,4 +1,5 @@
 from django import forms
+from .closing import closed_month_message, is_month_closed
 from .models import ResourceModel
  
 class ResourceForm(forms.ModelForm):
@@ -33,5 +34,33 @@ class ResourceForm(forms.ModelForm):
             self.fields['working_days'].help_text = f"Auto-calculated value: {self.instance.get_working_days_for_display()}"
         else:
             self.fields['working_days'].help_text = f"Auto-calculated if left blank: {ResourceModel().get_working_days_for_display()}"
+
+    def clean(self):
+        cleaned_data = super().clean()
+        # Neither the resource's current month nor the one it moves to may be closed
+        months = {(cleaned_data.get('year'), cleaned_data.get('month'))}
+        if self.instance.pk:
+            months.add((self.instance.year, self.instance.month))
+        for year, month in months:
+            if year and month and is_month_closed(year, month):
+                raise forms.ValidationError(closed_month_message(year, month))
+        return cleaned_data
  
- 
\ No newline at end of file
+ 
+
+class ResourceImportForm(forms.Form):
+    file = forms.FileField(
+        label='CSV or JSONL file',
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,.jsonl,.json'})
+    )
+    batch_size = forms.IntegerField(
+        initial=500,
+        min_value=1,
+        widget=forms.NumberInput(attrs={'class': 'form-control'})
+    )
+    background = forms.BooleanField(
+        required=False,
+        label='Run in the background',
+        help_text='Queue the import for the job workers and follow its progress here',
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
@@ -0,0 +1,163 @@
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+
+from .attendance import sync_attendance
+from .forms import ResourceForm
+from .models import ResourceModel
+from .signals import resources_bulk_changed
+from .working_calendar import get_month_calendar
+
+IMPORT_FIELDS = ['resource_name', 'working_days', 'present_day', 'year', 'month']
+
+
+@dataclass
+class RowError:
+    row: int
+    message: str
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    errors: list = field(default_factory=list)
+    months: set = field(default_factory=set)
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+def detect_format(filename):
+    return 'jsonl' if filename.lower().endswith(('.jsonl', '.json', '.ndjson')) else 'csv'
+
+
+def read_rows(stream, fmt='csv'):
+    """
+    Stream (row_number, data) pairs from a text stream of CSV (with a
+    header row) or JSONL. Lines that cannot be parsed are yielded with
+    data=None so they end up in the error report.
+    """
+    if fmt == 'csv':
+        for row_number, data in enumerate(csv.DictReader(stream), start=2):
+            yield row_number, data
+        return
+
+    for row_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            data = None
+        yield row_number, data if isinstance(data, dict) else None
+
+
+def read_upload(uploaded_file, fmt=None):
+    """
+    Stream rows from an uploaded file without reading it into memory.
+    """
+    fmt = fmt or detect_format(uploaded_file.name)
+    # newline='' leaves line endings inside quoted CSV fields to the csv module
+    return read_rows(io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline=''), fmt)
+
+
+def _validate(row_number, data, result):
+    if data is None:
+        result.errors.append(RowError(row_number, "Row could not be parsed"))
+        return None
+    form = ResourceForm({name: data.get(name) for name in IMPORT_FIELDS})
+    if not form.is_valid():
+        messages = [
+            f"{name}: {' '.join(errors)}" if name != '__all__' else ' '.join(errors)
+            for name, errors in form.errors.items()
+        ]
+        result.errors.append(RowError(row_number, "; ".join(messages)))
+        return None
+    return form.cleaned_data
+
+
+def _import_batch(batch, result, batch_size):
+    rows = {}
+    for row_number, data in batch:
+        cleaned = _validate(row_number, data, result)
+        if cleaned is None:
+            continue
+        # ResourceModel.save() defaults, applied per row since bulk_create skips save()
+        year, month = cleaned['year'], cleaned['month']
+        present_day = cleaned['present_day'] or 0
+        rows[(cleaned['resource_name'], year, month)] = {
+            'working_days': cleaned['working_days'] or get_month_calendar(year, month).working_days,
+            'present_day': present_day,
+            'present_hours': present_day * 8,
+        }
+    if not rows:
+        return
+
+    names = {name for name, _, _ in rows}
+    years = {year for _, year, _ in rows}
+    months = {month for _, _, month in rows}
+    existing = {}
+    for resource in ResourceModel.objects.filter(
+        resource_name__in=names, year__in=years, month__in=months
+    ).order_by('pk'):
+        existing.setdefault((resource.resource_name, resource.year, resource.month), resource)
+
+    to_create = []
+    to_update = []
+    now = timezone.now()
+    for (name, year, month), values in rows.items():
+        resource = existing.get((name, year, month))
+        if resource is None:
+            to_create.append(ResourceModel(resource_name=name, year=year, month=month, **values))
+        else:
+            for attr, value in values.items():
+                setattr(resource, attr, value)
+            resource.updated_at = now  # bulk_update skips auto_now
+            to_update.append(resource)
+
+    ResourceModel.objects.bulk_create(to_create, batch_size=batch_size)
+    ResourceModel.objects.bulk_update(
+        to_update, ['working_days', 'present_day', 'present_hours', 'updated_at'], batch_size=batch_size
+    )
+    sync_attendance(to_create + to_update, batch_size=batch_size)
+    result.created += len(to_create)
+    result.updated += len(to_update)
+    result.months.update((year, month) for _, year, month in rows)
+
+
+def import_resources(rows, batch_size=500, dry_run=False, progress=None):
+    """
+    Validate and insert/update resource rows in batches of ``batch_size``
+    inside a single transaction.
+
+    Rows are matched to existing resources on (resource_name, year, month);
+    matches are updated, the rest are created. Invalid rows are skipped and
+    reported in ImportResult.errors with their row number. With
+    ``dry_run`` everything is validated and counted, then rolled back.
+    ``progress(rows_read)`` is called after every batch.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    result = ImportResult()
+    rows = iter(rows)
+    read = 0
+    with transaction.atomic():
+        while batch := list(islice(rows, batch_size)):
+            _import_batch(batch, result, batch_size)
+            read += len(batch)
+            if progress:
+                progress(read)
+        if dry_run:
+            transaction.set_rollback(True)
+        elif result.months:
+            transaction.on_commit(
+                lambda: resources_bulk_changed.send(sender=ResourceModel, months=result.months)
+            )
+    return result
@@ -0,0 +1,311 @@
+import logging
+import threading
+import time
+import uuid
+from dataclasses import asdict
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, close_old_connections, connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .importers import import_resources, read_rows
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# kind -> handler(job, progress, **job.params), returning the job's JSON result
+HANDLERS = {}
+
+# Queued jobs a SQLite worker tries to claim before polling again
+CLAIM_CANDIDATES = 5
+# Skipped import rows kept in an import job's result
+MAX_REPORTED_ERRORS = 100
+
+
+def job_handler(kind):
+    """
+    Register ``handler(job, progress, **params)`` for jobs of ``kind``.
+    """
+    def register(handler):
+        HANDLERS[kind] = handler
+        return handler
+    return register
+
+
+def job_files_root():
+    """
+    Directory for job inputs (uploads) and outputs (exports): the
+    JOB_FILES_ROOT setting, by default ``job_files`` under BASE_DIR. The
+    web process and the workers must share it.
+    """
+    return Path(getattr(settings, 'JOB_FILES_ROOT', None) or Path(settings.BASE_DIR) / 'job_files')
+
+
+def job_file_path(*parts):
+    path = job_files_root().joinpath(*parts)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _progress_cache():
+    return caches[getattr(settings, 'JOB_PROGRESS_CACHE_ALIAS', 'default')]
+
+
+def _progress_key(pk):
+    return f'job-progress:{pk}'
+
+
+class JobProgress:
+    """
+    ``progress(done, total=None)`` callable handed to job handlers.
+
+    Progress is written at most every JOB_PROGRESS_INTERVAL seconds
+    (default 0.5) to the progress cache (JOB_PROGRESS_CACHE_ALIAS, default
+    'default'), and to the job row unless the handler is inside a
+    transaction, whose writes pollers could not see before it commits. Use
+    a cache shared between processes for live progress of such jobs.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.interval = getattr(settings, 'JOB_PROGRESS_INTERVAL', 0.5)
+        self.written = None
+
+    def __call__(self, done, total=None):
+        # The job row gets the latest values when the job finishes
+        self.job.done, self.job.total = done, total
+        now = time.monotonic()
+        if self.written is not None and now - self.written < self.interval:
+            return
+        self.written = now
+        _progress_cache().set(_progress_key(self.job.pk), (done, total), timeout=3600)
+        using = router.db_for_write(Job)
+        if not connections[using].in_atomic_block:
+            Job.objects.using(using).filter(pk=self.job.pk).update(
+                done=done, total=total, updated_at=timezone.now()
+            )
+
+
+def _lease_seconds():
+    return getattr(settings, 'JOB_LEASE_SECONDS', 300)
+
+
+class _Heartbeat:
+    """
+    Refreshes a running job's updated_at every third of its lease from a
+    thread with its own connection, so a job busy inside one long
+    transaction keeps its lease. SQLite has a single writer: there, keep
+    JOB_LEASE_SECONDS above the longest job transaction.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.beat, daemon=True)
+
+    def beat(self):
+        using = router.db_for_write(Job)
+        try:
+            while not self.stopped.wait(_lease_seconds() / 3):
+                try:
+                    Job.objects.using(using).filter(
+                        pk=self.job.pk, status=Job.RUNNING, worker=self.job.worker
+                    ).update(updated_at=timezone.now())
+                except DatabaseError:
+                    logger.warning("Heartbeat of job %s failed", self.job.pk, exc_info=True)
+        finally:
+            connections.close_all()
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+
+def enqueue(kind, **params):
+    """
+    Queue a job for the workers; ``params`` must be JSON-serializable.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    return Job.objects.create(kind=kind, params=params)
+
+
+def requeue_expired_jobs():
+    """
+    Take back running jobs whose heartbeat is older than JOB_LEASE_SECONDS
+    (default 300), as their worker died or hung: queue them again, or fail
+    them once they have been claimed JOB_MAX_ATTEMPTS times (default 3).
+    Returns the number of jobs taken back.
+    """
+    using = router.db_for_write(Job)
+    now = timezone.now()
+    expired = Job.objects.using(using).filter(
+        status=Job.RUNNING, updated_at__lt=now - timedelta(seconds=_lease_seconds())
+    )
+    # Look before writing: an UPDATE takes SQLite's write lock even when it
+    # matches nothing
+    expired_pks = list(expired.values_list('pk', flat=True))
+    if not expired_pks:
+        return 0
+    expired = expired.filter(pk__in=expired_pks)
+    max_attempts = getattr(settings, 'JOB_MAX_ATTEMPTS', 3)
+    failed = expired.filter(attempts__gte=max_attempts).update(
+        status=Job.FAILED, error="The worker stopped responding", finished_at=now, updated_at=now
+    )
+    requeued = expired.filter(attempts__lt=max_attempts).update(
+        status=Job.QUEUED, worker='', started_at=None, updated_at=now
+    )
+    if failed or requeued:
+        logger.warning("Took back %d expired jobs (%d failed, %d queued again)", failed + requeued, failed, requeued)
+    return failed + requeued
+
+
+def claim_job(worker, kinds=None):
+    """
+    Mark the oldest queued job as running for ``worker`` and return it, or
+    None when the queue is empty. Jobs whose lease expired are queued
+    again first (see requeue_expired_jobs).
+
+    Databases with SKIP LOCKED (PostgreSQL, MySQL 8, Oracle) lock the row
+    so concurrent workers pass over it. SQLite has no row locks: a worker
+    claims a job with a conditional UPDATE, which only one of them wins.
+    """
+    requeue_expired_jobs()
+    queued = Job.objects.filter(status=Job.QUEUED).order_by('created_at', 'pk')
+    if kinds:
+        queued = queued.filter(kind__in=kinds)
+    using = router.db_for_write(Job)
+    now = timezone.now()
+
+    if connections[using].features.has_select_for_update_skip_locked:
+        with transaction.atomic(using=using):
+            job = queued.using(using).select_for_update(skip_locked=True).first()
+            if job is not None:
+                job.status, job.worker, job.started_at = Job.RUNNING, worker, now
+                job.attempts += 1
+                job.save(update_fields=['status', 'worker', 'started_at', 'attempts', 'updated_at'])
+            return job
+
+    for pk in queued.using(using).values_list('pk', flat=True)[:CLAIM_CANDIDATES]:
+        claimed = Job.objects.using(using).filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, worker=worker, started_at=now, attempts=F('attempts') + 1, updated_at=now
+        )
+        if claimed:
+            return Job.objects.using(using).get(pk=pk)
+    return None
+
+
+def run_job(job):
+    """
+    Run a claimed job, keeping its lease alive, and record its result, or
+    its error if it raises. The outcome is dropped if the job was taken
+    back from this worker meanwhile.
+    """
+    try:
+        handler = HANDLERS.get(job.kind)
+        if handler is None:
+            raise ValueError(f"Unknown job kind: {job.kind}")
+        with _Heartbeat(job):
+            job.result = handler(job, JobProgress(job), **job.params)
+        job.status = Job.DONE
+        if job.total is not None:
+            job.done = job.total
+    except Exception as exc:
+        logger.exception("Job %s failed", job)
+        job.status = Job.FAILED
+        job.error = str(exc) or type(exc).__name__
+    job.finished_at = timezone.now()
+    finished = Job.objects.using(router.db_for_write(Job)).filter(
+        pk=job.pk, status=Job.RUNNING, worker=job.worker
+    ).update(
+        status=job.status, done=job.done, total=job.total, result=job.result, error=job.error,
+        finished_at=job.finished_at, updated_at=job.finished_at,
+    )
+    if not finished:
+        logger.warning("Job %s was taken back from %s after its lease expired; its outcome is dropped", job, job.worker)
+    _progress_cache().delete(_progress_key(job.pk))
+    return job
+
+
+def run_worker(name, stop=None, once=False, poll_interval=1.0, kinds=None):
+    """
+    Claim and run jobs until ``stop`` (a threading.Event) is set, or, with
+    ``once``, until the queue is empty. Returns the number of jobs run.
+    """
+    processed = 0
+    try:
+        while stop is None or not stop.is_set():
+            close_old_connections()
+            job = claim_job(name, kinds)
+            if job is None:
+                if once:
+                    break
+                if stop is None:
+                    time.sleep(poll_interval)
+                else:
+                    stop.wait(poll_interval)
+                continue
+            run_job(job)
+            processed += 1
+    finally:
+        # Each worker thread has its own connections
+        connections.close_all()
+    return processed
+
+
+def job_state(job):
+    """
+    JSON-ready state of a job, with the live progress of a running one.
+    """
+    done, total = job.done, job.total
+    if job.status == Job.RUNNING:
+        done, total = _progress_cache().get(_progress_key(job.pk), (done, total))
+    return {
+        'id': job.pk,
+        'kind': job.kind,
+        'status': job.status,
+        'done': done,
+        'total': total,
+        'percent': round(done * 100 / total, 1) if total else None,
+        'result': job.result,
+        'error': job.error or None,
+        'attempts': job.attempts,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+    }
+
+
+def save_upload(uploaded_file):
+    """
+    Copy an uploaded file under job_files_root() for a worker to read.
+    """
+    path = job_file_path('uploads', f"{uuid.uuid4().hex}{Path(uploaded_file.name).suffix.lower()}")
+    with path.open('wb') as stream:
+        for chunk in uploaded_file.chunks():
+            stream.write(chunk)
+    return path
+
+
+@job_handler('import_resources')
+def import_resources_job(job, progress, path, format='csv', batch_size=500):
+    path = Path(path)
+    try:
+        with path.open(encoding='utf-8-sig', newline='') as stream:
+            result = import_resources(read_rows(stream, format), batch_size=batch_size, progress=progress)
+    finally:
+        path.unlink(missing_ok=True)
+    return {
+        'created': result.created,
+        'updated': result.updated,
+        'skipped': len(result.errors),
+        'errors': [asdict(error) for error in result.errors[:MAX_REPORTED_ERRORS]],
+    }
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from resources.importers import detect_format, import_resources, read_rows
+
+
+class Command(BaseCommand):
+    help = "Import resource month rows from a CSV or JSONL file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV (with header) or JSONL file to import")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Defaults to the file extension")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help="Validate and roll back")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        fmt = options['format'] or detect_format(options['path'])
+        try:
+            stream = open(options['path'], encoding='utf-8-sig', newline='')
+        except OSError as exc:
+            raise CommandError(exc)
+
+        with stream:
+            result = import_resources(
+                read_rows(stream, fmt),
+                batch_size=options['batch_size'],
+                dry_run=options['dry_run'],
+            )
+
+        for error in result.errors:
+            self.stderr.write(f"Row {error.row}: {error.message}")
+        prefix = "Dry run: " if options['dry_run'] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{result.created} created, {result.updated} updated, {len(result.errors)} errors"
+        ))
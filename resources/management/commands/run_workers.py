@@ -0,0 +1,101 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+
+from django.core.management.base import BaseCommand
+
+
+def run_threads(threads, poll_interval, once, kinds, prefix):
+    """
+    Run ``threads`` workers in this process until interrupted or sent
+    SIGTERM (or, with ``once``, until the queue is empty); running jobs are
+    finished first. Returns the number of jobs run.
+    """
+    # Imported here: spawned worker processes load this module before
+    # django.setup()
+    from resources.jobs import run_worker
+
+    stop = threading.Event()
+    counts = [0] * threads
+
+    def work(index):
+        counts[index] = run_worker(
+            f"{prefix}:{index}", stop=stop, once=once, poll_interval=poll_interval, kinds=kinds
+        )
+
+    # Signal handlers can only be installed from the main thread
+    handles_signals = threading.current_thread() is threading.main_thread()
+    if handles_signals:
+        previous_handler = signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    pool = [threading.Thread(target=work, args=(index,), daemon=True) for index in range(threads)]
+    for thread in pool:
+        thread.start()
+    try:
+        for thread in pool:
+            # A timeout keeps the main thread responsive to Ctrl-C
+            while thread.is_alive():
+                thread.join(timeout=0.5)
+    except KeyboardInterrupt:
+        stop.set()
+        for thread in pool:
+            thread.join()
+    finally:
+        if handles_signals:
+            signal.signal(signal.SIGTERM, previous_handler)
+    return sum(counts)
+
+
+def _worker_process(threads, poll_interval, once, kinds):
+    # Started with the 'spawn' method: set Django up again in the child
+    import django
+    django.setup()
+    try:
+        run_threads(threads, poll_interval, once, kinds, f"{socket.gethostname()}:{os.getpid()}")
+    except KeyboardInterrupt:
+        pass
+
+
+class Command(BaseCommand):
+    help = "Run background jobs (imports, exports, rebuilds) from the job queue"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help="Worker processes (default 1)")
+        parser.add_argument('--threads', type=int, default=1, help="Worker threads per process (default 1)")
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Seconds to wait when the queue is empty")
+        parser.add_argument('--once', action='store_true', help="Exit once the queue is empty")
+        parser.add_argument('--kind', action='append', dest='kinds', help="Only run jobs of this kind (repeatable)")
+
+    def handle(self, *args, **options):
+        processes, threads = max(options['processes'], 1), max(options['threads'], 1)
+        worker_args = (threads, options['poll_interval'], options['once'], options['kinds'])
+        self.stdout.write(f"Starting {processes} process(es) × {threads} thread(s)")
+
+        if processes == 1:
+            count = run_threads(*worker_args, f"{socket.gethostname()}:{os.getpid()}")
+            self.stdout.write(self.style.SUCCESS(f"Ran {count} jobs"))
+            return
+
+        # 'spawn' rather than fork, so no database connection or lock is
+        # inherited from this process
+        context = multiprocessing.get_context('spawn')
+        children = [context.Process(target=_worker_process, args=worker_args) for _ in range(processes)]
+        for child in children:
+            child.start()
+
+        def stop_children(signum, frame):
+            # Each child finishes its running jobs on SIGTERM
+            for child in children:
+                if child.is_alive():
+                    child.terminate()
+
+        signal.signal(signal.SIGTERM, stop_children)
+        try:
+            for child in children:
+                child.join()
+        except KeyboardInterrupt:
+            for child in children:
+                child.join()
+        self.stdout.write(self.style.SUCCESS("Workers stopped"))
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:32
+
+import resources.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0003_resourcemodel_month_resourcemodel_year'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Holiday',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('name', models.CharField(max_length=100)),
+                ('is_half_day', models.BooleanField(default=False, help_text='Counts as 0.5 working days instead of a full day off')),
+            ],
+            options={
+                'verbose_name': 'Holiday',
+                'verbose_name_plural': 'Holidays',
+                'db_table': 'holiday',
+                'ordering': ['date'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='resourcemodel',
+            name='month',
+            field=models.IntegerField(choices=[(1, 'January'), (2, 'February'), (3, 'March'), (4, 'April'), (5, 'May'), (6, 'June'), (7, 'July'), (8, 'August'), (9, 'September'), (10, 'October'), (11, 'November'), (12, 'December')], default=resources.models.current_month),
+        ),
+        migrations.AlterField(
+            model_name='resourcemodel',
+            name='year',
+            field=models.IntegerField(default=resources.models.current_year),
+        ),
+    ]
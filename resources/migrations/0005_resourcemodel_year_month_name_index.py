@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0004_holiday_alter_resourcemodel_month_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resourcemodel',
+            index=models.Index(fields=['year', 'month', 'resource_name'], name='resource_year_month_name_idx'),
+        ),
+    ]
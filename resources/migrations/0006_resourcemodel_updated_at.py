@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0005_resourcemodel_year_month_name_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resourcemodel',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0006_resourcemodel_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Person',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Person',
+                'verbose_name_plural': 'People',
+                'db_table': 'person',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='resourcemodel',
+            name='person',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Linked by resource_name when saved', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='month_rows', to='resources.person'),
+        ),
+        migrations.CreateModel(
+            name='Attendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField(choices=[(1, 'January'), (2, 'February'), (3, 'March'), (4, 'April'), (5, 'May'), (6, 'June'), (7, 'July'), (8, 'August'), (9, 'September'), (10, 'October'), (11, 'November'), (12, 'December')])),
+                ('days', models.CharField(max_length=31)),
+                ('person', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance', to='resources.person')),
+            ],
+            options={
+                'verbose_name': 'Attendance',
+                'verbose_name_plural': 'Attendance',
+                'db_table': 'attendance',
+                'ordering': ['year', 'month'],
+                'indexes': [models.Index(fields=['year', 'month'], name='attendance_year_month_idx')],
+                'constraints': [models.UniqueConstraint(fields=('person', 'year', 'month'), name='unique_person_month_attendance')],
+            },
+        ),
+    ]
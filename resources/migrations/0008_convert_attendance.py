@@ -0,0 +1,93 @@
+import calendar
+from datetime import date
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+# Attendance day states when the rows were converted
+PRESENT, HALF_DAY, ABSENT, OFF = 'P', 'H', 'A', '-'
+
+
+def month_day_states(year, month, present_day, holidays=(), half_days=()):
+    """
+    Copy of resources.attendance.month_day_states as it was when this
+    migration was written: the working days (Mon–Fri + 1st Saturday, minus
+    ``holidays``) are marked present in date order until ``present_day`` is
+    used up, the rest absent. A half-day holiday is worth half a day.
+    """
+    first_day, num_days = calendar.monthrange(year, month)
+    first_saturday = date(year, month, (5 - first_day) % 7 + 1)
+    remaining = present_day or 0
+    states = []
+    for day in range(1, num_days + 1):
+        current = date(year, month, day)
+        if (current.weekday() >= 5 and current != first_saturday) or current in holidays:
+            states.append(OFF)
+            continue
+        if current in half_days:
+            present = remaining >= 0.5
+            states.append(HALF_DAY if present else ABSENT)
+            remaining -= 0.5 if present else 0
+        elif remaining >= 1:
+            states.append(PRESENT)
+            remaining -= 1
+        elif remaining >= 0.5:
+            states.append(HALF_DAY)
+            remaining -= 0.5
+        else:
+            states.append(ABSENT)
+    return ''.join(states)
+
+
+def convert_resources(apps, schema_editor):
+    """
+    Create a Person per resource name, link the resource rows to it and
+    turn each row's present_day into an Attendance month. The daily
+    breakdown was never recorded, so present days fill the month's working
+    days in date order; monthly totals are preserved (up to the month's
+    working days).
+    """
+    Person = apps.get_model('resources', 'Person')
+    Attendance = apps.get_model('resources', 'Attendance')
+    Holiday = apps.get_model('resources', 'Holiday')
+    ResourceModel = apps.get_model('resources', 'ResourceModel')
+
+    names = ResourceModel.objects.values_list('resource_name', flat=True).distinct()
+    Person.objects.bulk_create([Person(name=name) for name in names], batch_size=BATCH_SIZE)
+    people = dict(Person.objects.values_list('name', 'pk'))
+
+    holidays = {}
+    for day, is_half_day in Holiday.objects.values_list('date', 'is_half_day'):
+        full, half = holidays.setdefault((day.year, day.month), (set(), set()))
+        (half if is_half_day else full).add(day)
+
+    resources = []
+    attendance = {}
+    for resource in ResourceModel.objects.order_by('pk').only(
+        'pk', 'resource_name', 'year', 'month', 'present_day'
+    ).iterator(chunk_size=BATCH_SIZE):
+        resource.person_id = people[resource.resource_name]
+        resources.append(resource)
+        key = (resource.person_id, resource.year, resource.month)
+        if key not in attendance:
+            full, half = holidays.get((resource.year, resource.month), ((), ()))
+            attendance[key] = Attendance(
+                person_id=resource.person_id,
+                year=resource.year,
+                month=resource.month,
+                days=month_day_states(resource.year, resource.month, resource.present_day, full, half),
+            )
+
+    ResourceModel.objects.bulk_update(resources, ['person'], batch_size=BATCH_SIZE)
+    Attendance.objects.bulk_create(attendance.values(), batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0007_person_attendance'),
+    ]
+
+    operations = [
+        migrations.RunPython(convert_resources, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:50
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0008_convert_attendance'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resourcemodel',
+            index=models.Index(django.db.models.functions.text.Lower('resource_name'), name='resource_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resourcemodel',
+            index=models.Index(models.F('year'), models.F('month'), django.db.models.functions.text.Lower('resource_name'), name='resource_month_name_lower_idx'),
+        ),
+    ]
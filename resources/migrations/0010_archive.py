@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0009_resource_name_lower_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedYear',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField(unique=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'archived_year',
+                'ordering': ['year'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedResource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource_name', models.CharField(max_length=100)),
+                ('working_days', models.FloatField(blank=True, null=True)),
+                ('present_day', models.FloatField(default=0)),
+                ('present_hours', models.FloatField(default=0)),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField(choices=[(1, 'January'), (2, 'February'), (3, 'March'), (4, 'April'), (5, 'May'), (6, 'June'), (7, 'July'), (8, 'August'), (9, 'September'), (10, 'October'), (11, 'November'), (12, 'December')])),
+                ('updated_at', models.DateTimeField()),
+                ('person', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_month_rows', to='resources.person')),
+            ],
+            options={
+                'verbose_name': 'Archived resource',
+                'verbose_name_plural': 'Archived resources',
+                'db_table': 'resource_model_archive',
+                'ordering': ['resource_name'],
+                'indexes': [models.Index(fields=['year', 'month', 'resource_name'], name='archived_resource_month_idx')],
+            },
+        ),
+    ]
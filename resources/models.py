@@ -1,12 +1,65 @@
 # resources-models
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, FloatField, Q, Sum, Value
+from django.db.models.functions import Cast, Length, Lower, Replace
 import calendar
 from datetime import date
+from .working_calendar import get_month_calendar
  
 # Create your models here.
 
 MONTH_CHOICES = [(i, calendar.month_name[i]) for i in range(1, 13)]
 
+
+def current_year():
+    return date.today().year
+
+
+def current_month():
+    return date.today().month
+
+
+class Person(models.Model):
+    """
+    One team member, shared by their per-month resource rows and attendance.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        db_table = 'person'
+        ordering = ['name']
+        verbose_name = 'Person'
+        verbose_name_plural = 'People'
+
+
+# ResourceModel fields its Person link and Attendance month are built from
+ATTENDANCE_SOURCE_FIELDS = ('resource_name', 'year', 'month', 'present_day')
+
+
+class ResourceQuerySet(models.QuerySet):
+    def for_year(self, year):
+        """
+        The year's resource rows, read from the archive when the year has
+        been archived (see archive_year). Start chains with it, since an
+        archived year's queryset is a fresh ArchivedResource one.
+        """
+        from .archive import is_archived
+        if is_archived(year):
+            return ArchivedResource.objects.filter(year=year)
+        return self.filter(year=year)
+
+    def for_month(self, year, month):
+        """
+        The month's resource rows, from the archive like for_year().
+        """
+        return self.for_year(year).filter(month=month)
+
+
 class ResourceModel(models.Model):
     """
     Stores resource (developer/employee) data with logic to auto-calculate
@@ -35,52 +88,75 @@ class ResourceModel(models.Model):
         help_text="Auto-calculated as present_day × 8 hours if not set"
     )
 
-    year = models.IntegerField(default=date.today().year)
-    month = models.IntegerField(choices=MONTH_CHOICES, default=date.today().month)
+    year = models.IntegerField(default=current_year)
+    month = models.IntegerField(choices=MONTH_CHOICES, default=current_month)
+    updated_at = models.DateTimeField(auto_now=True)
+    person = models.ForeignKey(
+        Person,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='month_rows',
+        help_text="Linked by resource_name when saved"
+    )
+
+    objects = ResourceQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The attendance row this resource was synced to, to refresh it if the
+        # name, year or month change
+        instance._attendance_key = (
+            instance.__dict__.get('person_id'), instance.__dict__.get('year'), instance.__dict__.get('month')
+        )
+        instance._attendance_source = tuple(instance.__dict__.get(field) for field in ATTENDANCE_SOURCE_FIELDS)
+        return instance
  
     @staticmethod
     def get_working_days(year=None, month=None):
         """
-        Calculate working days for a given year and month (Mon–Fri + 1st Saturday).
+        Working days for a given year and month (Mon–Fri + 1st Saturday,
+        minus company holidays), looked up from the memoized month calendar.
         """
         today = date.today()
         year = year or today.year
         month = month or today.month
- 
-        _, num_days = calendar.monthrange(year, month)
-        first_day = calendar.monthrange(year, month)[0]
- 
-        # Get the date of the 1st Saturday
-        first_saturday = (5 - first_day) % 7 + 1
-        if first_saturday > num_days:
-            first_saturday = None  # Just in case
- 
-        working_days = 0
-        for day in range(1, num_days + 1):
-            weekday = (first_day + day - 1) % 7
-            if weekday < 5:  # Monday to Friday
-                working_days += 1
- 
-        if first_saturday:
-            working_days += 1
- 
-        return working_days
+        return get_month_calendar(year, month).working_days
  
     def save(self, *args, **kwargs):
         # Set working days if not manually entered
         if not self.working_days:
-            self.working_days = self.get_working_days()
+            self.working_days = self.get_working_days(self.year, self.month)
  
         # Set present hours if not provided
         if self.present_day and not self.present_hours:
             self.present_hours = self.present_day * 8
- 
-        super().save(*args, **kwargs)
+
+        # The person and attendance only follow these fields
+        source = tuple(getattr(self, field) for field in ATTENDANCE_SOURCE_FIELDS)
+        if self.person_id and source == getattr(self, '_attendance_source', None):
+            super().save(*args, **kwargs)
+            return
+
+        from .attendance import refresh_attendance
+        with transaction.atomic():
+            self.person = Person.objects.get_or_create(name=self.resource_name)[0]
+            super().save(*args, **kwargs)
+            old_key = getattr(self, '_attendance_key', None)
+            if old_key and old_key[0] and old_key != (self.person_id, self.year, self.month):
+                # Another row of the old month may still be mirrored there
+                refresh_attendance(*old_key)
+            refresh_attendance(self.person_id, self.year, self.month)
+        self._attendance_key = (self.person_id, self.year, self.month)
+        self._attendance_source = source
  
     def get_working_days_for_display(self):
-        today = date.today()
-        wd = self.get_working_days()
-        return f"{wd} days ({today.strftime('%B %Y')})"
+        year = self.year or current_year()
+        month = self.month or current_month()
+        wd = self.get_working_days(year, month)
+        return f"{wd:g} days ({calendar.month_name[month]} {year})"
  
     def __str__(self):
         return self.resource_name
@@ -88,5 +164,235 @@ class ResourceModel(models.Model):
     class Meta:
         db_table = 'resource_model'
         ordering = ['resource_name']
+        indexes = [
+            models.Index(fields=['year', 'month', 'resource_name'], name='resource_year_month_name_idx'),
+            # Prefix search for the autocomplete (see resources.autocomplete)
+            models.Index(Lower('resource_name'), name='resource_name_lower_idx'),
+            models.Index(F('year'), F('month'), Lower('resource_name'), name='resource_month_name_lower_idx'),
+        ]
         verbose_name = 'Resource'
-        verbose_name_plural = 'Resources'
\ No newline at end of file
+        verbose_name_plural = 'Resources'
+
+
+class ArchivedYear(models.Model):
+    """
+    A closed year whose projects, allocations and resource rows have been
+    moved to the archive tables.
+    """
+
+    year = models.IntegerField(unique=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return str(self.year)
+
+    class Meta:
+        db_table = 'archived_year'
+        ordering = ['year']
+
+
+class ClosedMonth(models.Model):
+    """
+    A month frozen by close_month: its rows can no longer be edited and
+    its report is served from the snapshot files written when it closed.
+    """
+
+    year = models.IntegerField()
+    month = models.IntegerField(choices=MONTH_CHOICES)
+    closed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{calendar.month_name[self.month]} {self.year}"
+
+    class Meta:
+        db_table = 'closed_month'
+        ordering = ['year', 'month']
+        constraints = [
+            models.UniqueConstraint(fields=['year', 'month'], name='unique_closed_month'),
+        ]
+        verbose_name = 'Closed month'
+        verbose_name_plural = 'Closed months'
+
+
+class ArchivedResource(models.Model):
+    """
+    ResourceModel row of an archived year, keeping its original id.
+    """
+
+    resource_name = models.CharField(max_length=100)
+    working_days = models.FloatField(null=True, blank=True)
+    present_day = models.FloatField(default=0)
+    present_hours = models.FloatField(default=0)
+    year = models.IntegerField()
+    month = models.IntegerField(choices=MONTH_CHOICES)
+    updated_at = models.DateTimeField()
+    person = models.ForeignKey(
+        Person,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='archived_month_rows'
+    )
+
+    def __str__(self):
+        return self.resource_name
+
+    class Meta:
+        db_table = 'resource_model_archive'
+        ordering = ['resource_name']
+        indexes = [
+            models.Index(fields=['year', 'month', 'resource_name'], name='archived_resource_month_idx'),
+        ]
+        verbose_name = 'Archived resource'
+        verbose_name_plural = 'Archived resources'
+
+
+class Holiday(models.Model):
+    """
+    Company holiday excluded from the working-day calendar. Half-days
+    count as half a working day.
+    """
+
+    date = models.DateField(unique=True)
+    name = models.CharField(max_length=100)
+    is_half_day = models.BooleanField(
+        default=False,
+        help_text="Counts as 0.5 working days instead of a full day off"
+    )
+
+    def __str__(self):
+        return f"{self.name} ({self.date})"
+
+    class Meta:
+        db_table = 'holiday'
+        ordering = ['date']
+        verbose_name = 'Holiday'
+        verbose_name_plural = 'Holidays'
+
+
+def _day_count(state):
+    return Cast(Length('days') - Length(Replace('days', Value(state), Value(''))), FloatField())
+
+
+class AttendanceQuerySet(models.QuerySet):
+    def between(self, start, end):
+        """
+        Months from ``start`` to ``end`` inclusive, both (year, month).
+        """
+        (start_year, start_month), (end_year, end_month) = start, end
+        return self.filter(
+            Q(year__gt=start_year) | Q(year=start_year, month__gte=start_month),
+            Q(year__lt=end_year) | Q(year=end_year, month__lte=end_month),
+        )
+
+    def with_present_days(self):
+        return self.annotate(present_days=Attendance.PRESENT_DAYS)
+
+    def present_days_total(self):
+        """
+        Present days summed over the queryset, counted in the database.
+        """
+        return self.aggregate(total=Sum(Attendance.PRESENT_DAYS))['total'] or 0
+
+
+class Attendance(models.Model):
+    """
+    A person's attendance for one month, one character per day of the
+    month (see ``DAY_STATES``).
+
+    Derived from the present_day of the person's first resource row of the
+    month, and rewritten whenever that row changes (see
+    resources.attendance): edit the resource rows, not this. The daily
+    breakdown is not recorded, so present days fill the working days in
+    date order.
+    """
+
+    PRESENT = 'P'
+    HALF_DAY = 'H'
+    ABSENT = 'A'
+    OFF = '-'
+    DAY_STATES = {
+        PRESENT: 'Present',
+        HALF_DAY: 'Present half a day',
+        ABSENT: 'Absent',
+        OFF: 'Not a working day',
+    }
+    PRESENT_DAYS = _day_count(PRESENT) + _day_count(HALF_DAY) / 2
+
+    person = models.ForeignKey(Person, on_delete=models.CASCADE, related_name='attendance')
+    year = models.IntegerField()
+    month = models.IntegerField(choices=MONTH_CHOICES)
+    days = models.CharField(max_length=31)
+
+    objects = AttendanceQuerySet.as_manager()
+
+    @property
+    def present_days(self):
+        if '_present_days' in self.__dict__:
+            return self._present_days
+        return self.days.count(self.PRESENT) + self.days.count(self.HALF_DAY) / 2
+
+    @present_days.setter
+    def present_days(self, value):
+        self._present_days = value
+
+    def __str__(self):
+        return f"{self.person} {self.year}-{self.month:02d}"
+
+    class Meta:
+        db_table = 'attendance'
+        ordering = ['year', 'month']
+        constraints = [
+            models.UniqueConstraint(fields=['person', 'year', 'month'], name='unique_person_month_attendance'),
+        ]
+        indexes = [
+            models.Index(fields=['year', 'month'], name='attendance_year_month_idx'),
+        ]
+        verbose_name = 'Attendance'
+        verbose_name_plural = 'Attendance'
+
+
+class Job(models.Model):
+    """
+    A unit of background work (import, export, rebuild) queued by the web
+    process and run by the run_workers command; see resources.jobs.
+    """
+
+    QUEUED = 'QUEUED'
+    RUNNING = 'RUNNING'
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    done = models.PositiveIntegerField(default=0, help_text="Units of work done so far")
+    total = models.PositiveIntegerField(null=True, blank=True, help_text="Units of work, when known")
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    attempts = models.PositiveIntegerField(default=0, help_text="Times a worker has claimed the job")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed by the running worker's heartbeat; see resources.jobs
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.get_status_display()})"
+
+    class Meta:
+        db_table = 'job'
+        ordering = ['-created_at', '-pk']
+        indexes = [
+            # Workers claim the oldest queued job
+            models.Index(fields=['created_at'], condition=Q(status='QUEUED'), name='queued_job_idx'),
+        ]
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
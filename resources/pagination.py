@@ -0,0 +1,117 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(value, pk):
+    return base64.urlsafe_b64encode(json.dumps([value, pk]).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor(cursor) from exc
+    return value, pk
+
+
+def _cursor_key(cursor, field, pk_field):
+    """
+    The (value, pk) of ``cursor`` converted to ``field``'s and the primary
+    key's Python types, so a cursor made for another sort or tampered with
+    is rejected instead of reaching the query.
+    """
+    value, pk = decode_cursor(cursor)
+    try:
+        value, pk = field.to_python(value), pk_field.to_python(pk)
+    except (ValueError, TypeError, ValidationError) as exc:
+        raise InvalidCursor(cursor) from exc
+    if value is None or pk is None:
+        raise InvalidCursor(cursor)
+    return value, pk
+
+
+class KeysetPage:
+    """
+    One page of a keyset-paginated queryset, with opaque cursors for the
+    neighbouring pages (None when there is no such page).
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def _keyset_query(queryset, field, descending, after, before, per_page):
+    model_field = queryset.model._meta.get_field(field)
+    key = Coalesce(F(field), Value(0.0)) if model_field.null else F(field)
+    queryset = queryset.annotate(_sort_key=key)
+
+    backwards = before is not None
+    cursor = before if backwards else after
+    if cursor is not None:
+        value, pk = _cursor_key(cursor, model_field, queryset.model._meta.pk)
+        # Moving forward on an ascending sort (or backward on a descending one) means larger keys.
+        forward = descending == backwards
+        lookup = 'gt' if forward else 'lt'
+        queryset = queryset.filter(
+            Q(**{f'_sort_key__{lookup}': value}) | Q(_sort_key=value, **{f'pk__{lookup}': pk})
+        )
+
+    reverse = descending != backwards
+    ordering = ('-_sort_key', '-pk') if reverse else ('_sort_key', 'pk')
+    return queryset.order_by(*ordering)[:per_page + 1]
+
+
+def _keyset_page(rows, after, before, per_page):
+    backwards = before is not None
+    cursor = before if backwards else after
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+
+    if not rows:
+        return KeysetPage(rows)
+
+    first = encode_cursor(rows[0]._sort_key, rows[0].pk)
+    last = encode_cursor(rows[-1]._sort_key, rows[-1].pk)
+    if backwards:
+        return KeysetPage(rows, next_cursor=last, previous_cursor=first if has_more else None)
+    return KeysetPage(rows, next_cursor=last if has_more else None, previous_cursor=first if cursor else None)
+
+
+def keyset_paginate(queryset, field, descending=False, after=None, before=None, per_page=50):
+    """
+    Paginate ``queryset`` on (field, pk) without OFFSET or COUNT queries.
+
+    ``after``/``before`` are cursors from a previous page's next_cursor /
+    previous_cursor. Null values of ``field`` sort as 0. Raises
+    InvalidCursor for a malformed cursor.
+    """
+    rows = list(_keyset_query(queryset, field, descending, after, before, per_page))
+    return _keyset_page(rows, after, before, per_page)
+
+
+async def akeyset_paginate(queryset, field, descending=False, after=None, before=None, per_page=50):
+    """
+    Async keyset_paginate, fetching the page with ``aiterator()``.
+    """
+    query = _keyset_query(queryset, field, descending, after, before, per_page)
+    rows = [row async for row in query.aiterator()]
+    return _keyset_page(rows, after, before, per_page)
@@ -0,0 +1,38 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .attendance import refresh_attendance
+from .autocomplete import clear_search_cache
+from .models import Holiday, ResourceModel
+from .working_calendar import clear_calendar_cache
+
+# Sent after bulk writes that bypass model signals (e.g. bulk imports), with
+# ``months``: the set of (year, month) pairs that were touched.
+resources_bulk_changed = Signal()
+
+
+@receiver([post_save, post_delete], sender=Holiday)
+def holiday_changed(sender, using, **kwargs):
+    # Once committed: other processes cannot see the change before, and a
+    # rolled-back change must not leave calendars computed with it behind
+    transaction.on_commit(clear_calendar_cache, using=using)
+
+
+@receiver([post_save, post_delete], sender=ResourceModel)
+def resource_changed(sender, using, **kwargs):
+    clear_search_cache()
+    # Again once committed: other processes may have cached searches that
+    # could not see the change yet
+    transaction.on_commit(clear_search_cache, using=using)
+
+
+@receiver(resources_bulk_changed)
+def resources_bulk_changed_handler(sender, **kwargs):
+    clear_search_cache()
+
+
+@receiver(post_delete, sender=ResourceModel)
+def resource_deleted(sender, instance, **kwargs):
+    if instance.person_id:
+        refresh_attendance(instance.person_id, instance.year, instance.month)
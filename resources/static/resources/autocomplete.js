@@ -0,0 +1,58 @@
+// Lazily loaded resource selects (resources.widgets.ResourceAutocompleteSelect):
+// a search box above each select fetches matching options as the user types.
+(function () {
+    var DELAY = 250;
+
+    function replaceOptions(select, results) {
+        Array.from(select.options).forEach(function (option) {
+            if (option.value && !option.selected) {
+                option.remove();
+            }
+        });
+        results.forEach(function (result) {
+            if (!select.querySelector('option[value="' + result.id + '"]')) {
+                select.add(new Option(result.text + ' (' + result.month + '/' + result.year + ')', result.id));
+            }
+        });
+    }
+
+    function search(select, term) {
+        var url = new URL(select.dataset.autocompleteUrl, window.location.origin);
+        url.searchParams.set('term', term);
+        fetch(url, {headers: {'X-Requested-With': 'XMLHttpRequest'}})
+            .then(function (response) { return response.json(); })
+            .then(function (data) { replaceOptions(select, data.results); });
+    }
+
+    function attach(select) {
+        if (select.dataset.autocompleteAttached) {
+            return;
+        }
+        select.dataset.autocompleteAttached = 'true';
+        var input = document.createElement('input');
+        input.type = 'search';
+        input.className = 'form-control form-control-sm mb-1';
+        input.placeholder = 'Search resources…';
+        select.parentNode.insertBefore(input, select);
+
+        var timer = null;
+        input.addEventListener('input', function () {
+            clearTimeout(timer);
+            timer = setTimeout(function () { search(select, input.value); }, DELAY);
+        });
+        select.addEventListener('focus', function () {
+            if (select.options.length <= 2) {
+                search(select, input.value);
+            }
+        }, {once: true});
+    }
+
+    function attachAll(root) {
+        root.querySelectorAll('select[data-autocomplete-url]').forEach(attach);
+    }
+
+    document.addEventListener('DOMContentLoaded', function () { attachAll(document); });
+    // Rows added later (formset "add row", htmx swaps)
+    document.addEventListener('htmx:afterSwap', function (event) { attachAll(event.target); });
+    window.attachResourceAutocomplete = attachAll;
+})();
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.urls import reverse
+
+# Loader configuration for TEMPLATES[0]['OPTIONS']['loaders'] (with
+# APP_DIRS=False): templates are compiled once per process instead of on
+# every render. Django uses it by default when no loaders are configured;
+# a project listing its own loaders must wrap them like this.
+CACHED_TEMPLATE_LOADERS = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+_PLACEHOLDER_PK = 987654321
+
+
+class RowUrl:
+    """
+    URL of a per-row view (e.g. resource_update), reversed once per page.
+    Templates build each row's link as
+    ``{{ url.prefix }}{{ row.pk }}{{ url.suffix }}`` instead of running a
+    ``{% url %}`` reversal per row.
+    """
+
+    def __init__(self, viewname):
+        self.prefix, self.suffix = reverse(viewname, args=[_PLACEHOLDER_PK]).split(str(_PLACEHOLDER_PK))
+
+
+def fragment_cache_timeout():
+    """
+    Lifetime of cached template fragments: TEMPLATE_FRAGMENT_CACHE_SECONDS
+    (default 300). Their keys already change with the data they show.
+    """
+    return getattr(settings, 'TEMPLATE_FRAGMENT_CACHE_SECONDS', 300)
+
+
+def fragment_version(*parts):
+    """
+    Cache key part for a template fragment: the given data version parts
+    plus TEMPLATE_FRAGMENT_VERSION, to bump when the templates change.
+    """
+    return '|'.join(str(part) for part in (getattr(settings, 'TEMPLATE_FRAGMENT_VERSION', 1), *parts))
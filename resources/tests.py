@@ -1,3 +1,432 @@
-from django.test import TestCase
+import os
+import signal
+import tempfile
+import threading
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .attendance import month_day_states
+from .autocomplete import clear_search_cache
+from .closing import clear_closed_months_cache
+from .importers import import_resources, read_upload
+from .jobs import claim_job, enqueue, requeue_expired_jobs, run_job, save_upload
+from .management.commands.run_workers import run_threads
+from .models import Attendance, ClosedMonth, Holiday, Job, Person, ResourceModel
+from .pagination import encode_cursor
+from .working_calendar import GENERATION_KEY, clear_calendar_cache, get_month_calendar
+
+
+class AttendanceTests(TestCase):
+
+    def test_present_days_fill_working_days_in_order(self):
+        # August 2025: Fri 1st, 1st Saturday the 2nd; the 15th is a half-day holiday
+        states = month_day_states(2025, 8, 12, half_days={date(2025, 8, 15)})
+        self.assertEqual(states, "PP-PPPPP--PPPPH--HAAAA--AAAAA--")
+        self.assertEqual(states.count('P') + states.count('H') / 2, 12)
+
+    def test_save_links_person_and_syncs_attendance(self):
+        Holiday.objects.create(date=date(2025, 8, 15), name="Independence Day")
+        resource = ResourceModel.objects.create(resource_name="Asha", year=2025, month=8, present_day=20)
+        ResourceModel.objects.create(resource_name="Asha", year=2025, month=9, present_day=18.5)
+
+        person = Person.objects.get(name="Asha")
+        self.assertEqual(resource.person, person)
+        self.assertEqual(person.attendance.get(month=8).present_days, 20)
+
+        resource.present_day = 10
+        resource.month = 7
+        resource.save()
+        self.assertQuerySetEqual(person.attendance.values_list('month', flat=True), [7, 9], ordered=True)
+
+        resource.delete()
+        self.assertQuerySetEqual(person.attendance.values_list('month', flat=True), [9])
+
+    def test_rows_sharing_a_name_and_month_share_their_attendance(self):
+        first = ResourceModel.objects.create(resource_name="Asha", year=2025, month=8, present_day=20)
+        second = ResourceModel.objects.create(resource_name="Asha", year=2025, month=8, present_day=10)
+        attendance = Attendance.objects.filter(person__name="Asha", year=2025, month=8)
+        # The first row is the one mirrored, as imports update it
+        self.assertEqual(attendance.get().present_days, 20)
+
+        first.delete()
+        self.assertEqual(attendance.get().present_days, 10)
+        second.month = 9
+        second.save()
+        self.assertFalse(attendance.exists())
+        self.assertEqual(Attendance.objects.get(person__name="Asha").month, 9)
+
+    def test_attendance_is_read_only_in_the_admin(self):
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin_user)
+        ResourceModel.objects.create(resource_name="Asha", year=2025, month=8, present_day=20)
+        attendance = Attendance.objects.get()
+        url = reverse('admin:resources_attendance_change', args=[attendance.pk])
+        self.client.post(url, {'person': attendance.person_id, 'year': 2025, 'month': 8, 'days': 'A' * 31})
+        attendance.refresh_from_db()
+        self.assertEqual(attendance.present_days, 20)
+        self.assertEqual(self.client.get(reverse('admin:resources_attendance_add')).status_code, 403)
+
+    def test_save_skips_attendance_when_its_fields_are_unchanged(self):
+        ResourceModel.objects.create(resource_name="Asha", year=2025, month=8, present_day=20)
+        resource = ResourceModel.objects.get()
+        resource.working_days = 21
+        resource.present_hours = 150
+        with self.assertNumQueries(1):
+            resource.save()
+
+        resource.present_day = 10
+        resource.save()
+        self.assertEqual(Attendance.objects.get().present_days, 10)
+
+    def test_range_aggregates_in_the_database(self):
+        for month, present_day in [(6, 5), (7, 20), (8, 19.5), (9, 21), (10, 3)]:
+            ResourceModel.objects.create(resource_name="Ravi", year=2025, month=month, present_day=present_day)
+        ResourceModel.objects.create(resource_name="Meera", year=2025, month=8, present_day=10)
+
+        q3 = Attendance.objects.between((2025, 7), (2025, 9))
+        with self.assertNumQueries(1):
+            self.assertEqual(q3.filter(person__name="Ravi").present_days_total(), 60.5)
+        self.assertEqual(q3.present_days_total(), 70.5)
+        self.assertEqual(Attendance.objects.between((2024, 12), (2025, 6)).present_days_total(), 5)
+        self.assertEqual(
+            [row.present_days for row in q3.filter(person__name="Ravi").with_present_days()],
+            [20, 19.5, 21],
+        )
+
+    def test_bulk_import_syncs_attendance(self):
+        result = import_resources([
+            (1, {'resource_name': "Asha", 'year': 2025, 'month': 8, 'present_day': 20}),
+            (2, {'resource_name': "Ravi", 'year': 2025, 'month': 8, 'present_day': 15}),
+        ])
+        self.assertEqual(result.created, 2)
+        import_resources([(1, {'resource_name': "Ravi", 'year': 2025, 'month': 8, 'present_day': 16})])
+
+        self.assertFalse(ResourceModel.objects.filter(person__isnull=True).exists())
+        self.assertEqual(
+            dict(Attendance.objects.with_present_days().values_list('person__name', 'present_days')),
+            {"Asha": 20, "Ravi": 16},
+        )
+
+
+class ImportResourcesCommandTests(TestCase):
+
+    def import_file(self, content, *args):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, newline='') as csv_file:
+            csv_file.write(content)
+        self.addCleanup(os.unlink, csv_file.name)
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_resources', csv_file.name, *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue().splitlines()
+
+    def test_created_updated_and_error_rows(self):
+        stdout, stderr = self.import_file(
+            "resource_name,present_day,year,month\r\n"
+            "Asha Rao,20,2025,8\r\n"
+            "Ravi Shah,18,2025,8\r\n"
+            ",5,2025,8\r\n"
+            "Meera Iyer,many,2025,8\r\n",
+            '--batch-size', '1',
+        )
+        self.assertIn("2 created, 0 updated, 2 errors", stdout)
+        self.assertEqual([line.split(':')[0] for line in stderr], ["Row 4", "Row 5"])
+        self.assertIn("resource_name", stderr[0])
+        self.assertIn("present_day", stderr[1])
+
+        stdout, stderr = self.import_file("resource_name,present_day,year,month\nAsha Rao,15,2025,8\n")
+        self.assertIn("0 created, 1 updated, 0 errors", stdout)
+        self.assertEqual(stderr, [])
+        self.assertEqual(
+            dict(ResourceModel.objects.values_list('resource_name', 'present_day')),
+            {"Asha Rao": 15, "Ravi Shah": 18},
+        )
+
+    def test_batch_size_must_be_positive(self):
+        with self.assertRaisesMessage(CommandError, "--batch-size must be at least 1"):
+            self.import_file("resource_name,present_day,year,month\nAsha Rao,20,2025,8\n", '--batch-size', '0')
+        self.assertFalse(ResourceModel.objects.exists())
+
+    def test_uploads_keep_line_breaks_inside_quoted_fields(self):
+        upload = SimpleUploadedFile(
+            'resources.csv', b'resource_name,present_day,year,month\r\n"Asha\r\nRao",20,2025,8\r\n'
+        )
+        self.assertEqual(
+            list(read_upload(upload)),
+            [(2, {'resource_name': "Asha\r\nRao", 'present_day': '20', 'year': '2025', 'month': '8'})],
+        )
+
+
+class WorkingCalendarTests(TestCase):
+
+    def test_holiday_changes_clear_the_calendars_on_commit(self):
+        self.assertEqual(get_month_calendar(2025, 8).working_days, 22)
+        with self.captureOnCommitCallbacks() as callbacks:
+            Holiday.objects.create(date=date(2025, 8, 15), name="Independence Day")
+            # The saving transaction reads its own holidays
+            self.assertEqual(get_month_calendar(2025, 8).working_days, 21)
+        self.assertEqual(callbacks, [clear_calendar_cache])
+
+    def test_calendars_are_memoized_until_the_shared_generation_changes(self):
+        self.assertEqual(get_month_calendar(2025, 8).working_days, 22)
+        # Another process adds a holiday and bumps the shared generation;
+        # bulk_create sends no signal, so forget its calendars afterwards
+        self.addCleanup(clear_calendar_cache)
+        Holiday.objects.bulk_create([Holiday(date=date(2025, 8, 27), name="Ganesh Chaturthi", is_half_day=True)])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_month_calendar(2025, 8).working_days, 22)
+        cache.incr(GENERATION_KEY)
+        self.assertEqual(get_month_calendar(2025, 8).working_days, 21.5)
+
+    def test_rolled_back_holidays_are_forgotten(self):
+        with self.assertRaises(ValueError), transaction.atomic():
+            Holiday.objects.create(date=date(2025, 8, 15), name="Independence Day")
+            self.assertEqual(get_month_calendar(2025, 8).working_days, 21)
+            raise ValueError
+        self.assertEqual(get_month_calendar(2025, 8).working_days, 22)
+
+
+class ResourceAutocompleteTests(TestCase):
+
+    def setUp(self):
+        clear_search_cache()
+        for name in ["Asha Rao", "Ashok Kumar", "Ravi Shah"]:
+            ResourceModel.objects.create(resource_name=name, year=2025, month=8)
+        ResourceModel.objects.create(resource_name="Asha Rao", year=2025, month=9)
+
+    def search(self, **params):
+        response = self.client.get(reverse('resource_autocomplete'), params)
+        return [(row['text'], row['month']) for row in response.json()['results']]
+
+    def test_case_insensitive_prefix_search(self):
+        self.assertEqual(
+            self.search(term="ash"),
+            [("Asha Rao", 9), ("Asha Rao", 8), ("Ashok Kumar", 8)],
+        )
+        self.assertEqual(self.search(term="shah"), [])
+
+    def test_scoped_to_month(self):
+        self.assertEqual(self.search(term="ASHA", year=2025, month=9), [("Asha Rao", 9)])
+
+    def test_cached_until_resources_change(self):
+        self.search(term="ra", year=2025, month=8)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.search(term="ra", year=2025, month=8), [("Ravi Shah", 8)])
+        with self.captureOnCommitCallbacks() as callbacks:
+            ResourceModel.objects.create(resource_name="Rahul Jain", year=2025, month=8)
+        self.assertEqual(self.search(term="ra", year=2025, month=8), [("Rahul Jain", 8), ("Ravi Shah", 8)])
+        # Other processes drop their searches once the change commits
+        self.assertIn(clear_search_cache, callbacks)
+
+    def test_non_ascii_prefix(self):
+        ResourceModel.objects.create(resource_name="Élodie Martin", year=2025, month=8)
+        self.assertEqual(self.search(term="É"), [("Élodie Martin", 8)])
+        self.assertEqual(self.search(term="ÉLO"), [("Élodie Martin", 8)])
+
+
+class ResourceListRenderingTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.resource = ResourceModel.objects.create(resource_name="Asha Rao", year=2025, month=8)
+
+    def test_rows_link_to_their_views_and_follow_edits(self):
+        url = reverse('resource_list') + '?year=2025&month=8'
+        response = self.client.get(url)
+        self.assertContains(response, f'href="{reverse("resource_update", args=[self.resource.pk])}"')
+        self.assertContains(response, f'href="{reverse("resource_delete", args=[self.resource.pk])}"')
+
+        self.resource.resource_name = "Asha R."
+        self.resource.save()
+        self.assertContains(self.client.get(url), "Asha R.")
+
+
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        clear_closed_months_cache()
+        self.addCleanup(clear_closed_months_cache)
+        self.resource = ResourceModel.objects.create(resource_name="Asha Rao", year=2020, month=8, present_day=20)
+        self.url = reverse('resource_list') + '?year=2020&month=8'
+
+    def cache_control(self, response):
+        return {directive.strip() for directive in response['Cache-Control'].split(',')}
+
+    def test_open_months_are_revalidated(self):
+        response = self.client.get(self.url)
+        self.assertEqual(self.cache_control(response), {'private', 'no-cache'})
+
+        etag = response['ETag']
+        self.assertEqual(self.client.get(self.url, headers={'If-None-Match': etag}).status_code, 304)
+        ResourceModel.objects.filter(pk=self.resource.pk).update(present_day=18, updated_at=timezone.now())
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_closed_months_are_public(self):
+        ClosedMonth.objects.create(year=2020, month=8)
+        clear_closed_months_cache()
+        response = self.client.get(self.url)
+        self.assertEqual(self.cache_control(response), {'public', 'max-age=3600'})
+        self.assertEqual(self.client.get(self.url, headers={'If-None-Match': response['ETag']}).status_code, 304)
+
+        # Other months' pages are still revalidated
+        response = self.client.get(reverse('resource_list') + '?year=2020&month=9')
+        self.assertEqual(self.cache_control(response), {'private', 'no-cache'})
+
+
+class ConcurrentResourceListTests(TransactionTestCase):
+
+    def test_page_and_count_run_on_worker_connections(self):
+        ResourceModel.objects.bulk_create([
+            ResourceModel(resource_name=f"Resource {i:02}", year=2025, month=8) for i in range(5)
+        ])
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('resource_list_async'), {'per_page': 2})
+        self.assertEqual(response.json()['count'], 5)
+        self.assertEqual([row['resource_name'] for row in response.json()['results']], ["Resource 00", "Resource 01"])
+
+
+class ResourceListPaginationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        for name, days in [("Asha Rao", 20), ("Ravi Shah", 18), ("Meera Iyer", 21)]:
+            ResourceModel.objects.create(resource_name=name, year=2025, month=8, present_day=days)
+
+    def page(self, **params):
+        return self.client.get(reverse('resource_list'), {'format': 'json', **params})
+
+    def test_pages_follow_the_cursors(self):
+        first = self.page(sort='present_day', per_page=2).json()
+        self.assertEqual([row['resource_name'] for row in first['results']], ["Ravi Shah", "Asha Rao"])
+        second = self.page(sort='present_day', per_page=2, after=first['next']).json()
+        self.assertEqual([row['resource_name'] for row in second['results']], ["Meera Iyer"])
+        self.assertIsNone(second['next'])
+
+    def test_walking_forward_and_back_visits_every_row_once(self):
+        # Ties on every sort key, and nulls that sort with the zeros
+        rows = ResourceModel.objects.bulk_create([
+            ResourceModel(resource_name=name, year=2025, month=9, working_days=working_days, present_day=days)
+            for name, working_days, days in [
+                ("Asha Rao", None, 20), ("Ravi Shah", 21, 20), ("Asha Rao", 0, 18), ("Meera Iyer", 21, 0),
+                ("Kiran Das", None, 20), ("Ravi Shah", 22.5, 18), ("Dev Patel", 0, 21),
+            ]
+        ])
+        for sort in ('working_days', '-working_days', 'present_day', '-present_day', 'resource_name', '-resource_name'):
+            field = sort.lstrip('-')
+            expected = [
+                row.pk for row in sorted(
+                    rows, key=lambda row: (getattr(row, field) or 0, row.pk), reverse=sort.startswith('-')
+                )
+            ]
+            for per_page in (1, 2, 3):
+                with self.subTest(sort=sort, per_page=per_page):
+                    params = {'year': 2025, 'month': 9, 'sort': sort, 'per_page': per_page}
+                    pages = [self.page(**params).json()]
+                    self.assertIsNone(pages[0]['previous'])
+                    while pages[-1]['next']:
+                        pages.append(self.page(**params, after=pages[-1]['next']).json())
+                    ids = [[row['id'] for row in page['results']] for page in pages]
+                    self.assertEqual(sum(ids, []), expected)
+
+                    # Back from the last page through the previous cursors
+                    back = [ids[-1]]
+                    previous = pages[-1]['previous']
+                    while previous:
+                        page = self.page(**params, before=previous).json()
+                        back.append([row['id'] for row in page['results']])
+                        previous = page['previous']
+                    self.assertEqual(back[::-1], ids)
+
+    def test_malformed_and_wrong_typed_cursors_are_rejected(self):
+        for sort, cursor in [
+            ('present_day', 'not a cursor'),
+            ('present_day', encode_cursor(1, 2)[:-2]),
+            ('working_days', encode_cursor('abc', 1)),
+            ('working_days', encode_cursor(22, 'abc')),
+            ('working_days', encode_cursor(None, 1)),
+            ('resource_name', encode_cursor('Asha Rao', [1])),
+        ]:
+            with self.subTest(sort=sort, cursor=cursor):
+                self.assertEqual(self.page(sort=sort, after=cursor).status_code, 400)
+                self.assertEqual(self.page(sort=sort, before=cursor).status_code, 400)
+        response = self.client.get(reverse('resource_list_async'), {'sort': 'working_days', 'after': 'WyJhYmMiLCAxXQ'})
+        self.assertEqual(response.status_code, 400)
+
+
+class JobQueueTests(TestCase):
+
+    def setUp(self):
+        job_files = tempfile.TemporaryDirectory()
+        self.addCleanup(job_files.cleanup)
+        self.enterContext(override_settings(JOB_FILES_ROOT=job_files.name))
+
+    def test_import_job(self):
+        upload = SimpleUploadedFile(
+            'resources.csv', b"resource_name,present_day,year,month\nAsha Rao,20,2025,8\nRavi Shah,18,2025,8\n"
+        )
+        path = save_upload(upload)
+        job = enqueue('import_resources', path=str(path), format='csv', batch_size=1)
+
+        job = run_job(claim_job('test'))
+
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual((job.result['created'], job.result['skipped']), (2, 0))
+        self.assertEqual(ResourceModel.objects.filter(year=2025, month=8).count(), 2)
+        self.assertFalse(path.exists())
+        self.assertIsNone(claim_job('test'))
+
+    def test_each_job_is_claimed_once_and_failures_are_recorded(self):
+        first = enqueue('import_resources', path='missing.csv')
+        second = enqueue('import_resources', path='missing.csv')
+
+        self.assertEqual(claim_job('a').pk, first.pk)
+        self.assertEqual(claim_job('b').pk, second.pk)
+        self.assertIsNone(claim_job('c'))
+        with self.assertLogs('resources.jobs', 'ERROR'):
+            failed = run_job(Job.objects.get(pk=first.pk))
+        self.assertEqual(failed.status, Job.FAILED)
+        self.assertIn('missing.csv', failed.error)
+
+    @override_settings(JOB_LEASE_SECONDS=60, JOB_MAX_ATTEMPTS=2)
+    def test_expired_leases_are_taken_back(self):
+        def expire(job):
+            Job.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(minutes=5))
+
+        job = enqueue('import_resources', path='missing.csv')
+        stale = claim_job('dead')
+        expire(stale)
+        with self.assertLogs('resources.jobs', 'WARNING'):
+            retried = claim_job('alive')
+        self.assertEqual((retried.pk, retried.worker, retried.attempts), (job.pk, 'alive', 2))
+
+        # The first worker's late outcome does not overwrite the retry
+        with self.assertLogs('resources.jobs', 'WARNING') as logs:
+            run_job(stale)
+        self.assertIn('taken back from dead', logs.output[-1])
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.RUNNING)
+
+        expire(retried)
+        with self.assertLogs('resources.jobs', 'WARNING'):
+            self.assertEqual(requeue_expired_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (Job.FAILED, "The worker stopped responding"))
+
+    def test_workers_stop_on_sigterm(self):
+        def idle_worker(name, stop, **options):
+            # Worker threads would not see this test's transaction
+            stop.wait()
+            return 1
+
+        threading.Timer(0.3, os.kill, [os.getpid(), signal.SIGTERM]).start()
+        with mock.patch('resources.jobs.run_worker', idle_worker):
+            self.assertEqual(run_threads(2, poll_interval=0.05, once=False, kinds=None, prefix='test'), 2)
@@ -3,7 +3,10 @@ from . import views
 
 urlpatterns = [
     path('', views.resource_list, name='resource_list'),
+    path('async/', views.resource_list_async, name='resource_list_async'),
+    path('autocomplete/', views.resource_autocomplete, name='resource_autocomplete'),
     path('add/', views.resource_create, name='resource_create'),
+    path('import/', views.resource_import, name='resource_import'),
     path('edit/<int:pk>/', views.resource_update, name='resource_update'),
     path('delete/<int:pk>/', views.resource_delete, name='resource_delete'),
 ]
\ No newline at end of file
@@ -1,13 +1,186 @@
+import asyncio
+
 from django.shortcuts import render, redirect, get_object_or_404
-from .models import ResourceModel
-from .forms import ResourceForm
+from django.http import HttpResponseBadRequest, JsonResponse
+from .models import MONTH_CHOICES, ResourceModel
+from .forms import ResourceForm, ResourceImportForm
+from .importers import detect_format, import_resources, read_upload
+from .jobs import enqueue, save_upload
+from .pagination import InvalidCursor, keyset_paginate
+from .autocomplete import DEFAULT_LIMIT, MAX_LIMIT, search_resources
+from .conditional import conditional_month_view, resource_freshness
+from .closing import closed_month_message, is_month_closed
+from .concurrency import query_runner
+from .templating import RowUrl, fragment_cache_timeout, fragment_version
 from django.contrib import messages
 
+RESOURCE_LIST_COLUMNS = [
+    ('resource_name', 'Name'),
+    ('working_days', 'Working Days'),
+    ('present_day', 'Days Present'),
+    ('present_hours', 'Hours Present'),
+]
+RESOURCE_LIST_PER_PAGE = 50
+RESOURCE_LIST_MAX_PER_PAGE = 200
+
+
+def _int_param(request, name, default=None):
+    try:
+        return int(request.GET[name])
+    except (KeyError, ValueError):
+        return default
+
+
+def _list_url(request, **params):
+    query = request.GET.copy()
+    for key in ('after', 'before'):
+        query.pop(key, None)
+    for key, value in params.items():
+        query[key] = value
+    return f"?{query.urlencode()}"
+
+
+def _resource_list_freshness(request):
+    year = _int_param(request, 'year')
+    month = _int_param(request, 'month')
+    return (year, month, *resource_freshness(year, month))
+
+
+def _resource_list_query(request):
+    """
+    (year, month, sort, sort_field, descending, per_page, queryset) from the
+    list's query string.
+    """
+    year = _int_param(request, 'year')
+    month = _int_param(request, 'month')
+    per_page = min(max(_int_param(request, 'per_page', RESOURCE_LIST_PER_PAGE), 1), RESOURCE_LIST_MAX_PER_PAGE)
+
+    sort = request.GET.get('sort', 'resource_name')
+    sort_field = sort.lstrip('-')
+    if sort_field not in dict(RESOURCE_LIST_COLUMNS):
+        sort, sort_field = 'resource_name', 'resource_name'
+    descending = sort.startswith('-')
+
+    # Rows of an archived year are read from the archive
+    resources = ResourceModel.objects.for_year(year) if year else ResourceModel.objects.all()
+    if month:
+        resources = resources.filter(month=month)
+    resources = resources.only('id', 'resource_name', 'working_days', 'present_day', 'present_hours')
+    return year, month, sort, sort_field, descending, per_page, resources
+
+
+def _resource_list_json(page, **extra):
+    return JsonResponse({
+        'results': [
+            {'id': resource.pk, **{field: getattr(resource, field) for field, _ in RESOURCE_LIST_COLUMNS}}
+            for resource in page
+        ],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+        **extra,
+    })
 
 
+@conditional_month_view(_resource_list_freshness)
 def resource_list(request):
-    resources = ResourceModel.objects.all()
-    return render(request, 'resources/resource_list.html', {'resources': resources, 'title': 'Resources'})
+    year, month, sort, sort_field, descending, per_page, resources = _resource_list_query(request)
+
+    try:
+        page = keyset_paginate(
+            resources,
+            sort_field,
+            descending=descending,
+            after=request.GET.get('after'),
+            before=request.GET.get('before'),
+            per_page=per_page,
+        )
+    except InvalidCursor:
+        return HttpResponseBadRequest('Invalid page cursor')
+
+    if request.GET.get('format') == 'json':
+        return _resource_list_json(page)
+
+    columns = [
+        {
+            'label': label,
+            'sorted': field == sort_field,
+            'descending': descending,
+            'url': _list_url(request, sort=f"-{field}" if field == sort_field and not descending else field),
+        }
+        for field, label in RESOURCE_LIST_COLUMNS
+    ]
+    # The rows are cached per page and data version (the freshness computed
+    # for the conditional GET); pages rendered without it are not cached
+    freshness = getattr(request, '_freshness', None)
+    rows_version = None
+    if freshness is not None:
+        rows_version = fragment_version(
+            sort, request.GET.get('after'), request.GET.get('before'), per_page, *freshness[2:]
+        )
+    context = {
+        'resources': page,
+        'row_urls': {'edit': RowUrl('resource_update'), 'delete': RowUrl('resource_delete')},
+        'rows_version': rows_version,
+        'fragment_timeout': fragment_cache_timeout(),
+        'columns': columns,
+        'next_url': _list_url(request, after=page.next_cursor) if page.next_cursor else None,
+        'previous_url': _list_url(request, before=page.previous_cursor) if page.previous_cursor else None,
+        'year': year,
+        'month': month,
+        'sort': sort,
+        'months': MONTH_CHOICES,
+        'title': 'Resources',
+    }
+
+    # htmx paging/sorting swaps just the table; the dashboard tab loads the page body
+    if request.headers.get('HX-Request'):
+        template = 'resources/resource_table.html'
+    elif request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        template = 'resources/resource_list_partial.html'
+    else:
+        template = 'resources/resource_list.html'
+    return render(request, template, context)
+
+async def resource_list_async(request):
+    """
+    JSON resource list for the ASGI server: the page and the total count
+    are fetched concurrently, each on its own connection outside a
+    transaction (see resources.concurrency.query_runner).
+    """
+    _, _, _, sort_field, descending, per_page, resources = _resource_list_query(request)
+    run = await query_runner()
+    try:
+        page, count = await asyncio.gather(
+            run(keyset_paginate)(
+                resources,
+                sort_field,
+                descending=descending,
+                after=request.GET.get('after'),
+                before=request.GET.get('before'),
+                per_page=per_page,
+            ),
+            run(resources.count)(),
+        )
+    except InvalidCursor:
+        return HttpResponseBadRequest('Invalid page cursor')
+    return _resource_list_json(page, count=count)
+
+
+def resource_autocomplete(request):
+    """
+    Prefix search on resource names for lazily loaded resource selects,
+    optionally scoped with ``year``/``month``. Answers in the same JSON
+    shape as the admin's autocomplete.
+    """
+    limit = min(max(_int_param(request, 'limit', DEFAULT_LIMIT), 1), MAX_LIMIT)
+    results, more = search_resources(
+        request.GET.get('term', request.GET.get('q', '')),
+        _int_param(request, 'year'),
+        _int_param(request, 'month'),
+        limit,
+    )
+    return JsonResponse({'results': results, 'pagination': {'more': more}})
+
 
 def resource_create(request):
     if request.method == 'POST':
@@ -35,11 +208,42 @@ def resource_update(request, pk):
 def resource_delete(request, pk):
     resource = get_object_or_404(ResourceModel, pk=pk)
     if request.method == 'POST':
+        if is_month_closed(resource.year, resource.month):
+            messages.error(request, closed_month_message(resource.year, resource.month))
+            return redirect('resource_list')
         resource.delete()
         messages.success(request, 'Resource deleted successfully.')
         return redirect('resource_list')
     return render(request, 'resources/resource_confirm_delete.html', {'resource': resource})
 
+def resource_import(request):
+    result = job = None
+    if request.method == 'POST':
+        form = ResourceImportForm(request.POST, request.FILES)
+        if form.is_valid() and form.cleaned_data['background']:
+            upload = form.cleaned_data['file']
+            job = enqueue(
+                'import_resources',
+                path=str(save_upload(upload)),
+                format=detect_format(upload.name),
+                batch_size=form.cleaned_data['batch_size'],
+            )
+            messages.info(request, f'Import queued as job #{job.pk}.')
+        elif form.is_valid():
+            result = import_resources(
+                read_upload(form.cleaned_data['file']),
+                batch_size=form.cleaned_data['batch_size'],
+            )
+            messages.success(
+                request,
+                f'{result.created} resources created, {result.updated} updated, {len(result.errors)} rows skipped.'
+            )
+    else:
+        form = ResourceImportForm()
+    return render(request, 'resources/resource_import.html', {
+        'form': form, 'result': result, 'job': job, 'title': 'Import Resources',
+    })
+
 
 
 
@@ -0,0 +1,52 @@
+from urllib.parse import urlencode
+
+from django import forms
+from django.urls import reverse
+
+
+class ResourceAutocompleteSelect(forms.Select):
+    """
+    Resource select that renders only the empty and selected options; the
+    rest are fetched from the resource_autocomplete endpoint as the user
+    types (see resources/autocomplete.js), optionally scoped to a month.
+
+    ``labels`` maps resource ids (as strings) to names for the selected
+    options. Set it to share one lookup across many forms; otherwise the
+    selected options are looked up per widget.
+    """
+
+    class Media:
+        js = ('resources/autocomplete.js',)
+
+    def __init__(self, attrs=None, year=None, month=None):
+        super().__init__(attrs)
+        self.year = year
+        self.month = month
+        self.labels = None
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        scope = {key: value for key, value in (('year', self.year), ('month', self.month)) if value}
+        url = reverse('resource_autocomplete')
+        context['widget']['attrs']['data-autocomplete-url'] = f"{url}?{urlencode(scope)}" if scope else url
+        return context
+
+    def selected_labels(self, selected):
+        if self.labels is not None:
+            return {pk: self.labels[pk] for pk in selected if pk in self.labels}
+        queryset = self.choices.queryset.filter(pk__in=selected)
+        return {str(resource.pk): self.choices.field.label_from_instance(resource) for resource in queryset}
+
+    def optgroups(self, name, value, attrs=None):
+        selected = [str(pk) for pk in value if pk not in (None, '')]
+        choices = []
+        if self.choices.field.empty_label is not None:
+            choices.append(('', self.choices.field.empty_label))
+        if selected:
+            choices.extend(self.selected_labels(selected).items())
+
+        groups = []
+        for index, (option_value, label) in enumerate(choices):
+            option = self.create_option(name, option_value, label, str(option_value) in selected, index)
+            groups.append((None, [option], index))
+        return groups
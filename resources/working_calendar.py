@@ -0,0 +1,110 @@
+import calendar
+import time
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections, router
+
+GENERATION_KEY = 'month-calendar:generation'
+
+
+@dataclass(frozen=True)
+class MonthCalendar:
+    """
+    Working-day calendar for one month: Mon–Fri plus the 1st Saturday,
+    minus company holidays (half-days count as 0.5).
+    """
+    year: int
+    month: int
+    working_days: float
+    first_saturday: date
+    holidays: tuple = ()
+    half_days: tuple = ()
+
+
+def _cache():
+    return caches[getattr(settings, 'CALENDAR_CACHE_ALIAS', 'default')]
+
+
+def _generation():
+    # Seeded with the time rather than 0, so an evicted generation never
+    # comes back to a value older calendars were memoized under
+    return _cache().get_or_set(GENERATION_KEY, time.time_ns, timeout=None)
+
+
+def _holidays_pending():
+    """
+    Whether the current transaction changed holidays: its calendars must
+    not be memoized, as it may still roll back.
+    """
+    from .models import Holiday
+    connection = connections[router.db_for_write(Holiday)]
+    return any(func is clear_calendar_cache for _, func, *_ in connection.run_on_commit)
+
+
+def get_month_calendar(year, month):
+    """
+    Return the MonthCalendar for (year, month).
+
+    Memoized per process under a generation kept in the
+    CALENDAR_CACHE_ALIAS cache (default 'default'), which
+    clear_calendar_cache bumps when a change to the holidays commits (see
+    resources.signals); with a cache shared between processes, every
+    process sees the new holidays. A transaction that changed holidays
+    reads its own calendar from the database until it commits.
+    """
+    if _holidays_pending():
+        return _build_month_calendar(year, month)
+    return _memoized_month_calendar(year, month, _generation())
+
+
+@lru_cache(maxsize=1024)
+def _memoized_month_calendar(year, month, generation):
+    return _build_month_calendar(year, month)
+
+
+def _build_month_calendar(year, month):
+    from .models import Holiday
+
+    first_day, num_days = calendar.monthrange(year, month)
+    first_saturday = date(year, month, (5 - first_day) % 7 + 1)
+
+    holidays = []
+    half_days = []
+    for holiday_date, is_half_day in Holiday.objects.filter(
+        date__year=year, date__month=month
+    ).values_list('date', 'is_half_day'):
+        (half_days if is_half_day else holidays).append(holiday_date)
+
+    working_days = 0
+    for day in range(1, num_days + 1):
+        current = date(year, month, day)
+        if current.weekday() >= 5 and current != first_saturday:
+            continue
+        if current in holidays:
+            continue
+        working_days += 0.5 if current in half_days else 1
+
+    return MonthCalendar(
+        year=year,
+        month=month,
+        working_days=working_days,
+        first_saturday=first_saturday,
+        holidays=tuple(sorted(holidays)),
+        half_days=tuple(sorted(half_days)),
+    )
+
+
+def clear_calendar_cache():
+    """
+    Drop the memoized calendars of every process sharing the cache.
+    """
+    cache = _cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:  # not set yet, or evicted
+        cache.set(GENERATION_KEY, time.time_ns(), timeout=None)
+    _memoized_month_calendar.cache_clear()